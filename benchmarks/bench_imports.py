@@ -0,0 +1,84 @@
+"""
+Import time of the package's entry points, and a guard against heavy dependencies loading eagerly.
+
+Each case imports one target in a fresh interpreter and records the wall time of the import and
+the heavy modules it pulled in. A case fails if it loads a module it must not (e.g. importing
+TimePoint must not load pint or shapely) or if it exceeds its time budget. The process exits with
+status 1 on any failure, so the script can run in CI.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_imports [--repeat N] [--scale FACTOR]
+
+``--scale`` multiplies every time budget, for slow machines.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ("numpy", "scipy", "pint", "shapely", "networkx", "rtree", "geopandas")
+
+# (name, import statement, modules that must not be loaded, time budget in ms)
+CASES = [
+    ("things", "import src.pythingd.things", HEAVY_MODULES, 60),
+    ("things.TimePoint", "from src.pythingd.things import TimePoint", HEAVY_MODULES, 80),
+    ("foundational", "import src.pythingd.commons.foundational", HEAVY_MODULES, 60),
+    ("foundational.time", "import src.pythingd.commons.foundational.time", HEAVY_MODULES, 80),
+    ("foundational.quantity", "import src.pythingd.commons.foundational.quantity", HEAVY_MODULES, 80),
+    ("foundational.space", "import src.pythingd.commons.foundational.space", HEAVY_MODULES, 80),
+    ("entity.relations", "import src.pythingd.commons.entity.relations", HEAVY_MODULES, 100),
+    ("utils.statistical", "import src.pythingd.utils.statistical", HEAVY_MODULES, 80),
+    # Reference points: first use of the deferred dependencies.
+    ("Quantity(1, 'm')", "from src.pythingd.things import Quantity; Quantity(1, 'meter')", (), 2000),
+    ("Point(0, 0)", "from src.pythingd.things import Point; Point(0, 0)", ("pint", "networkx"), 1000),
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement: str, repeat: int) -> dict:
+    """
+    Imports in ``repeat`` fresh interpreters and returns the fastest time and the heavy modules loaded.
+    """
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None or result["ms"] < best["ms"]:
+            best = result
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per case (fastest is kept)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier applied to every time budget")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    print(f"{'case':<26}{'ms':>10}{'budget':>10}  loaded")
+    for name, statement, forbidden, budget_ms in CASES:
+        result = measure(statement, args.repeat)
+        budget = budget_ms * args.scale
+        unexpected = [module for module in result["loaded"] if module in forbidden]
+        status = ""
+        if unexpected:
+            status = f"  FAIL: loaded {', '.join(unexpected)}"
+        elif result["ms"] > budget:
+            status = "  FAIL: over budget"
+        failures += bool(status)
+        print(f"{name:<26}{result['ms']:>10.1f}{budget:>10.0f}  {', '.join(result['loaded']) or '-'}{status}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
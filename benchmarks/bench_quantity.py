@@ -0,0 +1,55 @@
+"""
+Per-operation latency of Quantity construction, arithmetic and conversion.
+
+Each operation is timed through the current code path ("after") and through a reproduction of
+the previous string round-trip path ("before"), which parsed the unit on every construction and
+rebuilt every result from ``str(result.units)``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_quantity
+"""
+
+import timeit
+
+from src.pythingd.__base__ import BaseAbstractEntity
+from src.pythingd.commons.foundational.quantity import Quantity, ureg
+
+
+def _legacy_construct(value, unit):
+    quantity = Quantity.__new__(Quantity)
+    BaseAbstractEntity.__init__(quantity, identifier=None, label=str(unit) + " quantity",
+                                description="A quantity with a unit.", sumo_class="Quantity")
+    quantity._quantity = value * ureg(unit)
+    return quantity
+
+
+def _legacy_add(a, b):
+    result = a._quantity + b._quantity
+    return _legacy_construct(result.magnitude, str(result.units))
+
+
+def _legacy_to(a, unit):
+    converted = a._quantity.to(unit)
+    return _legacy_construct(converted.magnitude, str(converted.units))
+
+
+def _microseconds(statement, number):
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e6
+
+
+def main(number: int = 2000) -> None:
+    a, b = Quantity(5, "meter"), Quantity(3, "meter")
+    cases = [
+        ("construct", lambda: _legacy_construct(5, "meter"), lambda: Quantity(5, "meter")),
+        ("add", lambda: _legacy_add(a, b), lambda: a + b),
+        ("to", lambda: _legacy_to(a, "kilometer"), lambda: a.to("kilometer")),
+    ]
+    print(f"{'operation':<12}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, before, after in cases:
+        before_us, after_us = _microseconds(before, number), _microseconds(after, number)
+        print(f"{name:<12}{before_us:>14.2f}{after_us:>14.2f}{before_us / after_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,131 @@
 TODO: root module docs
 """
 
-import logging as logger
+import logging
+import sys
+import weakref
 
 from abc import abstractmethod, ABC
-from typing import Dict, Any, Optional, List
+from collections import Counter
+from typing import Callable, Dict, Any, Iterable, Iterator, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Operation log modes: one debug line per operation, one line per `interval` operations,
+# or a periodic summary of operation counts.
+OPERATION_LOG_MODES = ("each", "sampled", "aggregate")
+
+
+class _OperationLog:
+    """
+    Debug logging for entity hot paths. Callers guard with ``logger.isEnabledFor(logging.DEBUG)``,
+    so nothing is formatted or counted while DEBUG is off.
+    """
+
+    __slots__ = ("mode", "interval", "counts", "_seen")
+
+    def __init__(self) -> None:
+        self.mode: str = "each"
+        self.interval: int = 10000
+        self.counts: Counter = Counter()
+        self._seen: int = 0
+
+    def record(self, operation: str, message: str, *args: Any) -> None:
+        if self.mode == "each":
+            logger.debug(message, *args)
+            return
+        self._seen += 1
+        if self.mode == "sampled":
+            if self._seen % self.interval == 0:
+                logger.debug(message + " (1 in %d sampled)", *args, self.interval)
+            return
+        self.counts[operation] += 1
+        if self._seen >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.counts:
+            logger.debug("Entity operations: %s",
+                         ", ".join(f"{operation}={count}" for operation, count in self.counts.items()))
+            self.counts.clear()
+        self._seen = 0
+
+
+_operation_log = _OperationLog()
+
+
+def configure_operation_logging(mode: str = "each", interval: int = 10000) -> None:
+    """
+    Configures how entity hot paths (adding attributes and relationships) log at DEBUG level.
+
+    :param mode: "each" logs one line per operation, "sampled" logs one in every ``interval``
+        operations, and "aggregate" logs a summary of operation counts every ``interval`` operations.
+    :param interval: The sampling or reporting interval.
+    """
+    if mode not in OPERATION_LOG_MODES:
+        raise ValueError(f"'{mode}' is not a valid operation log mode; expected one of {OPERATION_LOG_MODES}.")
+    if interval < 1:
+        raise ValueError("interval must be at least 1.")
+    _operation_log.flush()
+    _operation_log.mode = mode
+    _operation_log.interval = interval
+
+
+def flush_operation_log() -> None:
+    """
+    Logs and resets any operation counts accumulated in "aggregate" mode.
+    """
+    _operation_log.flush()
+
+
+def _add_to_buckets(flat: Dict[Any, 'BaseRelationship'],
+                    by_type: Dict[str, Dict[Any, 'BaseRelationship']],
+                    relationship: 'BaseRelationship') -> bool:
+    """
+    Adds a relationship to identifier-keyed storage and its relation type bucket.
+
+    :return: **True** if the relationship was not already present.
+    """
+    key = relationship.identifier
+    if key in flat:
+        return False
+    flat[key] = relationship
+    by_type.setdefault(relationship.relation_type, {})[key] = relationship
+    return True
+
+
+def _remove_from_buckets(flat: Dict[Any, 'BaseRelationship'],
+                         by_type: Dict[str, Dict[Any, 'BaseRelationship']],
+                         relationship: 'BaseRelationship') -> None:
+    """
+    Removes a relationship from identifier-keyed storage and its relation type bucket.
+    """
+    stored = flat.pop(relationship.identifier, None)
+    if stored is None:
+        return
+    bucket = by_type.get(stored.relation_type)
+    if bucket is not None:
+        bucket.pop(relationship.identifier, None)
+        if not bucket:
+            del by_type[stored.relation_type]
+
+
+def _rebucket(flat: Dict[Any, 'BaseRelationship'],
+              by_type: Dict[str, Dict[Any, 'BaseRelationship']],
+              relationship: 'BaseRelationship',
+              previous_type: str) -> None:
+    """
+    Moves a stored relationship from the bucket of its previous relation type to its current one.
+    """
+    key = relationship.identifier
+    if key not in flat:
+        return
+    bucket = by_type.get(previous_type)
+    if bucket is not None:
+        bucket.pop(key, None)
+        if not bucket:
+            del by_type[previous_type]
+    by_type.setdefault(relationship.relation_type, {})[key] = relationship
 
 
 class BaseEntity(ABC):
@@ -19,6 +140,11 @@ class BaseEntity(ABC):
         sumo_class (str): The SUMO class name, by default "Entity".
     """
 
+    __slots__ = ("_identifier", "label", "description", "sumo_class",
+                 "_attributes", "_relationships", "_relationships_by_type",
+                 "_incoming_relationships", "_incoming_relationships_by_type",
+                 "__weakref__")
+
     @abstractmethod
     def __init__(self,
                  identifier: str,
@@ -29,47 +155,70 @@ class BaseEntity(ABC):
         self.label: str = label if label is not None else identifier
         self.description: str = description
         self.sumo_class: str = sumo_class
-        self._attributes: List['BaseAttribute'] = []
-        self._relationships: List['BaseRelationship'] = []
-        self._incoming_relationships: List['BaseRelationship'] = []
+        # Insertion-ordered, identifier-keyed storage: membership, insertion and removal are O(1).
+        self._attributes: Dict[Any, 'BaseAttribute'] = {}
+        self._relationships: Dict[Any, 'BaseRelationship'] = {}
+        self._incoming_relationships: Dict[Any, 'BaseRelationship'] = {}
+        # Per relation type buckets, so filtered lookups only touch matching edges.
+        self._relationships_by_type: Dict[str, Dict[Any, 'BaseRelationship']] = {}
+        self._incoming_relationships_by_type: Dict[str, Dict[Any, 'BaseRelationship']] = {}
 
     @property
     def identifier(self) -> str:
         return self._identifier
 
     def add_attribute(self, attribute: 'BaseAttribute') -> None:
-        if attribute not in self._attributes:
-            self._attributes.append(attribute)
-            logger.debug(f"Added attribute {attribute.identifier} to entity {self.identifier}")
+        if attribute.identifier not in self._attributes:
+            self._attributes[attribute.identifier] = attribute
+            if logger.isEnabledFor(logging.DEBUG):
+                _operation_log.record("add_attribute", "Added attribute %s to entity %s",
+                                      attribute.identifier, self.identifier)
 
     def remove_attribute(self, attribute: 'BaseAttribute') -> None:
-        self._attributes = [attr for attr in self._attributes if attr != attribute]
+        self._attributes.pop(attribute.identifier, None)
 
     def get_attributes(self) -> List['BaseAttribute']:
-        return self._attributes
+        return list(self._attributes.values())
 
     def add_relationship(self, relationship: 'BaseRelationship') -> None:
-        if relationship not in self._relationships:
-            self._relationships.append(relationship)
-            logger.debug(f"Added relationship {relationship.identifier} to entity {self.identifier}")
+        if _add_to_buckets(self._relationships, self._relationships_by_type, relationship):
+            if logger.isEnabledFor(logging.DEBUG):
+                _operation_log.record("add_relationship", "Added relationship %s to entity %s",
+                                      relationship.identifier, self.identifier)
 
     def remove_relationship(self, relationship: 'BaseRelationship') -> None:
-        self._relationships = [rel for rel in self._relationships if rel != relationship]
+        _remove_from_buckets(self._relationships, self._relationships_by_type, relationship)
 
     def add_incoming_relationship(self, relationship: 'BaseRelationship') -> None:
-        if relationship not in self._incoming_relationships:
-            self._incoming_relationships.append(relationship)
-            logger.debug(f"Added incoming relationship {relationship.identifier} to entity {self.identifier}")
+        if _add_to_buckets(self._incoming_relationships, self._incoming_relationships_by_type, relationship):
+            if logger.isEnabledFor(logging.DEBUG):
+                _operation_log.record("add_incoming_relationship", "Added incoming relationship %s to entity %s",
+                                      relationship.identifier, self.identifier)
+
+    def remove_incoming_relationship(self, relationship: 'BaseRelationship') -> None:
+        _remove_from_buckets(self._incoming_relationships, self._incoming_relationships_by_type, relationship)
 
     def get_relationships(self, relation_type: Optional[str] = None) -> List['BaseRelationship']:
         if relation_type is None:
-            return self._relationships
-        return [rel for rel in self._relationships if rel.relation_type == relation_type]
+            return list(self._relationships.values())
+        return list(self._relationships_by_type.get(relation_type, {}).values())
 
     def get_incoming_relationships(self, relation_type: Optional[str] = None) -> List['BaseRelationship']:
         if relation_type is None:
-            return self._incoming_relationships
-        return [rel for rel in self._incoming_relationships if rel.relation_type == relation_type]
+            return list(self._incoming_relationships.values())
+        return list(self._incoming_relationships_by_type.get(relation_type, {}).values())
+
+    def _retype_relationship(self, relationship: 'BaseRelationship', previous_type: str) -> None:
+        """
+        Moves an outgoing relationship to the bucket of its new relation type.
+        """
+        _rebucket(self._relationships, self._relationships_by_type, relationship, previous_type)
+
+    def _retype_incoming_relationship(self, relationship: 'BaseRelationship', previous_type: str) -> None:
+        """
+        Moves an incoming relationship to the bucket of its new relation type.
+        """
+        _rebucket(self._incoming_relationships, self._incoming_relationships_by_type, relationship, previous_type)
 
     def to_dict(self, recursive: bool = True) -> Dict[str, Any]:
         base = {
@@ -79,11 +228,11 @@ class BaseEntity(ABC):
             "sumo_class": self.sumo_class,
         }
         if recursive:
-            base["attributes"] = [attr.to_dict(recursive=False) for attr in self._attributes]
-            base["relationships"] = [rel.to_dict(recursive=False) for rel in self._relationships]
+            base["attributes"] = [attr.to_dict(recursive=False) for attr in self._attributes.values()]
+            base["relationships"] = [rel.to_dict(recursive=False) for rel in self._relationships.values()]
         else:
-            base["attributes"] = [attr.identifier for attr in self._attributes]
-            base["relationships"] = [rel.identifier for rel in self._relationships]
+            base["attributes"] = list(self._attributes)
+            base["relationships"] = list(self._relationships)
         return base
 
     def __repr__(self) -> str:
@@ -97,6 +246,7 @@ class BaseEntity(ABC):
 
 
 class BaseAbstractEntity(BaseEntity, ABC):
+    __slots__ = ()
 
     @abstractmethod
     def __init__(self,
@@ -108,6 +258,7 @@ class BaseAbstractEntity(BaseEntity, ABC):
 
 
 class BasePhysicalEntity(BaseEntity, ABC):
+    __slots__ = ()
 
     @abstractmethod
     def __init__(self,
@@ -119,6 +270,7 @@ class BasePhysicalEntity(BaseEntity, ABC):
 
 
 class Entity(BaseEntity):
+    __slots__ = ()
 
     @abstractmethod
     def __init__(self,
@@ -134,6 +286,8 @@ class BaseAttribute(BaseEntity, ABC):
     Represents an Attribute as an entity in its own right.
     """
 
+    __slots__ = ("domain", "name", "value")
+
     @abstractmethod
     def __init__(self,
                  identifier: str,
@@ -163,6 +317,8 @@ class BaseRelationship(BaseEntity, ABC):
     Represents a Relationship as an entity.
     """
 
+    __slots__ = ("source", "_relation_type", "target")
+
     @abstractmethod
     def __init__(self,
                  identifier: str,
@@ -190,6 +346,26 @@ class BaseRelationship(BaseEntity, ABC):
         self.source.add_relationship(self)
         self.target.add_incoming_relationship(self)
 
+    def detach(self) -> None:
+        """
+        Unregisters the relationship from both its source and target entities.
+        """
+        self.source.remove_relationship(self)
+        self.target.remove_incoming_relationship(self)
+
+    @property
+    def relation_type(self) -> str:
+        return self._relation_type
+
+    @relation_type.setter
+    def relation_type(self, relation_type: str) -> None:
+        previous = getattr(self, "_relation_type", None)
+        self._relation_type = relation_type
+        # Keep the per-type buckets on both endpoints in step with the new type.
+        if previous is not None and previous != relation_type:
+            self.source._retype_relationship(self, previous)
+            self.target._retype_incoming_relationship(self, previous)
+
     def to_dict(self, recursive: bool = True) -> Dict[str, Any]:
         base = super().to_dict(recursive)
         base.update({
@@ -198,3 +374,73 @@ class BaseRelationship(BaseEntity, ABC):
             "target": self.target.identifier
         })
         return base
+
+
+class EntityRegistry:
+    """
+    An identity map from identifiers to entities, so each identifier resolves to one canonical entity.
+
+    Lookups are O(1). String identifiers are interned on registration. With ``weak=True`` the
+    registry holds entities by weak reference and forgets them once nothing else refers to them.
+    """
+
+    def __init__(self, weak: bool = False) -> None:
+        self.weak = weak
+        self._entities: Dict[Any, BaseEntity] = weakref.WeakValueDictionary() if weak else {}
+
+    @staticmethod
+    def intern(identifier: Any) -> Any:
+        """
+        Returns the interned form of a string identifier; other identifiers are returned unchanged.
+        """
+        return sys.intern(identifier) if type(identifier) is str else identifier
+
+    def register(self, entity: BaseEntity) -> BaseEntity:
+        """
+        Registers an entity and returns the canonical entity for its identifier.
+        If another entity with the same identifier is already registered, that entity is returned.
+        """
+        existing = self._entities.get(entity.identifier)
+        if existing is not None:
+            return existing
+        key = self.intern(entity.identifier)
+        entity._identifier = key
+        self._entities[key] = entity
+        return entity
+
+    def unregister(self, identifier: Any) -> Optional[BaseEntity]:
+        return self._entities.pop(identifier, None)
+
+    def get(self, identifier: Any, default: Optional[BaseEntity] = None) -> Optional[BaseEntity]:
+        return self._entities.get(identifier, default)
+
+    def get_or_create(self, identifier: Any, factory: Callable[[], BaseEntity]) -> BaseEntity:
+        """
+        Returns the registered entity for an identifier, creating and registering it with factory if needed.
+        """
+        entity = self._entities.get(identifier)
+        if entity is None:
+            entity = self.register(factory())
+        return entity
+
+    def resolve(self, identifiers: Iterable[Any]) -> Dict[Any, BaseEntity]:
+        """
+        Resolves a batch of identifiers, omitting those that are not registered.
+        """
+        entities = self._entities
+        return {identifier: entities[identifier] for identifier in identifiers if identifier in entities}
+
+    def __getitem__(self, identifier: Any) -> BaseEntity:
+        return self._entities[identifier]
+
+    def __contains__(self, identifier: Any) -> bool:
+        return identifier in self._entities
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._entities.keys()))
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __repr__(self) -> str:
+        return f"EntityRegistry(entities={len(self)}, weak={self.weak})"
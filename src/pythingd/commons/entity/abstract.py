@@ -11,6 +11,9 @@ class AbstractEntity(BaseAbstractEntity):
     """
     Base class for all abstract entities.
     """
+
+    __slots__ = ("name",)
+
     def __init__(self, name: str = 'unknown abstract entity'):
         """
         # TODO: method docs
@@ -24,6 +27,9 @@ class Attribute(BaseAttribute):
     """
     Represents an attribute of an entity.
     """
+
+    __slots__ = ()
+
     def __init__(self, name: str = 'attribute', value: Any = None):
         """
         TODO: method docs
@@ -39,6 +45,9 @@ class Set(AbstractEntity):
     """
     Represents a collection or group of entities.
     """
+
+    __slots__ = ("members",)
+
     def __init__(self, name: str = 'unknown set', members: List = None):
         """
         TODO: Method docs
@@ -0,0 +1,417 @@
+"""
+Module: mapped.py
+
+A versioned, memory-mappable binary snapshot of entities, attributes and relationships for fast
+cold starts.
+
+File layout (little-endian)::
+
+    magic      8 bytes   b"PYTHSNAP"
+    version    uint32    FORMAT_VERSION
+    reserved   uint32
+    header     uint64    length of the JSON header that follows
+    JSON header          counts and, per array, its dtype, shape and byte offset
+    arrays               each aligned to 64 bytes
+
+The arrays are a string table (UTF-8 data plus uint64 offsets), fixed-width uint32 string-index
+columns for entities, relationships and attributes, sort orders for identifier lookups, and CSR
+edge arrays for both directions. Opening a snapshot maps the file and wraps each array with
+``np.frombuffer``, so startup time does not depend on graph size. Entities, relationships and
+attributes are materialized as objects only when first accessed, and then cached.
+
+Identifiers are stored as strings.
+"""
+
+import json
+import mmap
+import os
+from bisect import bisect_left
+from typing import Any, Callable, Dict, IO, Iterable, List, Optional
+
+import numpy as np
+
+from src.pythingd.__base__ import BaseAttribute, BaseEntity, EntityRegistry
+from src.pythingd.commons.entity.relations import RelationshipManager, StandardRelationship
+
+MAGIC = b"PYTHSNAP"
+FORMAT_VERSION = 1
+_ALIGN = 64
+_PREAMBLE = np.dtype([("magic", "S8"), ("version", "<u4"), ("reserved", "<u4"), ("header_length", "<u8")])
+
+# Builds an entity from an entity record (identifier, label, description, sumo_class).
+EntityFactory = Callable[[Dict[str, Any]], BaseEntity]
+# Builds an attribute from an attribute record (identifier, domain, name, value, label, description).
+AttributeFactory = Callable[[Dict[str, Any]], BaseAttribute]
+
+_ENTITY_COLUMNS = ("identifier", "label", "description", "sumo_class")
+_RELATIONSHIP_COLUMNS = ("identifier", "label", "description", "sumo_class")
+_ATTRIBUTE_COLUMNS = ("identifier", "name", "value", "label", "description")
+
+
+class _StringTable:
+    """
+    Interns strings and lays them out as UTF-8 data plus offsets.
+    """
+
+    def __init__(self) -> None:
+        self._index: Dict[str, int] = {}
+
+    def add(self, value: Any) -> int:
+        value = "" if value is None else str(value)
+        return self._index.setdefault(value, len(self._index))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        encoded = [value.encode("utf-8") for value in self._index]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return {"string_offsets": offsets,
+                "string_data": np.frombuffer(b"".join(encoded), dtype=np.uint8)}
+
+
+def save_mapped_snapshot(target: str | IO[bytes], manager: RelationshipManager,
+                         entities: Optional[Iterable[BaseEntity]] = None) -> None:
+    """
+    Writes the manager's relationships, their endpoint entities, any extra ``entities`` and the
+    attributes of all of them to a binary snapshot.
+
+    :param target: A file name or binary file object.
+    """
+    strings = _StringTable()
+    node_index: Dict[str, int] = {}
+    nodes: List[BaseEntity] = []
+
+    def intern_node(entity: BaseEntity) -> int:
+        key = str(entity.identifier)
+        code = node_index.get(key)
+        if code is None:
+            code = node_index[key] = len(nodes)
+            nodes.append(entity)
+        return code
+
+    for entity in entities or ():
+        intern_node(entity)
+    relationships = list(manager.iter_relationships())
+    type_index: Dict[str, int] = {}
+    edge_sources = np.empty(len(relationships), dtype="<u4")
+    edge_targets = np.empty(len(relationships), dtype="<u4")
+    edge_types = np.empty(len(relationships), dtype="<u4")
+    for i, rel in enumerate(relationships):
+        edge_sources[i] = intern_node(rel.source)
+        edge_targets[i] = intern_node(rel.target)
+        edge_types[i] = type_index.setdefault(rel.relation_type, len(type_index))
+
+    # Out-edges sorted by (source, target) form the CSR; in-edges are a permutation of them.
+    order = np.lexsort((edge_targets, edge_sources))
+    relationships = [relationships[i] for i in order]
+    edge_sources, edge_targets, edge_types = edge_sources[order], edge_targets[order], edge_types[order]
+    node_count = len(nodes)
+
+    attributes = [(code, attribute) for code, entity in enumerate(nodes) for attribute in entity.get_attributes()]
+    arrays: Dict[str, np.ndarray] = {
+        "node_strings": np.array([[strings.add(getattr(entity, column)) for column in _ENTITY_COLUMNS]
+                                  for entity in nodes], dtype="<u4").reshape(node_count, len(_ENTITY_COLUMNS)),
+        "node_order": np.array(sorted(range(node_count), key=lambda code: str(nodes[code].identifier)), dtype="<u4"),
+        "relation_types": np.array([strings.add(value) for value in type_index], dtype="<u4"),
+        "out_indptr": _indptr(edge_sources, node_count),
+        "edge_sources": edge_sources,
+        "edge_targets": edge_targets,
+        "edge_types": edge_types,
+        "edge_strings": np.array([[strings.add(getattr(rel, column)) for column in _RELATIONSHIP_COLUMNS]
+                                  for rel in relationships],
+                                 dtype="<u4").reshape(len(relationships), len(_RELATIONSHIP_COLUMNS)),
+        "edge_order": np.array(sorted(range(len(relationships)), key=lambda i: str(relationships[i].identifier)),
+                               dtype="<u4"),
+        "in_indptr": _indptr(np.sort(edge_targets), node_count),
+        "in_edges": np.argsort(edge_targets, kind="stable").astype("<u4"),
+        "attribute_indptr": _indptr(np.array([code for code, _ in attributes], dtype="<u4"), node_count),
+        "attribute_strings": np.array([[strings.add(attribute.identifier), strings.add(attribute.name),
+                                        strings.add(json.dumps(attribute.value, default=str)),
+                                        strings.add(attribute.label), strings.add(attribute.description)]
+                                       for _, attribute in attributes],
+                                      dtype="<u4").reshape(len(attributes), len(_ATTRIBUTE_COLUMNS)),
+    }
+    arrays.update(strings.arrays())
+
+    if isinstance(target, str):
+        with open(target, "wb") as fp:
+            _write_arrays(fp, arrays, node_count, len(relationships), len(attributes))
+    else:
+        _write_arrays(target, arrays, node_count, len(relationships), len(attributes))
+
+
+def _indptr(sorted_codes: np.ndarray, size: int) -> np.ndarray:
+    return np.searchsorted(sorted_codes, np.arange(size + 1)).astype("<u8")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _write_arrays(fp: IO[bytes], arrays: Dict[str, np.ndarray],
+                  node_count: int, edge_count: int, attribute_count: int) -> None:
+    layout: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({"counts": {"nodes": node_count, "edges": edge_count, "attributes": attribute_count},
+                         "arrays": layout}).encode("utf-8")
+    # Array offsets in the header are relative to the first aligned byte after it.
+    base = _aligned(_PREAMBLE.itemsize + len(header))
+    preamble = np.array([(MAGIC, FORMAT_VERSION, 0, len(header))], dtype=_PREAMBLE)
+    fp.write(preamble.tobytes())
+    fp.write(header)
+    fp.write(b"\0" * (base - _PREAMBLE.itemsize - len(header)))
+    written = 0
+    for name, array in arrays.items():
+        fp.write(b"\0" * (layout[name]["offset"] - written))
+        fp.write(np.ascontiguousarray(array).tobytes())
+        written = layout[name]["offset"] + array.nbytes
+
+
+class MappedSnapshot:
+    """
+    A read-only view over a binary snapshot file, materializing objects lazily.
+
+    Entities are built by ``entity_factory`` on first access. Relationships are built as
+    StandardRelationship instances between materialized entities, so each entity only carries the
+    relationships materialized so far; use ``relationships_from`` and ``relationships_to`` to load
+    an entity's edges. Attributes are built by ``attribute_factory`` when requested.
+
+    Materialized entities are registered in ``registry``, or in a new ``EntityRegistry()`` if none is
+    given; entities already registered there under an identifier are reused.
+    """
+
+    def __init__(self, path: str,
+                 entity_factory: EntityFactory,
+                 attribute_factory: Optional[AttributeFactory] = None,
+                 registry: Optional[EntityRegistry] = None) -> None:
+        self.entity_factory = entity_factory
+        self.attribute_factory = attribute_factory
+        self.registry = registry if registry is not None else EntityRegistry()
+        self._arrays: Dict[str, np.ndarray] = {}
+        with open(path, "rb") as fp:
+            if os.fstat(fp.fileno()).st_size < _PREAMBLE.itemsize:
+                raise ValueError(f"'{path}' is not a PyThings snapshot.")
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        # Copied out of the map, so no view of it is left behind if the file is rejected.
+        magic, version, _, header_length = np.frombuffer(self._mmap, dtype=_PREAMBLE, count=1).tolist()[0]
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"'{path}' is not a PyThings snapshot.")
+        self.version = int(version)
+        if self.version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version {self.version} (expected {FORMAT_VERSION}).")
+        header_end = _PREAMBLE.itemsize + int(header_length)
+        header = json.loads(self._mmap[_PREAMBLE.itemsize:header_end].decode("utf-8"))
+        base = _aligned(header_end)
+        self.counts: Dict[str, int] = header["counts"]
+        self._arrays = {
+            name: self._map_array(base + spec["offset"], np.dtype(spec["dtype"]), spec["shape"])
+            for name, spec in header["arrays"].items()
+        }
+        self._relation_types: Optional[List[str]] = None
+        self._entities: Dict[int, BaseEntity] = {}
+        self._relationships: Dict[int, StandardRelationship] = {}
+        self._attributes: Dict[int, List[BaseAttribute]] = {}
+
+    @property
+    def node_count(self) -> int:
+        return self.counts["nodes"]
+
+    @property
+    def edge_count(self) -> int:
+        return self.counts["edges"]
+
+    def __len__(self) -> int:
+        return self.node_count
+
+    def __contains__(self, identifier: Any) -> bool:
+        return self.find_node(identifier) is not None
+
+    def string(self, index: int) -> str:
+        """
+        Decodes one entry of the string table.
+        """
+        offsets = self._arrays["string_offsets"]
+        return self._arrays["string_data"][offsets[index]:offsets[index + 1]].tobytes().decode("utf-8")
+
+    @property
+    def relation_types(self) -> List[str]:
+        if self._relation_types is None:
+            self._relation_types = [self.string(index) for index in self._arrays["relation_types"]]
+        return self._relation_types
+
+    def find_node(self, identifier: Any) -> Optional[int]:
+        """
+        Returns the node code of an entity identifier via binary search, or **None**.
+        """
+        return self._find(self._arrays["node_order"], self._arrays["node_strings"], str(identifier))
+
+    def node_identifier(self, code: int) -> str:
+        return self.string(self._arrays["node_strings"][code, 0])
+
+    def entity(self, identifier: Any) -> Optional[BaseEntity]:
+        """
+        Returns the entity with the given identifier, materializing it on first access.
+        """
+        code = self.find_node(identifier)
+        return None if code is None else self.entity_at(code)
+
+    def entity_at(self, code: int) -> BaseEntity:
+        entity = self._entities.get(code)
+        if entity is None:
+            row = self._arrays["node_strings"][code]
+            record = {column: self.string(index) for column, index in zip(_ENTITY_COLUMNS, row)}
+            entity = self.registry.get_or_create(record["identifier"], lambda: self.entity_factory(record))
+            self._entities[code] = entity
+        return entity
+
+    def relationship(self, identifier: Any) -> Optional[StandardRelationship]:
+        """
+        Returns the relationship with the given identifier, materializing it on first access.
+        """
+        edge = self._find(self._arrays["edge_order"], self._arrays["edge_strings"], str(identifier))
+        return None if edge is None else self.relationship_at(edge)
+
+    def relationship_at(self, edge: int) -> StandardRelationship:
+        relationship = self._relationships.get(edge)
+        if relationship is None:
+            row = self._arrays["edge_strings"][edge]
+            record = {column: self.string(index) for column, index in zip(_RELATIONSHIP_COLUMNS, row)}
+            relationship = self._relationships[edge] = StandardRelationship(
+                identifier=record["identifier"],
+                source=self.entity_at(int(self._arrays["edge_sources"][edge])),
+                relation_type=self.relation_types[self._arrays["edge_types"][edge]],
+                target=self.entity_at(int(self._arrays["edge_targets"][edge])),
+                label=record["label"],
+                description=record["description"],
+                sumo_class=record["sumo_class"]
+            )
+        return relationship
+
+    def relationships_from(self, identifier: Any) -> List[StandardRelationship]:
+        """
+        Materializes and returns the relationships whose source is the given entity.
+        """
+        code = self._require_node(identifier)
+        indptr = self._arrays["out_indptr"]
+        return [self.relationship_at(edge) for edge in range(indptr[code], indptr[code + 1])]
+
+    def relationships_to(self, identifier: Any) -> List[StandardRelationship]:
+        """
+        Materializes and returns the relationships whose target is the given entity.
+        """
+        code = self._require_node(identifier)
+        indptr = self._arrays["in_indptr"]
+        return [self.relationship_at(int(edge)) for edge in self._arrays["in_edges"][indptr[code]:indptr[code + 1]]]
+
+    def successors(self, identifier: Any) -> List[str]:
+        """
+        Returns the identifiers of the targets of an entity's relationships without materializing them.
+        """
+        code = self._require_node(identifier)
+        indptr = self._arrays["out_indptr"]
+        targets = self._arrays["edge_targets"][indptr[code]:indptr[code + 1]]
+        return [self.node_identifier(target) for target in targets]
+
+    def attributes_of(self, identifier: Any) -> List[BaseAttribute]:
+        """
+        Materializes and returns the attributes of the given entity. Requires an attribute_factory.
+        """
+        if self.attribute_factory is None:
+            raise ValueError("An attribute_factory is required to materialize attributes.")
+        code = self._require_node(identifier)
+        attributes = self._attributes.get(code)
+        if attributes is None:
+            indptr = self._arrays["attribute_indptr"]
+            attributes = []
+            for row in self._arrays["attribute_strings"][indptr[code]:indptr[code + 1]]:
+                record = {column: self.string(index) for column, index in zip(_ATTRIBUTE_COLUMNS, row)}
+                record["value"] = json.loads(record["value"])
+                record["domain"] = self.entity_at(code)
+                attributes.append(self.attribute_factory(record))
+            self._attributes[code] = attributes
+        return attributes
+
+    def to_manager(self, manager: Optional[RelationshipManager] = None) -> RelationshipManager:
+        """
+        Materializes every relationship into a RelationshipManager.
+        """
+        manager = manager if manager is not None else RelationshipManager()
+        for edge in range(self.edge_count):
+            manager.add_relationship(self.relationship_at(edge))
+        return manager
+
+    def to_snapshot(self) -> "RelationshipSnapshot":
+        """
+        Builds a CSR RelationshipSnapshot directly from the mapped arrays without materializing entities.
+        """
+        from src.pythingd.commons.entity.snapshot import RelationshipSnapshot
+        return RelationshipSnapshot(
+            node_ids=[self.node_identifier(code) for code in range(self.node_count)],
+            relation_types=list(self.relation_types),
+            edge_sources=self._arrays["edge_sources"].astype(np.int32),
+            edge_targets=self._arrays["edge_targets"].astype(np.int32),
+            edge_types=self._arrays["edge_types"].astype(np.int32),
+            edge_ids=[self.string(index) for index in self._arrays["edge_strings"][:, 0]])
+
+    def close(self) -> None:
+        """
+        Releases the memory map. Arrays obtained from the snapshot's internals must not be used afterwards.
+        """
+        if self._mmap.closed:
+            return
+        # The map cannot be closed while NumPy views of it exist, so they are dropped first.
+        self._arrays = {}
+        self._mmap.close()
+
+    def __enter__(self) -> "MappedSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _map_array(self, offset: int, dtype: np.dtype, shape: List[int]) -> np.ndarray:
+        count = int(np.prod(shape))
+        if not count:
+            return np.empty(shape, dtype=dtype)
+        return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+    def _require_node(self, identifier: Any) -> int:
+        code = self.find_node(identifier)
+        if code is None:
+            raise KeyError(identifier)
+        return code
+
+    def _find(self, order: np.ndarray, rows: np.ndarray, key: str) -> Optional[int]:
+        keys = _SortedKeys(self, order, rows)
+        position = bisect_left(keys, key)
+        if position < len(order) and keys[position] == key:
+            return int(order[position])
+        return None
+
+    def __repr__(self) -> str:
+        return f"MappedSnapshot(version={self.version}, nodes={self.node_count}, edges={self.edge_count})"
+
+
+class _SortedKeys:
+    """
+    A lazy sequence of identifier strings in sorted order, decoded on demand for binary search.
+    """
+
+    __slots__ = ("_snapshot", "_order", "_rows")
+
+    def __init__(self, snapshot: MappedSnapshot, order: np.ndarray, rows: np.ndarray) -> None:
+        self._snapshot, self._order, self._rows = snapshot, order, rows
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, position: int) -> str:
+        return self._snapshot.string(self._rows[self._order[position], 0])
+
+
+__all__ = ["MappedSnapshot", "save_mapped_snapshot", "MAGIC", "FORMAT_VERSION",
+           "EntityFactory", "AttributeFactory"]
@@ -10,6 +10,8 @@ class PhysicalEntity(BasePhysicalEntity):  # TODO: implement class
     TODO: class docs
     """
 
+    __slots__ = ("name",)
+
     def __init__(self, name: str = 'unknown entity'):
         """
         TODO: method docs
@@ -24,6 +26,8 @@ class Object(PhysicalEntity):
     TODO: class docs
     """
 
+    __slots__ = ("material",)
+
     def __init__(self, name: str = 'unknown object', material: str = 'unknown material'):
         """
         TODO: method docs
@@ -7,14 +7,21 @@ introduces type-safe relationship types via an Enum, and supports enhanced (recu
 serialization of relationship data.
 """
 
-from typing import Any, Dict, Optional, List
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional, List, Tuple
 from enum import Enum
+from itertools import islice
+import heapq
 import json
 import xml.etree.ElementTree as ET
 
-import networkx as nx
+from cachetools import LRUCache
 
-from src.pythingd.__base__ import BaseEntity, BaseRelationship
+from src.pythingd.__base__ import BaseEntity, BaseRelationship, EntityRegistry
+from src.pythingd.utils.lazy import lazy_import
+
+# networkx is only needed once a graph view or path query is requested.
+nx = lazy_import("networkx")
 
 
 class RelationType(Enum):
@@ -46,6 +53,13 @@ class RelationType(Enum):
         return self.value
 
 
+def _relation_type_value(relation_type: RelationType | str) -> str:
+    """
+    Normalizes a RelationType or plain string to the string stored on relationships.
+    """
+    return relation_type.value if isinstance(relation_type, RelationType) else relation_type
+
+
 class StandardRelationship(BaseRelationship):
     """
     StandardRelationship is a concrete implementation of BaseRelationship.
@@ -55,10 +69,12 @@ class StandardRelationship(BaseRelationship):
     optionally embedding more details from linked entities.
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  identifier: str,
                  source: BaseEntity,
-                 relation_type: RelationType,
+                 relation_type: RelationType | str,
                  target: BaseEntity,
                  label: Optional[str] = None,
                  description: str = "",
@@ -70,7 +86,7 @@ class StandardRelationship(BaseRelationship):
         # Additional domain-specific validations can be added here.
         sumo_class_value = sumo_class if sumo_class is not None else "Relationship"
         # Note: BaseRelationship expects the relation_type as a string.
-        super().__init__(identifier, source, relation_type.value, target, label, description)
+        super().__init__(identifier, source, _relation_type_value(relation_type), target, label, description)
         self.sumo_class = sumo_class_value
 
     def to_dict(self, recursive: bool = True) -> Dict[str, Any]:
@@ -118,53 +134,472 @@ class StandardRelationship(BaseRelationship):
         return ET.tostring(root, encoding="unicode")
 
 
+def _index_add(index: Dict[Any, Dict[Any, StandardRelationship]], key: Any,
+               relationship: StandardRelationship) -> None:
+    index.setdefault(key, {})[relationship.identifier] = relationship
+
+
+def _index_remove(index: Dict[Any, Dict[Any, StandardRelationship]], key: Any,
+                  relationship: StandardRelationship) -> None:
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(relationship.identifier, None)
+        if not bucket:
+            del index[key]
+
+
+def _edge_attributes(relationship: StandardRelationship, relation_type: str) -> Dict[str, Any]:
+    """
+    Returns the graph edge attributes recorded for a relationship indexed under relation_type.
+    """
+    return {"relation_type": relation_type,
+            "identifier": relationship.identifier,
+            "sumo_class": relationship.sumo_class}
+
+
+class DegreeCentrality(Mapping):
+    """
+    A live, read-only mapping of entity identifier to degree centrality.
+
+    Degrees are maintained incrementally by a RelationshipManager and the normalisation by
+    (n - 1) is applied on access, so reading a value costs O(1) and never rebuilds a graph.
+    Values match ``nx.degree_centrality`` on the equivalent ``build_relationship_graph`` result.
+    """
+
+    __slots__ = ("_degrees",)
+
+    def __init__(self, degrees: Dict[Any, int]) -> None:
+        self._degrees = degrees
+
+    def _scale(self) -> float:
+        node_count = len(self._degrees)
+        return 1.0 / (node_count - 1.0) if node_count > 1 else 1.0
+
+    def __getitem__(self, node: Any) -> float:
+        return self._degrees[node] * self._scale()
+
+    def __iter__(self):
+        return iter(self._degrees)
+
+    def __len__(self) -> int:
+        return len(self._degrees)
+
+    def most_central(self, k: int = 10) -> List[tuple]:
+        """
+        Returns the k most central (identifier, centrality) pairs, highest first.
+        """
+        scale = self._scale()
+        top = heapq.nlargest(k, self._degrees.items(), key=lambda item: item[1])
+        return [(node, degree * scale) for node, degree in top]
+
+    def to_dict(self) -> Dict[Any, float]:
+        scale = self._scale()
+        return {node: degree * scale for node, degree in self._degrees.items()}
+
+    def __repr__(self) -> str:
+        return f"DegreeCentrality(nodes={len(self._degrees)})"
+
+
 class RelationshipManager:
     """
     Manages relationships and provides bidirectional navigation between entities.
+
+    Relationships are held in an insertion-ordered map keyed by identifier, alongside hash
+    indexes by source, target, relation type and (source, relation type), so lookups cost
+    O(result) rather than O(total relationships).
+
+    The manager also maintains a directed graph view of its relationships (built on first
+    access of ``graph``) and per-entity degrees, both updated from each add, remove or retype,
+    so analytics cost O(changes) rather than O(graph).
+
+    The manager records the type each relationship was indexed under. Change a managed
+    relationship's type with ``retype_relationship``: assigning ``relation_type`` directly
+    is not seen by the manager, which keeps filing the relationship under its previous type.
     """
 
     def __init__(self):
-        self.relationships: List[StandardRelationship] = []
+        self._relationships: Dict[Any, StandardRelationship] = {}
+        self._by_source: Dict[Any, Dict[Any, StandardRelationship]] = {}
+        self._by_target: Dict[Any, Dict[Any, StandardRelationship]] = {}
+        self._by_type: Dict[str, Dict[Any, StandardRelationship]] = {}
+        self._by_source_type: Dict[tuple, Dict[Any, StandardRelationship]] = {}
+        # The relation type each relationship is indexed under, by relationship identifier.
+        self._types: Dict[Any, str] = {}
+        # Parallel relationships collapse onto one (source, target) graph edge;
+        # the latest one supplies its attributes.
+        self._edges: Dict[tuple, Dict[Any, StandardRelationship]] = {}
+        self._degrees: Dict[Any, int] = {}
+        self._graph: Optional[nx.DiGraph] = None
+        self._version: int = 0
+        # Path query results, valid for the graph version in _path_cache_version.
+        self._path_cache: LRUCache = LRUCache(maxsize=1024)
+        self._path_cache_version: int = 0
+
+    @property
+    def version(self) -> int:
+        """
+        A counter incremented on every change to the managed relationships.
+        """
+        return self._version
+
+    @property
+    def graph(self) -> "nx.DiGraph":
+        """
+        Returns a read-only view of the live relationship graph.
+
+        The graph is built once on first access and then kept in sync incrementally.
+        Nodes are entity identifiers and edges carry the same attributes as ``build_relationship_graph``.
+        """
+        if self._graph is None:
+            graph = nx.DiGraph()
+            for (source_id, target_id), edges in self._edges.items():
+                latest = next(reversed(edges.values()))
+                graph.add_edge(source_id, target_id, **_edge_attributes(latest, self._types[latest.identifier]))
+            self._graph = graph
+        return self._graph.copy(as_view=True)
+
+    def degree_centrality(self) -> DegreeCentrality:
+        """
+        Returns a live view of the degree centrality of every entity in the graph.
+        """
+        return DegreeCentrality(self._degrees)
+
+    def to_snapshot(self) -> "RelationshipSnapshot":
+        """
+        Exports the managed relationships to a compact, CSR-backed RelationshipSnapshot.
+        """
+        from src.pythingd.commons.entity.snapshot import RelationshipSnapshot
+        return RelationshipSnapshot.from_relationships(self._relationships.values())
+
+    @property
+    def relationships(self) -> Tuple[StandardRelationship, ...]:
+        """
+        The managed relationships in insertion order, as a read-only tuple.
+
+        Use ``add_relationship`` and ``remove_relationship`` to change them, or assign a new
+        sequence to replace them all and rebuild the indexes.
+        """
+        return tuple(self._relationships.values())
+
+    @relationships.setter
+    def relationships(self, relationships: Iterable[StandardRelationship]) -> None:
+        self.clear()
+        for relationship in relationships:
+            self.add_relationship(relationship)
+
+    def clear(self) -> None:
+        """
+        Removes every relationship and empties the indexes, graph view and degrees in place.
+        """
+        for index in (self._relationships, self._by_source, self._by_target, self._by_type,
+                      self._by_source_type, self._types, self._edges, self._degrees):
+            index.clear()
+        if self._graph is not None:
+            self._graph.clear()
+        self._version += 1
+
+    def __len__(self) -> int:
+        return len(self._relationships)
+
+    def __contains__(self, relationship: StandardRelationship | str) -> bool:
+        identifier = getattr(relationship, "identifier", relationship)
+        return identifier in self._relationships
 
     def add_relationship(self, relationship: StandardRelationship) -> None:
-        self.relationships.append(relationship)
+        """
+        Adds a relationship and indexes it. Relationships already managed are ignored.
+        """
+        if relationship.identifier in self._relationships:
+            return
+        self._relationships[relationship.identifier] = relationship
+        self._types[relationship.identifier] = relationship.relation_type
+        self._index(relationship, relationship.relation_type)
+        self._link(relationship)
+        self._version += 1
+
+    def remove_relationship(self, relationship: StandardRelationship | str) -> Optional[StandardRelationship]:
+        """
+        Removes a relationship (or the relationship with the given identifier) from the manager.
+
+        :return: The removed relationship, or **None** if it was not managed.
+        """
+        identifier = getattr(relationship, "identifier", relationship)
+        removed = self._relationships.pop(identifier, None)
+        if removed is not None:
+            # Unindex under the recorded type, which differs if relation_type was assigned directly.
+            self._unindex(removed, self._types.pop(identifier))
+            self._unlink(removed)
+            self._version += 1
+        return removed
+
+    def retype_relationship(self, relationship: StandardRelationship | str,
+                            relation_type: RelationType | str) -> Optional[StandardRelationship]:
+        """
+        Changes the relation type of a managed relationship, keeping the indexes consistent.
+        Also re-files a relationship whose ``relation_type`` was assigned directly.
+
+        :return: The updated relationship, or **None** if it was not managed.
+        """
+        identifier = getattr(relationship, "identifier", relationship)
+        rel = self._relationships.get(identifier)
+        if rel is None:
+            return None
+        new_type = _relation_type_value(relation_type)
+        previous_type = self._types[identifier]
+        rel.relation_type = new_type
+        if new_type != previous_type:
+            # Only the type-keyed indexes change, so source and target lookups keep insertion order.
+            self._unindex_type(rel, previous_type)
+            self._types[identifier] = new_type
+            self._index_type(rel, new_type)
+            self._refresh_edge((rel.source.identifier, rel.target.identifier))
+            self._version += 1
+        return rel
+
+    def iter_paths(self, source: BaseEntity | str, target: BaseEntity | str,
+                   max_depth: Optional[int] = None,
+                   max_paths: Optional[int] = None,
+                   relation_types: Optional[Iterable[RelationType | str]] = None) -> Iterator[List[str]]:
+        """
+        Lazily yields simple paths of entity identifiers from source to target. See ``iter_paths``.
+        """
+        view = self._path_view(_relation_type_filter(relation_types))
+        return iter_paths(view, getattr(source, "identifier", source), getattr(target, "identifier", target),
+                          max_depth, max_paths)
+
+    def find_paths(self, source: BaseEntity | str, target: BaseEntity | str,
+                   max_depth: Optional[int] = None,
+                   max_paths: Optional[int] = None,
+                   relation_types: Optional[Iterable[RelationType | str]] = None) -> List[List[str]]:
+        """
+        Returns simple paths from source to target. Bounded queries (with max_depth or max_paths) are
+        cached until the relationships change; unbounded ones can be exponentially large and are not cached.
+        """
+        source_id, target_id = getattr(source, "identifier", source), getattr(target, "identifier", target)
+        relation_types = _relation_type_filter(relation_types)
+
+        def compute() -> Iterator[List[str]]:
+            return iter_paths(self._path_view(relation_types), source_id, target_id, max_depth, max_paths)
+
+        if max_depth is None and max_paths is None:
+            return list(compute())
+        return self._cached_paths(("paths", source_id, target_id, max_depth, max_paths, relation_types), compute)
+
+    def shortest_path(self, source: BaseEntity | str, target: BaseEntity | str,
+                      relation_types: Optional[Iterable[RelationType | str]] = None) -> Optional[List[str]]:
+        """
+        Returns a shortest path from source to target, or **None**, cached until the relationships change.
+        """
+        paths = self.k_shortest_paths(source, target, 1, relation_types)
+        return paths[0] if paths else None
 
-    def get_relationships_from(self, source: BaseEntity) -> List[StandardRelationship]:
+    def k_shortest_paths(self, source: BaseEntity | str, target: BaseEntity | str, k: int,
+                         relation_types: Optional[Iterable[RelationType | str]] = None) -> List[List[str]]:
         """
-        Returns all relationships where the given entity is the source.
+        Returns up to k shortest simple paths from source to target, cached until the relationships change.
         """
-        return [rel for rel in self.relationships if rel.source.identifier == source.identifier]
+        source_id, target_id = getattr(source, "identifier", source), getattr(target, "identifier", target)
+        relation_types = _relation_type_filter(relation_types)
+
+        def compute() -> List[List[str]]:
+            view = self._path_view(relation_types)
+            if k == 1:
+                path = shortest_path(view, source_id, target_id)
+                return [path] if path is not None else []
+            return k_shortest_paths(view, source_id, target_id, k)
 
-    def get_relationships_to(self, target: BaseEntity) -> List[StandardRelationship]:
+        return self._cached_paths(("shortest", source_id, target_id, k, relation_types), compute)
+
+    def _path_view(self, relation_types: Optional[frozenset]) -> "nx.DiGraph":
+        """
+        Returns the graph restricted to edges backed by at least one relationship of the given types.
         """
-        Returns all relationships where the given entity is the target.
+        graph = self.graph
+        if relation_types is None:
+            return graph
+        edges, types = self._edges, self._types
+        return nx.subgraph_view(graph, filter_edge=lambda u, v: any(
+            types[identifier] in relation_types for identifier in edges[u, v]))
+
+    def _cached_paths(self, key: tuple, compute) -> List[List[str]]:
+        if self._path_cache_version != self._version:
+            self._path_cache.clear()
+            self._path_cache_version = self._version
+        paths = self._path_cache.get(key)
+        if paths is None:
+            paths = tuple(tuple(path) for path in compute())
+            self._path_cache[key] = paths
+        return [list(path) for path in paths]
+
+    def get_relationship(self, identifier: str) -> Optional[StandardRelationship]:
         """
-        return [rel for rel in self.relationships if rel.target.identifier == target.identifier]
+        Returns the relationship with the given identifier, or **None**.
+        """
+        return self._relationships.get(identifier)
+
+    def get_relationships_from(self, source: BaseEntity,
+                               relation_type: Optional[RelationType | str] = None) -> List[StandardRelationship]:
+        """
+        Returns all relationships where the given entity is the source, optionally of one relation type.
+        """
+        if relation_type is None:
+            bucket = self._by_source.get(source.identifier, {})
+        else:
+            bucket = self._by_source_type.get((source.identifier, _relation_type_value(relation_type)), {})
+        return list(bucket.values())
+
+    def get_relationships_to(self, target: BaseEntity,
+                             relation_type: Optional[RelationType | str] = None) -> List[StandardRelationship]:
+        """
+        Returns all relationships where the given entity is the target, optionally of one relation type.
+        """
+        bucket = self._by_target.get(target.identifier, {})
+        if relation_type is None:
+            return list(bucket.values())
+        relation_type, types = _relation_type_value(relation_type), self._types
+        return [rel for rel in bucket.values() if types[rel.identifier] == relation_type]
+
+    def get_relationships_by_type(self, relation_type: RelationType | str) -> List[StandardRelationship]:
+        """
+        Returns all relationships of the given relation type.
+        """
+        return list(self._by_type.get(_relation_type_value(relation_type), {}).values())
 
     def get_all_relationships(self) -> List[StandardRelationship]:
-        return self.relationships
+        return list(self._relationships.values())
+
+    def iter_relationships(self) -> Iterator[StandardRelationship]:
+        """
+        Iterates over the managed relationships in insertion order without copying them.
+        """
+        return iter(self._relationships.values())
+
+    def _index(self, relationship: StandardRelationship, relation_type: str) -> None:
+        _index_add(self._by_source, relationship.source.identifier, relationship)
+        _index_add(self._by_target, relationship.target.identifier, relationship)
+        self._index_type(relationship, relation_type)
+
+    def _unindex(self, relationship: StandardRelationship, relation_type: str) -> None:
+        _index_remove(self._by_source, relationship.source.identifier, relationship)
+        _index_remove(self._by_target, relationship.target.identifier, relationship)
+        self._unindex_type(relationship, relation_type)
+
+    def _index_type(self, relationship: StandardRelationship, relation_type: str) -> None:
+        _index_add(self._by_type, relation_type, relationship)
+        _index_add(self._by_source_type, (relationship.source.identifier, relation_type), relationship)
+
+    def _unindex_type(self, relationship: StandardRelationship, relation_type: str) -> None:
+        _index_remove(self._by_type, relation_type, relationship)
+        _index_remove(self._by_source_type, (relationship.source.identifier, relation_type), relationship)
+
+    def _link(self, relationship: StandardRelationship) -> None:
+        key = (relationship.source.identifier, relationship.target.identifier)
+        edges = self._edges.get(key)
+        if edges is None:
+            edges = self._edges[key] = {}
+            for node in key:
+                self._degrees[node] = self._degrees.get(node, 0) + 1
+        edges[relationship.identifier] = relationship
+        if self._graph is not None:
+            self._graph.add_edge(*key, **_edge_attributes(relationship, self._types[relationship.identifier]))
+
+    def _unlink(self, relationship: StandardRelationship) -> None:
+        key = (relationship.source.identifier, relationship.target.identifier)
+        edges = self._edges[key]
+        del edges[relationship.identifier]
+        if edges:
+            self._refresh_edge(key)
+            return
+        del self._edges[key]
+        if self._graph is not None:
+            self._graph.remove_edge(*key)
+        for node in key:
+            self._degrees[node] -= 1
+            if not self._degrees[node]:
+                del self._degrees[node]
+                if self._graph is not None:
+                    self._graph.remove_node(node)
+
+    def _refresh_edge(self, key: tuple) -> None:
+        if self._graph is not None:
+            latest = next(reversed(self._edges[key].values()))
+            self._graph.edges[key].update(_edge_attributes(latest, self._types[latest.identifier]))
+
+
+class BulkOperationSummary:
+    """
+    Per-batch outcome of a bulk operation.
+
+    Attributes:
+        applied (int): Rows that were applied.
+        missing (int): Rows whose relationship identifier is not managed.
+        rejected (int): Rows that were malformed and skipped.
+    """
+
+    __slots__ = ("applied", "missing", "rejected")
+
+    def __init__(self, applied: int = 0, missing: int = 0, rejected: int = 0) -> None:
+        self.applied = applied
+        self.missing = missing
+        self.rejected = rejected
+
+    @property
+    def total(self) -> int:
+        return self.applied + self.missing + self.rejected
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"applied": self.applied, "missing": self.missing, "rejected": self.rejected}
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, BulkOperationSummary) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"BulkOperationSummary(applied={self.applied}, missing={self.missing}, rejected={self.rejected})"
 
 
 class RelationshipBulkManager:
     """
     Handles bulk operations for relationships.
+
+    Deletes and updates resolve rows through the manager's identifier index, so each batch
+    costs O(batch) regardless of how many relationships are managed. Creation resolves endpoints
+    through an EntityRegistry, so sources and targets may be given as entities or identifiers.
+
+    Without a registry, each bulk manager keeps its own ``EntityRegistry()``, as the serialization
+    and snapshot loaders do, so independent managers never swap in each other's entities. Pass a
+    shared registry to resolve identifiers of entities registered elsewhere.
     """
 
-    def __init__(self, relationship_manager: RelationshipManager):
+    def __init__(self, relationship_manager: RelationshipManager, registry: Optional[EntityRegistry] = None):
         self.manager = relationship_manager
+        self.registry = registry if registry is not None else EntityRegistry()
+
+    def resolve_entity(self, entity: BaseEntity | str) -> BaseEntity:
+        """
+        Returns the canonical registered entity for an entity or identifier.
+        Entities passed in are registered; unknown identifiers raise a ValueError.
+        """
+        if isinstance(entity, BaseEntity):
+            return self.registry.register(entity)
+        resolved = self.registry.get(entity)
+        if resolved is None:
+            raise ValueError(f"Unknown entity '{entity}'.")
+        return resolved
 
     def create_bulk(self, relationships_data: List[Dict[str, Any]]) -> List[StandardRelationship]:
         """
         Create multiple relationships in bulk.
-        Each dictionary in relationships_data should contain the keys required to instantiate a StandardRelationship.
+        Each dictionary in relationships_data should contain the keys required to instantiate a StandardRelationship;
+        'source' and 'target' may be entities or identifiers of registered entities.
         """
         created_relationships = []
+        resolve = self.resolve_entity
         for data in relationships_data:
             relationship = StandardRelationship(
-                identifier=data["identifier"],
-                source=data["source"],
+                identifier=EntityRegistry.intern(data["identifier"]),
+                source=resolve(data["source"]),
                 relation_type=data["relation_type"],
-                target=data["target"],
+                target=resolve(data["target"]),
                 label=data.get("label"),
                 description=data.get("description", ""),
                 sumo_class=data.get("sumo_class")
@@ -173,38 +608,53 @@ class RelationshipBulkManager:
             created_relationships.append(relationship)
         return created_relationships
 
-    def delete_bulk(self, identifiers: List[str]) -> None:
+    def delete_bulk(self, identifiers: Iterable[str]) -> BulkOperationSummary:
         """
         Delete relationships in bulk by their identifiers.
+        Deleted relationships are also detached from their source and target entities.
         """
-        self.manager.relationships = [
-            rel for rel in self.manager.relationships if rel.identifier not in identifiers
-        ]
-
-    def update_bulk(self, updates: List[Dict[str, Any]]) -> None:
+        summary = BulkOperationSummary()
+        # dict.fromkeys de-duplicates the batch while preserving its order.
+        for identifier in dict.fromkeys(identifiers):
+            rel = self.manager.remove_relationship(identifier)
+            if rel is None:
+                summary.missing += 1
+                continue
+            rel.detach()
+            summary.applied += 1
+        return summary
+
+    def update_bulk(self, updates: Iterable[Dict[str, Any]]) -> BulkOperationSummary:
         """
         Update multiple relationships in bulk.
         Each update dict must have an 'identifier' key to find the relationship,
-        along with the fields to update.
+        along with the fields to update. Updates without an identifier, or with a
+        relation type that is neither a RelationType nor a string, are rejected.
         """
+        summary = BulkOperationSummary()
         for update in updates:
-            for rel in self.manager.relationships:
-                if rel.identifier == update["identifier"]:
-                    if "label" in update:
-                        rel.label = update["label"]
-                    if "description" in update:
-                        rel.description = update["description"]
-                    if "relation_type" in update:
-                        new_relation_type = update["relation_type"]
-                        # Accept either a RelationType enum or string.
-                        if isinstance(new_relation_type, RelationType):
-                            rel.relation_type = new_relation_type.value
-                        else:
-                            rel.relation_type = new_relation_type
-                    # Additional updates can be handled similarly.
-
-
-def build_relationship_graph(relationships: List[StandardRelationship]) -> nx.DiGraph:
+            new_relation_type = update.get("relation_type")
+            if "identifier" not in update or (
+                    "relation_type" in update and not isinstance(new_relation_type, (RelationType, str))):
+                summary.rejected += 1
+                continue
+            rel = self.manager.get_relationship(update["identifier"])
+            if rel is None:
+                summary.missing += 1
+                continue
+            if "label" in update:
+                rel.label = update["label"]
+            if "description" in update:
+                rel.description = update["description"]
+            if "relation_type" in update:
+                # Accept either a RelationType enum or string.
+                self.manager.retype_relationship(rel, new_relation_type)
+            # Additional updates can be handled similarly.
+            summary.applied += 1
+        return summary
+
+
+def build_relationship_graph(relationships: List[StandardRelationship]) -> "nx.DiGraph":
     """
     Constructs a directed graph from a list of StandardRelationship instances.
     Nodes represent entity identifiers, and edges represent relationships (with attributes).
@@ -220,25 +670,92 @@ def build_relationship_graph(relationships: List[StandardRelationship]) -> nx.Di
     return graph
 
 
-def get_centrality(graph: nx.DiGraph) -> Dict[Any, float]:
+def get_centrality(graph: Any) -> Mapping[Any, float]:
     """
     Returns the degree centrality of nodes in the graph.
+    Given a RelationshipManager, returns its incrementally maintained centrality view instead;
+    given a RelationshipSnapshot, computes it vectorized over the snapshot's CSR arrays.
     """
+    # Checked by method rather than by isinstance(graph, nx.Graph), so networkx is not imported needlessly.
+    if hasattr(graph, "degree_centrality"):
+        return graph.degree_centrality()
     return nx.degree_centrality(graph)
 
 
-def find_paths(graph: nx.DiGraph, source_id: str, target_id: str) -> List[List[str]]:
+def _relation_type_filter(relation_types: Optional[Iterable[RelationType | str]]) -> Optional[frozenset]:
+    if relation_types is None:
+        return None
+    return frozenset(_relation_type_value(relation_type) for relation_type in relation_types)
+
+
+def _filtered_graph(graph: "nx.DiGraph", relation_types: Optional[frozenset]) -> "nx.DiGraph":
     """
-    Returns all simple paths between source and target entity identifiers.
+    Returns a lazy subgraph view keeping only edges whose relation type is in relation_types.
     """
+    if relation_types is None:
+        return graph
+    return nx.subgraph_view(graph, filter_edge=lambda u, v: graph.edges[u, v]["relation_type"] in relation_types)
+
+
+def iter_paths(graph: "nx.DiGraph", source_id: str, target_id: str,
+               max_depth: Optional[int] = None,
+               max_paths: Optional[int] = None,
+               relation_types: Optional[Iterable[RelationType | str]] = None) -> Iterator[List[str]]:
+    """
+    Lazily yields simple paths between source and target entity identifiers.
+
+    :param max_depth: Maximum number of edges in a path.
+    :param max_paths: Maximum number of paths to yield.
+    :param relation_types: Only follow edges of these relation types.
+    """
+    view = _filtered_graph(graph, _relation_type_filter(relation_types))
+    if source_id not in view or target_id not in view:
+        return iter(())
+    return islice(nx.all_simple_paths(view, source=source_id, target=target_id, cutoff=max_depth), max_paths)
+
+
+def find_paths(graph: "nx.DiGraph", source_id: str, target_id: str,
+               max_depth: Optional[int] = None,
+               max_paths: Optional[int] = None,
+               relation_types: Optional[Iterable[RelationType | str]] = None) -> List[List[str]]:
+    """
+    Returns simple paths between source and target entity identifiers.
+    Without bounds every simple path is enumerated; prefer setting max_depth or max_paths on large graphs.
+    """
+    return list(iter_paths(graph, source_id, target_id, max_depth, max_paths, relation_types))
+
+
+def shortest_path(graph: "nx.DiGraph", source_id: str, target_id: str,
+                  relation_types: Optional[Iterable[RelationType | str]] = None) -> Optional[List[str]]:
+    """
+    Returns a shortest path between source and target entity identifiers using bidirectional BFS,
+    or **None** if there is no path.
+    """
+    view = _filtered_graph(graph, _relation_type_filter(relation_types))
+    try:
+        return nx.bidirectional_shortest_path(view, source_id, target_id)
+    except (nx.NetworkXNoPath, nx.NodeNotFound):
+        return None
+
+
+def k_shortest_paths(graph: "nx.DiGraph", source_id: str, target_id: str, k: int,
+                     relation_types: Optional[Iterable[RelationType | str]] = None) -> List[List[str]]:
+    """
+    Returns up to k shortest simple paths between source and target entity identifiers, shortest first.
+    """
+    view = _filtered_graph(graph, _relation_type_filter(relation_types))
+    if source_id not in view or target_id not in view:
+        return []
     try:
-        return list(nx.all_simple_paths(graph, source=source_id, target=target_id))
+        return list(islice(nx.shortest_simple_paths(view, source_id, target_id), k))
     except nx.NetworkXNoPath:
         return []
 
 
 __all__ = [
     "RelationType", "StandardRelationship",
-    "RelationshipManager", "RelationshipBulkManager",
-    "build_relationship_graph", "get_centrality", "find_paths"
+    "RelationshipManager", "RelationshipBulkManager", "BulkOperationSummary",
+    "DegreeCentrality",
+    "build_relationship_graph", "get_centrality", "find_paths",
+    "iter_paths", "shortest_path", "k_shortest_paths"
 ]
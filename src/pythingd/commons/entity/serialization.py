@@ -0,0 +1,229 @@
+"""
+Module: serialization.py
+
+Streaming export and import of whole relationship graphs as NDJSON or XML.
+
+Writers emit one record per entity and per relationship straight to a file object, so memory use
+does not grow with the size of the graph. Readers rebuild a RelationshipManager incrementally,
+parsing NDJSON line by line and XML with ``iterparse``, and resolve relationship endpoints in
+batches so that callers backed by a database or service can fetch entities many at a time.
+
+Both formats share the same records:
+
+- entity: identifier, label, description, sumo_class
+- relationship: identifier, source, relation_type, target, label, description, sumo_class
+
+Identifiers are written as strings.
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, Iterable, IO, List, Mapping, Optional
+
+from src.pythingd.__base__ import BaseEntity, EntityRegistry
+from src.pythingd.commons.entity.relations import RelationshipManager, StandardRelationship
+
+# Builds an entity from an entity record.
+EntityFactory = Callable[[Dict[str, Any]], BaseEntity]
+# Resolves a batch of entity identifiers to entities; identifiers it cannot resolve are omitted.
+EntityResolver = Callable[[List[str]], Mapping[str, BaseEntity]]
+
+
+def _entity_record(entity: BaseEntity) -> Dict[str, Any]:
+    return {
+        "identifier": str(entity.identifier),
+        "label": str(entity.label),
+        "description": entity.description,
+        "sumo_class": entity.sumo_class,
+    }
+
+
+def _relationship_record(relationship: StandardRelationship) -> Dict[str, Any]:
+    return {
+        "identifier": str(relationship.identifier),
+        "source": str(relationship.source.identifier),
+        "relation_type": relationship.relation_type,
+        "target": str(relationship.target.identifier),
+        "label": str(relationship.label),
+        "description": relationship.description,
+        "sumo_class": relationship.sumo_class,
+    }
+
+
+def write_ndjson(manager: RelationshipManager, fp: IO[str],
+                 entities: Optional[Iterable[BaseEntity]] = None) -> int:
+    """
+    Writes entities, then every relationship in the manager, as one JSON object per line.
+
+    :param manager: The relationships to export.
+    :param fp: A text file object to write to.
+    :param entities: Optional entities to export ahead of the relationships.
+    :return: The number of records written.
+    """
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    count = 0
+    for entity in entities or ():
+        record = _entity_record(entity)
+        record["kind"] = "entity"
+        fp.write(encode(record))
+        fp.write("\n")
+        count += 1
+    for relationship in manager.iter_relationships():
+        record = _relationship_record(relationship)
+        record["kind"] = "relationship"
+        fp.write(encode(record))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def write_xml(manager: RelationshipManager, fp: IO[str],
+              entities: Optional[Iterable[BaseEntity]] = None) -> int:
+    """
+    Writes entities, then every relationship in the manager, as flat ``Entity`` and ``Relationship``
+    elements under a ``RelationshipGraph`` root. Each record is serialized on its own.
+
+    :param manager: The relationships to export.
+    :param fp: A text file object to write to.
+    :param entities: Optional entities to export ahead of the relationships.
+    :return: The number of records written.
+    """
+    count = 0
+    fp.write('<?xml version="1.0" encoding="utf-8"?>\n<RelationshipGraph>\n')
+    for entity in entities or ():
+        fp.write(_record_to_xml("Entity", _entity_record(entity)))
+        count += 1
+    for relationship in manager.iter_relationships():
+        fp.write(_record_to_xml("Relationship", _relationship_record(relationship)))
+        count += 1
+    fp.write("</RelationshipGraph>\n")
+    return count
+
+
+def _record_to_xml(tag: str, record: Dict[str, Any]) -> str:
+    root = ET.Element(tag)
+    for key, value in record.items():
+        ET.SubElement(root, key).text = str(value)
+    return ET.tostring(root, encoding="unicode") + "\n"
+
+
+class _GraphLoader:
+    """
+    Accumulates parsed records and adds relationships to a manager in batches, resolving
+    any endpoints not yet known with one resolver call per batch.
+    """
+
+    def __init__(self,
+                 manager: RelationshipManager,
+                 entities: Optional[Mapping[str, BaseEntity]],
+                 entity_factory: Optional[EntityFactory],
+                 resolver: Optional[EntityResolver],
+                 registry: Optional[EntityRegistry],
+                 batch_size: int) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        self.manager = manager
+        self.registry = registry if registry is not None else EntityRegistry()
+        # Strong references for the duration of the load, in case the registry is weak.
+        self._loaded: List[BaseEntity] = [self.registry.register(entity) for entity in (entities or {}).values()]
+        self.entity_factory = entity_factory
+        self.resolver = resolver
+        self.batch_size = batch_size
+        self._pending: List[Dict[str, Any]] = []
+
+    def add(self, kind: str, record: Dict[str, Any]) -> None:
+        if kind == "entity":
+            if self.entity_factory is not None and record["identifier"] not in self.registry:
+                self._loaded.append(self.registry.register(self.entity_factory(record)))
+        elif kind == "relationship":
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+        else:
+            raise ValueError(f"Unknown record kind '{kind}'.")
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        registry = self.registry
+        if self.resolver is not None:
+            unknown = {endpoint for record in self._pending for endpoint in (record["source"], record["target"])
+                       if endpoint not in registry}
+            if unknown:
+                for entity in self.resolver(list(unknown)).values():
+                    self._loaded.append(registry.register(entity))
+        for record in self._pending:
+            try:
+                source, target = registry[record["source"]], registry[record["target"]]
+            except KeyError as missing:
+                raise ValueError(f"Cannot resolve entity {missing} for relationship '{record['identifier']}'.")
+            self.manager.add_relationship(StandardRelationship(
+                identifier=EntityRegistry.intern(record["identifier"]),
+                source=source,
+                relation_type=record["relation_type"],
+                target=target,
+                label=record.get("label"),
+                description=record.get("description") or "",
+                sumo_class=record.get("sumo_class")
+            ))
+        self._pending.clear()
+
+
+def read_ndjson(fp: IO[str],
+                manager: Optional[RelationshipManager] = None,
+                entities: Optional[Mapping[str, BaseEntity]] = None,
+                entity_factory: Optional[EntityFactory] = None,
+                resolver: Optional[EntityResolver] = None,
+                registry: Optional[EntityRegistry] = None,
+                batch_size: int = 1000) -> RelationshipManager:
+    """
+    Rebuilds relationships from an NDJSON stream written by ``write_ndjson``, one line at a time.
+
+    Relationship endpoints are looked up in ``registry`` (which also receives ``entities``), then
+    in entities built from entity records by ``entity_factory``, then resolved in batches of
+    ``batch_size`` through ``resolver``. Every entity found is registered, so each identifier
+    maps to a single entity.
+
+    :return: The manager the relationships were added to.
+    """
+    manager = manager if manager is not None else RelationshipManager()
+    loader = _GraphLoader(manager, entities, entity_factory, resolver, registry, batch_size)
+    for line in fp:
+        if line.strip():
+            record = json.loads(line)
+            loader.add(record.pop("kind"), record)
+    loader.flush()
+    return manager
+
+
+def read_xml(source: str | IO,
+             manager: Optional[RelationshipManager] = None,
+             entities: Optional[Mapping[str, BaseEntity]] = None,
+             entity_factory: Optional[EntityFactory] = None,
+             resolver: Optional[EntityResolver] = None,
+             registry: Optional[EntityRegistry] = None,
+             batch_size: int = 1000) -> RelationshipManager:
+    """
+    Rebuilds relationships from an XML document written by ``write_xml`` using ``iterparse``,
+    discarding each element once it has been read. Endpoints are resolved as in ``read_ndjson``.
+
+    :param source: A file name or file object.
+    :return: The manager the relationships were added to.
+    """
+    manager = manager if manager is not None else RelationshipManager()
+    loader = _GraphLoader(manager, entities, entity_factory, resolver, registry, batch_size)
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = elem
+            continue
+        if event == "end" and elem.tag in ("Entity", "Relationship"):
+            # ElementTree reads an empty element's text as None; it was written from an empty string.
+            loader.add(elem.tag.lower(), {child.tag: child.text or "" for child in elem})
+            root.clear()
+    loader.flush()
+    return manager
+
+
+__all__ = ["write_ndjson", "read_ndjson", "write_xml", "read_xml",
+           "EntityFactory", "EntityResolver"]
@@ -0,0 +1,191 @@
+"""
+Module: snapshot.py
+
+Compact, array-backed snapshots of relationship graphs for analytics over large relationship sets.
+
+A RelationshipSnapshot interns entity identifiers and relation types to integer codes and stores
+adjacency as SciPy CSR arrays for both directions, using a few bytes per edge instead of the nested
+dictionaries of a networkx graph. Results computed on a snapshot are NumPy arrays indexed by node
+code and can be mapped back to entity identifiers.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from src.pythingd.commons.entity.relations import RelationType, StandardRelationship, _relation_type_value
+
+
+def _index_dtype(size: int) -> np.dtype:
+    return np.dtype(np.int32) if size < np.iinfo(np.int32).max else np.dtype(np.int64)
+
+
+class RelationshipSnapshot:
+    """
+    An immutable, CSR-backed snapshot of a set of relationships.
+
+    Attributes:
+        node_ids (List[Any]): Entity identifiers, indexed by node code.
+        relation_types (List[str]): Relation type values, indexed by relation type code.
+        out_adjacency (sparse.csr_array): Source-by-target counts of relationships.
+        in_adjacency (sparse.csr_array): Target-by-source counts of relationships.
+        edge_sources, edge_targets, edge_types (np.ndarray): Per-relationship node and type codes,
+            ordered by source then target.
+        edge_ids (List[Any]): Relationship identifiers in the same order as the edge arrays.
+    """
+
+    __slots__ = ("node_ids", "relation_types", "out_adjacency", "in_adjacency",
+                 "edge_sources", "edge_targets", "edge_types", "edge_ids",
+                 "_node_index", "_type_index")
+
+    def __init__(self,
+                 node_ids: List[Any],
+                 relation_types: List[str],
+                 edge_sources: np.ndarray,
+                 edge_targets: np.ndarray,
+                 edge_types: np.ndarray,
+                 edge_ids: List[Any]) -> None:
+        """
+        Initializes a snapshot from interned node ids and per-relationship code arrays.
+        Edges are expected to be sorted by source then target; see ``from_relationships``.
+        """
+        self.node_ids = node_ids
+        self.relation_types = relation_types
+        self.edge_sources = edge_sources
+        self.edge_targets = edge_targets
+        self.edge_types = edge_types
+        self.edge_ids = edge_ids
+        self._node_index: Dict[Any, int] = {node: code for code, node in enumerate(node_ids)}
+        self._type_index: Dict[str, int] = {value: code for code, value in enumerate(relation_types)}
+        self.out_adjacency = self._adjacency(np.ones(len(edge_ids), dtype=np.int32))
+        self.in_adjacency = self.out_adjacency.T.tocsr()
+
+    @classmethod
+    def from_relationships(cls, relationships: Iterable[StandardRelationship]) -> "RelationshipSnapshot":
+        """
+        Builds a snapshot from relationships, interning entity identifiers and relation types.
+        """
+        node_index: Dict[Any, int] = {}
+        type_index: Dict[str, int] = {}
+        sources: List[int] = []
+        targets: List[int] = []
+        types: List[int] = []
+        edge_ids: List[Any] = []
+        for rel in relationships:
+            sources.append(node_index.setdefault(rel.source.identifier, len(node_index)))
+            targets.append(node_index.setdefault(rel.target.identifier, len(node_index)))
+            types.append(type_index.setdefault(rel.relation_type, len(type_index)))
+            edge_ids.append(rel.identifier)
+
+        dtype = _index_dtype(len(node_index))
+        edge_sources = np.asarray(sources, dtype=dtype)
+        edge_targets = np.asarray(targets, dtype=dtype)
+        order = np.lexsort((edge_targets, edge_sources))
+        return cls(node_ids=list(node_index),
+                   relation_types=list(type_index),
+                   edge_sources=edge_sources[order],
+                   edge_targets=edge_targets[order],
+                   edge_types=np.asarray(types, dtype=np.int16 if len(type_index) < 2 ** 15 else np.int32)[order],
+                   edge_ids=[edge_ids[i] for i in order])
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_ids)
+
+    def __len__(self) -> int:
+        return self.node_count
+
+    def __contains__(self, identifier: Any) -> bool:
+        return identifier in self._node_index
+
+    def index_of(self, identifier: Any) -> int:
+        """
+        Returns the node code of an entity identifier.
+        """
+        return self._node_index[identifier]
+
+    def identifiers(self, codes: Iterable[int]) -> List[Any]:
+        """
+        Maps node codes back to entity identifiers.
+        """
+        node_ids = self.node_ids
+        return [node_ids[code] for code in codes]
+
+    def to_dict(self, values: np.ndarray) -> Dict[Any, Any]:
+        """
+        Maps a per-node result array back to a dictionary keyed by entity identifier.
+        """
+        return dict(zip(self.node_ids, values.tolist()))
+
+    def adjacency(self, relation_types: Optional[Iterable[RelationType | str]] = None,
+                  incoming: bool = False) -> sparse.csr_array:
+        """
+        Returns the CSR adjacency, optionally restricted to relationships of the given types.
+        Entries count the relationships between each pair of entities.
+        """
+        if relation_types is None:
+            return self.in_adjacency if incoming else self.out_adjacency
+        codes = [self._type_index[value] for value in map(_relation_type_value, relation_types)
+                 if value in self._type_index]
+        adjacency = self._adjacency(np.isin(self.edge_types, codes).astype(np.int32))
+        adjacency.eliminate_zeros()
+        return adjacency.T.tocsr() if incoming else adjacency
+
+    def successors(self, identifier: Any) -> List[Any]:
+        """
+        Returns the identifiers of entities the given entity has relationships to.
+        """
+        return self._neighbours(self.out_adjacency, identifier)
+
+    def predecessors(self, identifier: Any) -> List[Any]:
+        """
+        Returns the identifiers of entities with relationships to the given entity.
+        """
+        return self._neighbours(self.in_adjacency, identifier)
+
+    def out_degree(self) -> np.ndarray:
+        """
+        Returns the number of distinct successors of each node.
+        """
+        return np.diff(self.out_adjacency.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        """
+        Returns the number of distinct predecessors of each node.
+        """
+        return np.diff(self.in_adjacency.indptr)
+
+    def degree_centrality_array(self) -> np.ndarray:
+        """
+        Returns the degree centrality of each node, indexed by node code.
+        Parallel relationships count once, matching ``nx.degree_centrality`` on ``build_relationship_graph``.
+        """
+        degree = (self.out_degree() + self.in_degree()).astype(np.float64)
+        if self.node_count > 1:
+            degree /= self.node_count - 1.0
+        return degree
+
+    def degree_centrality(self) -> Dict[Any, float]:
+        """
+        Returns the degree centrality of each node keyed by entity identifier.
+        """
+        return self.to_dict(self.degree_centrality_array())
+
+    def _adjacency(self, weights: np.ndarray) -> sparse.csr_array:
+        size = self.node_count
+        return sparse.csr_array((weights, (self.edge_sources, self.edge_targets)), shape=(size, size))
+
+    def _neighbours(self, adjacency: sparse.csr_array, identifier: Any) -> List[Any]:
+        code = self._node_index[identifier]
+        return self.identifiers(adjacency.indices[adjacency.indptr[code]:adjacency.indptr[code + 1]])
+
+    def __repr__(self) -> str:
+        return f"RelationshipSnapshot(nodes={self.node_count}, edges={self.edge_count})"
+
+
+__all__ = ["RelationshipSnapshot"]
@@ -1,3 +1,36 @@
 """
-TODO: Package docs
-"""
\ No newline at end of file
+Foundational concepts: time, quantities and space.
+
+Classes are imported from their modules on first access, so using TimePoint does not load Pint or Shapely.
+"""
+
+from src.pythingd.utils.lazy import lazy_exports
+
+_TIME = "src.pythingd.commons.foundational.time"
+_QUANTITY = "src.pythingd.commons.foundational.quantity"
+_SPACE = "src.pythingd.commons.foundational.space"
+_SPATIAL_JOIN = "src.pythingd.commons.foundational.spatial_join"
+
+_EXPORTS = {
+    "TimePoint": _TIME,
+    "FuzzyTimePoint": _TIME,
+    "TimeInterval": _TIME,
+    "Quantity": _QUANTITY,
+    "DerivedQuantity": _QUANTITY,
+    "QuantityValue": _QUANTITY,
+    "QuantityArray": _QUANTITY,
+    "Point": _SPACE,
+    "PointCollection": _SPACE,
+    "PointIndex": _SPACE,
+    "SpatialRegion": _SPACE,
+    "SpatialVolume": _SPACE,
+    "VolumeCollection": _SPACE,
+    "BoundingVolumeHierarchy": _SPACE,
+    "SpatialIndex": _SPACE,
+    "spatial_join": _SPATIAL_JOIN,
+    "iter_spatial_join": _SPATIAL_JOIN,
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = list(_EXPORTS)
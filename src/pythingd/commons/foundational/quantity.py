@@ -1,14 +1,120 @@
 """
 TODO: Module docs for Quantity
 """
+from functools import lru_cache
 from uuid import UUID, uuid4
 
-from pint import UnitRegistry
-
 from src.pythingd.__base__ import BaseAbstractEntity
+from src.pythingd.utils.lazy import lazy_import
+
+# NumPy and Pint are imported on first use; building the unit registry alone takes a few hundred ms.
+np = lazy_import("numpy")
+
+# Upper bound on the number of distinct unit strings and units kept in the parse caches.
+UNIT_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=None)
+def get_registry():
+    """
+    Returns the shared Pint unit registry, creating it on first use.
+    """
+    from pint import UnitRegistry
+    return UnitRegistry()
+
+
+def __getattr__(name):
+    # Keeps ``quantity.ureg`` working without building the registry at import time.
+    if name == "ureg":
+        return get_registry()
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def parse_unit(unit: str):
+    """
+    Parses a unit expression once and caches the result.
+
+    Returns:
+      The Pint quantity for the expression, usually with a magnitude of 1 (e.g. ``ureg('meter')``).
+    """
+    return get_registry()(unit)
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def _unit_label(units) -> str:
+    return f"{units} quantity"
+
+
+def _as_units(unit):
+    """Returns the Pint unit for a unit string or Pint unit."""
+    return parse_unit(unit).units if isinstance(unit, str) else unit
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def _conversion_factor(source, target):
+    registry = get_registry()
+    offset = registry.Quantity(0.0, source).m_as(target)
+    if offset:
+        # Offset units: the scale is the ratio of the delta units' root factors, as ``f(1) - f(0)``
+        # would cancel the offset in floating point and lose precision.
+        scale = registry.get_root_units(source)[0] / registry.get_root_units(target)[0]
+    else:
+        scale = registry.Quantity(1.0, source).m_as(target)
+    # Check a third point so that non-affine conversions (e.g. logarithmic units) fall back to Pint.
+    probe = registry.Quantity(10.0, source).m_as(target)
+    if not np.isclose(probe, 10.0 * scale + offset, rtol=1e-12, atol=1e-12):
+        return None
+    return scale, offset
+
+
+def conversion_factor(source_unit, target_unit):
+    """
+    Returns the cached (scale, offset) such that ``target = source * scale + offset``.
+
+    Offset units such as degrees Celsius or Fahrenheit have a non-zero offset.
+    Returns None for conversions that are not affine (e.g. logarithmic units).
+    Raises a Pint DimensionalityError for incompatible units.
+    """
+    return _conversion_factor(_as_units(source_unit), _as_units(target_unit))
+
+
+def convert_magnitudes(values, source_unit, target_unit):
+    """
+    Converts an array of magnitudes between units with a single multiply-add.
+
+    Parameters:
+      - values: An iterable or array of magnitudes in source_unit.
+      - source_unit, target_unit: Unit strings or Pint units.
+
+    Returns:
+      A NumPy array of magnitudes in target_unit.
+    """
+    source, target = _as_units(source_unit), _as_units(target_unit)
+    values = np.asarray(values, dtype=float)
+    if source == target:
+        return values.copy()
+    factor = _conversion_factor(source, target)
+    if factor is None:
+        return get_registry().Quantity(values, source).m_as(target)
+    scale, offset = factor
+    converted = values * scale
+    if offset:
+        converted += offset
+    return converted
+
+
+def _convert_magnitude(magnitude, source, target):
+    factor = _conversion_factor(source, target)
+    if factor is None:
+        return get_registry().Quantity(magnitude, source).m_as(target)
+    scale, offset = factor
+    return magnitude * scale + offset
+
 
-# Initialize the Pint unit registry.
-ureg = UnitRegistry()
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def _base_units(units):
+    return get_registry().Quantity(1.0, units).to_base_units().units
 
 
 class Quantity(BaseAbstractEntity):
@@ -17,18 +123,50 @@ class Quantity(BaseAbstractEntity):
     Uses Pint internally to manage numerical values and units.
     """
 
+    __slots__ = ("_quantity",)
+
     def __init__(self, value, unit,
-                 identifier: str | UUID = uuid4()):
+                 identifier: str | UUID = None):
         """
         Initializes a Quantity.
 
         Parameters:
           - value: The numerical magnitude.
           - unit: A string or Pint unit defining the measurement unit.
+          - identifier: A unique identifier (a UUID is allocated on first access if None).
         """
         super().__init__(identifier=identifier, label=str(unit) + " quantity", description="A quantity with a unit.",
                          sumo_class="Quantity")  # TODO: Check inputs and SUMO class
-        self._quantity = value * ureg(unit)
+        Q = get_registry().Quantity
+        if isinstance(unit, str):
+            parsed = parse_unit(unit)
+            # Plain units build directly; expressions with a factor (e.g. '10 m') are multiplied as before.
+            self._quantity = Q(value, parsed.units) if parsed.magnitude == 1 else value * parsed
+        else:
+            self._quantity = Q(value, unit)
+
+    @classmethod
+    def _from_pint(cls, quantity, identifier: str | UUID = None):
+        """
+        Builds an instance directly from a Pint quantity, without parsing unit strings.
+        """
+        instance = cls.__new__(cls)
+        BaseAbstractEntity.__init__(instance, identifier=identifier,
+                                    label=_unit_label(quantity.units), description="A quantity with a unit.",
+                                    sumo_class="Quantity")
+        instance._quantity = quantity
+        return instance
+
+    @property
+    def identifier(self) -> str | UUID:
+        """Returns the identifier, allocating a unique UUID on first access if none was given."""
+        if self._identifier is None:
+            self._identifier = uuid4()
+        return self._identifier
+
+    def to_value(self):
+        """Returns a lightweight QuantityValue with the same magnitude and unit."""
+        return QuantityValue._from_pint(self._quantity)
 
     @property
     def magnitude(self):
@@ -50,21 +188,21 @@ class Quantity(BaseAbstractEntity):
         Returns:
           A new Quantity instance in the requested unit.
         """
-        converted = self._quantity.to(new_unit)
-        return Quantity(converted.magnitude, str(converted.units))
+        new_unit = _as_units(new_unit)
+        quantity = self._quantity
+        magnitude = _convert_magnitude(quantity.magnitude, quantity.units, new_unit)
+        return Quantity._from_pint(get_registry().Quantity(magnitude, new_unit))
 
     def __add__(self, other):
         """Adds two quantities if they are compatible."""
         if isinstance(other, Quantity):
-            result = self._quantity + other._quantity
-            return Quantity(result.magnitude, str(result.units))
+            return Quantity._from_pint(self._quantity + other._quantity)
         return NotImplemented
 
     def __sub__(self, other):
         """Subtracts one quantity from another if they are compatible."""
         if isinstance(other, Quantity):
-            result = self._quantity - other._quantity
-            return Quantity(result.magnitude, str(result.units))
+            return Quantity._from_pint(self._quantity - other._quantity)
         return NotImplemented
 
     def __mul__(self, other):
@@ -73,11 +211,9 @@ class Quantity(BaseAbstractEntity):
         or by another Quantity.
         """
         if isinstance(other, (int, float)):
-            result = self._quantity * other
-            return Quantity(result.magnitude, str(result.units))
+            return Quantity._from_pint(self._quantity * other)
         elif isinstance(other, Quantity):
-            result = self._quantity * other._quantity
-            return Quantity(result.magnitude, str(result.units))
+            return Quantity._from_pint(self._quantity * other._quantity)
         return NotImplemented
 
     def __truediv__(self, other):
@@ -86,11 +222,9 @@ class Quantity(BaseAbstractEntity):
         or by another Quantity.
         """
         if isinstance(other, (int, float)):
-            result = self._quantity / other
-            return Quantity(result.magnitude, str(result.units))
+            return Quantity._from_pint(self._quantity / other)
         elif isinstance(other, Quantity):
-            result = self._quantity / other._quantity
-            return Quantity(result.magnitude, str(result.units))
+            return Quantity._from_pint(self._quantity / other._quantity)
         return NotImplemented
 
     def __repr__(self):
@@ -105,6 +239,8 @@ class DerivedQuantity(Quantity):
     on base quantities. This class inspects the dimensionality (*via Pint*) and
     maps it to a known friendly name.
     """
+
+    __slots__ = ()
     # Map from a frozenset of (dimension, exponent) pairs to a derived unit name.
     # For example, velocity in Pint has dimensionality {'[length]': 1, '[time]': -1}.
     DERIVED_UNIT_NAMES = {
@@ -113,30 +249,570 @@ class DerivedQuantity(Quantity):
         frozenset({('length', 1), ('time', -2)}): "acceleration",
         frozenset({('length', 2)}): "area",
         frozenset({('length', 3)}): "volume",
-        # Additional mappings can be added here as needed.
+        # Additional mappings can be added with register_derived_unit().
     }
 
     def __init__(self, value, unit):
         super().__init__(value, unit)
 
+    @classmethod
+    def from_quantity(cls, quantity):
+        """
+        Returns a DerivedQuantity sharing the value and unit of an existing Quantity.
+        """
+        return cls._from_pint(quantity._quantity)
+
+    @classmethod
+    def register_derived_unit(cls, name, dimensions):
+        """
+        Registers a friendly name for a dimensionality.
+
+        Parameters:
+          - name: The friendly name, e.g. "force".
+          - dimensions: A unit (string or Pint unit) of that kind, e.g. 'newton', or a mapping
+            of dimension to exponent, e.g. {'mass': 1, 'length': 1, 'time': -2}.
+        """
+        if isinstance(dimensions, dict):
+            key = frozenset((dimension.strip('[]'), power) for dimension, power in dimensions.items())
+        else:
+            key = _dimensionality(_as_units(dimensions))[0]
+        cls.DERIVED_UNIT_NAMES[key] = name
+
+    @classmethod
+    def derived_unit_name(cls, unit):
+        """
+        Returns the friendly derived unit name for a unit (string or Pint unit), using cached dimensionality.
+        If the dimensionality is not recognized, returns a string representation of it.
+        """
+        key, description = _dimensionality(_as_units(unit))
+        return cls.DERIVED_UNIT_NAMES.get(key, description)
+
+    @classmethod
+    def classify(cls, quantities):
+        """
+        Groups quantities by derived kind in one pass, without creating DerivedQuantity instances.
+
+        Parameters:
+          - quantities: An iterable of Quantity, QuantityValue or QuantityArray instances.
+
+        Returns:
+          A dict mapping each derived unit name to the list of quantities of that kind.
+        """
+        names = cls.DERIVED_UNIT_NAMES
+        buckets = {}
+        for quantity in quantities:
+            key, description = _dimensionality(quantity.unit)
+            buckets.setdefault(names.get(key, description), []).append(quantity)
+        return buckets
+
     def get_derived_unit_name(self):
         """
         Inspects the quantity's dimensionality and returns a friendly derived unit name.
         If the dimensionality is not recognized, returns a string representation of it.
         :return: A human-friendly name for the derived unit **or** a string representation.
         """
-        # Get the dimensionality from the internal Pint quantity.
-        # Pint returns a dict like {'[length]': 1, '[time]': -1} for velocity.
-        dim = self._quantity.dimensionality
+        return self.derived_unit_name(self._quantity.units)
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def _dimensionality(units):
+    """
+    Returns the dimensionality of a unit as a frozenset of (dimension, exponent) pairs, along
+    with its string representation, e.g. ``frozenset({('length', 1), ('time', -1)})`` and
+    ``"{'length': 1, 'time': -1}"`` for velocity.
+    """
+    # Pint returns a dict like {'[length]': 1, '[time]': -1}; strip the square brackets from the keys.
+    normalized = {key.strip('[]'): power for key, power in units.dimensionality.items()}
+    return frozenset(normalized.items()), str(normalized)
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def _shared_units(units):
+    """Returns one canonical instance per unit, since Pint allocates a new Unit on every ``.units`` access."""
+    return units
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def _is_multiplicative(units):
+    """
+    Returns True if zero in the unit is zero in its root units, i.e. the unit has no offset (as
+    degrees Celsius do) and is not logarithmic. Only such units may skip Pint's arithmetic checks.
+    """
+    return get_registry().Quantity(0.0, units).to_root_units().magnitude == 0
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def _delta_units(units):
+    """
+    Returns the unit of a difference of two values in the given unit: ``delta_degree_Celsius``
+    for degrees Celsius, and the unit itself for multiplicative units.
+    """
+    if _is_multiplicative(units):
+        return units
+    zero = get_registry().Quantity(0.0, units)
+    return (zero - zero).units
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def _multiply_units(first, second):
+    return first * second
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def _divide_units(first, second):
+    return first / second
+
+
+def _as_pint(quantity):
+    """Returns the Pint quantity behind a Quantity or QuantityValue."""
+    if isinstance(quantity, QuantityValue):
+        return quantity._pint()
+    return quantity._quantity
+
+
+class QuantityValue:
+    """
+    A lightweight, immutable and hashable quantity for arithmetic-heavy code.
+
+    Stores only a magnitude and a shared Pint unit, with none of the entity state of a Quantity.
+    Equality and hashing compare magnitude and unit exactly (``1 m != 100 cm``); ordering
+    comparisons convert units. A unique identifier is allocated only when first requested, and
+    ``to_quantity()`` promotes the value to a full Quantity entity when it joins the graph.
+    """
+
+    __slots__ = ("_magnitude", "_units", "_identifier")
+
+    def __init__(self, value, unit):
+        """
+        Initializes a QuantityValue.
 
-        # Normalize by stripping the square brackets from the keys.
-        normalized = {key.strip('[]'): power for key, power in dim.items()}
+        Parameters:
+          - value: The numerical magnitude.
+          - unit: A string or Pint unit defining the measurement unit.
+        """
+        if isinstance(unit, str):
+            parsed = parse_unit(unit)
+            if parsed.magnitude != 1:
+                value = value * parsed.magnitude
+            unit = parsed.units
+        object.__setattr__(self, "_magnitude", value)
+        object.__setattr__(self, "_units", _shared_units(unit))
+        object.__setattr__(self, "_identifier", None)
+
+    @classmethod
+    def _make(cls, magnitude, units):
+        value = cls.__new__(cls)
+        object.__setattr__(value, "_magnitude", magnitude)
+        object.__setattr__(value, "_units", units)
+        object.__setattr__(value, "_identifier", None)
+        return value
+
+    @classmethod
+    def _from_pint(cls, quantity):
+        return cls._make(quantity.magnitude, _shared_units(quantity.units))
+
+    @classmethod
+    def from_quantity(cls, quantity):
+        """Returns the QuantityValue of a Quantity."""
+        return cls._from_pint(quantity._quantity)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QuantityValue is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("QuantityValue is immutable.")
+
+    @property
+    def magnitude(self):
+        """Returns the numerical value (magnitude) of the quantity."""
+        return self._magnitude
+
+    @property
+    def unit(self):
+        """Returns the unit of the quantity."""
+        return self._units
+
+    @property
+    def identifier(self) -> UUID:
+        """Returns a unique identifier, allocated on first access."""
+        if self._identifier is None:
+            object.__setattr__(self, "_identifier", uuid4())
+        return self._identifier
 
-        # Convert the normalized dict to a frozenset of (dimension, exponent) pairs.
-        key_frozen = frozenset(normalized.items())
+    def to_quantity(self, identifier: str | UUID = None):
+        """
+        Promotes the value to a full Quantity entity.
+
+        Parameters:
+          - identifier: The entity identifier; defaults to this value's identifier.
+        """
+        return Quantity._from_pint(get_registry().Quantity(self._magnitude, self._units),
+                                   identifier=identifier if identifier is not None else self.identifier)
+
+    def _pint(self):
+        return get_registry().Quantity(self._magnitude, self._units)
+
+    def to(self, new_unit):
+        """
+        Converts the value to a new unit.
+
+        Returns:
+          A new QuantityValue in the requested unit.
+        """
+        new_unit = _as_units(new_unit)
+        if new_unit == self._units:
+            return self
+        return QuantityValue._make(_convert_magnitude(self._magnitude, self._units, new_unit),
+                                   _shared_units(new_unit))
+
+    def __add__(self, other):
+        """Adds two quantities if they are compatible."""
+        if isinstance(other, QuantityValue):
+            if other._units == self._units and _is_multiplicative(self._units):
+                return QuantityValue._make(self._magnitude + other._magnitude, self._units)
+            return QuantityValue._from_pint(self._pint() + other._pint())
+        return NotImplemented
+
+    def __sub__(self, other):
+        """Subtracts one quantity from another if they are compatible."""
+        if isinstance(other, QuantityValue):
+            # Offset units go through Pint, which rejects degC + degC and returns degC - degC as a delta.
+            if other._units == self._units and _is_multiplicative(self._units):
+                return QuantityValue._make(self._magnitude - other._magnitude, self._units)
+            return QuantityValue._from_pint(self._pint() - other._pint())
+        return NotImplemented
+
+    def __mul__(self, other):
+        """
+        Multiplies the quantity either by a scalar (int or float)
+        or by another QuantityValue.
+        """
+        if isinstance(other, (int, float)):
+            if not _is_multiplicative(self._units):
+                return QuantityValue._from_pint(self._pint() * other)
+            return QuantityValue._make(self._magnitude * other, self._units)
+        elif isinstance(other, QuantityValue):
+            if not (_is_multiplicative(self._units) and _is_multiplicative(other._units)):
+                return QuantityValue._from_pint(self._pint() * other._pint())
+            return QuantityValue._make(self._magnitude * other._magnitude,
+                                       _multiply_units(self._units, other._units))
+        return NotImplemented
+
+    def __rmul__(self, other):
+        if isinstance(other, (int, float)):
+            if not _is_multiplicative(self._units):
+                return QuantityValue._from_pint(other * self._pint())
+            return QuantityValue._make(other * self._magnitude, self._units)
+        return NotImplemented
+
+    def __truediv__(self, other):
+        """
+        Divides the quantity either by a scalar (int or float)
+        or by another QuantityValue.
+        """
+        if isinstance(other, (int, float)):
+            if not _is_multiplicative(self._units):
+                return QuantityValue._from_pint(self._pint() / other)
+            return QuantityValue._make(self._magnitude / other, self._units)
+        elif isinstance(other, QuantityValue):
+            if not (_is_multiplicative(self._units) and _is_multiplicative(other._units)):
+                return QuantityValue._from_pint(self._pint() / other._pint())
+            return QuantityValue._make(self._magnitude / other._magnitude,
+                                       _divide_units(self._units, other._units))
+        return NotImplemented
+
+    def __neg__(self):
+        return QuantityValue._make(-self._magnitude, self._units)
+
+    def _other_magnitude(self, other):
+        """Returns other's magnitude in this value's unit, or None if other is not a QuantityValue."""
+        if not isinstance(other, QuantityValue):
+            return None
+        if other._units == self._units:
+            return other._magnitude
+        return other._pint().m_as(self._units)
+
+    def __lt__(self, other):
+        magnitude = self._other_magnitude(other)
+        return NotImplemented if magnitude is None else self._magnitude < magnitude
+
+    def __le__(self, other):
+        magnitude = self._other_magnitude(other)
+        return NotImplemented if magnitude is None else self._magnitude <= magnitude
+
+    def __gt__(self, other):
+        magnitude = self._other_magnitude(other)
+        return NotImplemented if magnitude is None else self._magnitude > magnitude
+
+    def __ge__(self, other):
+        magnitude = self._other_magnitude(other)
+        return NotImplemented if magnitude is None else self._magnitude >= magnitude
+
+    def __eq__(self, other):
+        if not isinstance(other, QuantityValue):
+            return NotImplemented
+        return self._units == other._units and self._magnitude == other._magnitude
+
+    def __hash__(self):
+        return hash((self._magnitude, self._units))
+
+    def __reduce__(self):
+        # Pickle the unit by name, since a pickled Pint unit is restored into Pint's application registry.
+        # The identifier, if one was allocated, travels as state.
+        return QuantityValue, (self._magnitude, str(self._units)), self._identifier
+
+    def __setstate__(self, identifier):
+        object.__setattr__(self, "_identifier", identifier)
+
+    def __repr__(self):
+        return f"QuantityValue({self._magnitude}, '{self._units}')"
+
+
+class QuantityArray:
+    """
+    A batch of quantities sharing one unit, backed by a single NumPy array.
+
+    Supports elementwise arithmetic, comparisons, reductions, slicing and unit conversion
+    without creating a Quantity per value. Individual values are materialized as Quantity
+    instances only on indexing or iteration.
+    """
+
+    __slots__ = ("_quantity",)
+
+    def __init__(self, values, unit):
+        """
+        Initializes a QuantityArray.
+
+        Parameters:
+          - values: An iterable or array of numerical magnitudes.
+          - unit: A string or Pint unit shared by every value.
+        """
+        if isinstance(unit, str):
+            unit = parse_unit(unit).units
+        self._quantity = get_registry().Quantity(np.asarray(values, dtype=float), unit)
+
+    @classmethod
+    def _from_pint(cls, quantity):
+        array = cls.__new__(cls)
+        array._quantity = quantity
+        return array
+
+    @classmethod
+    def from_quantities(cls, quantities, unit=None):
+        """
+        Builds a QuantityArray from Quantity or QuantityValue instances, converting each to a common unit.
+
+        Parameters:
+          - quantities: A sequence of Quantity instances.
+          - unit: The target unit; defaults to the unit of the first quantity.
+        """
+        quantities = list(quantities)
+        if unit is None:
+            if not quantities:
+                raise ValueError("A unit is required to build an empty QuantityArray.")
+            unit = quantities[0].unit
+        unit = parse_unit(unit).units if isinstance(unit, str) else unit
+        magnitudes = np.fromiter((_as_pint(quantity).m_as(unit) for quantity in quantities),
+                                 dtype=float, count=len(quantities))
+        return cls._from_pint(get_registry().Quantity(magnitudes, unit))
+
+    def to_values(self):
+        """Returns the values as a list of QuantityValue instances."""
+        units = _shared_units(self._quantity.units)
+        return [QuantityValue._make(magnitude, units) for magnitude in self._quantity.magnitude.tolist()]
+
+    def to_quantities(self):
+        """Returns the values as a list of Quantity instances."""
+        Q, units = get_registry().Quantity, self._quantity.units
+        return [Quantity._from_pint(Q(magnitude, units)) for magnitude in self._quantity.magnitude.tolist()]
+
+    @property
+    def magnitude(self):
+        """Returns the underlying NumPy array of magnitudes."""
+        return self._quantity.magnitude
+
+    @property
+    def unit(self):
+        """Returns the shared unit."""
+        return self._quantity.units
+
+    @property
+    def shape(self):
+        return self._quantity.magnitude.shape
+
+    def __len__(self):
+        return len(self._quantity.magnitude)
+
+    def __iter__(self):
+        return iter(self.to_quantities())
+
+    def __getitem__(self, key):
+        """
+        Returns a Quantity for an integer index, or a QuantityArray for a slice, mask or index array.
+        """
+        result = self._quantity[key]
+        if np.ndim(result.magnitude) == 0:
+            return Quantity._from_pint(get_registry().Quantity(result.magnitude.item(), result.units))
+        return QuantityArray._from_pint(result)
+
+    def to(self, new_unit):
+        """
+        Converts every value to a new unit.
+
+        Returns:
+          A new QuantityArray in the requested unit.
+        """
+        new_unit = _as_units(new_unit)
+        return QuantityArray._from_pint(get_registry().Quantity(
+            convert_magnitudes(self._quantity.magnitude, self._quantity.units, new_unit), new_unit))
+
+    @staticmethod
+    def _operand(other, scalars=False):
+        """Returns the Pint operand for other, or None if the operation is not supported."""
+        if isinstance(other, (QuantityArray, Quantity)):
+            return other._quantity
+        if isinstance(other, QuantityValue):
+            return other._pint()
+        if scalars and isinstance(other, (int, float, np.ndarray)):
+            return other
+        return None
+
+    def _apply(self, other, operation, scalars=False):
+        operand = self._operand(other, scalars)
+        if operand is None:
+            return NotImplemented
+        return QuantityArray._from_pint(operation(self._quantity, operand))
+
+    def __add__(self, other):
+        """Adds elementwise if the units are compatible."""
+        return self._apply(other, lambda a, b: a + b)
+
+    def __radd__(self, other):
+        return self._apply(other, lambda a, b: b + a)
+
+    def __sub__(self, other):
+        """Subtracts elementwise if the units are compatible."""
+        return self._apply(other, lambda a, b: a - b)
+
+    def __rsub__(self, other):
+        return self._apply(other, lambda a, b: b - a)
+
+    def __mul__(self, other):
+        """Multiplies elementwise by a scalar, array, Quantity, QuantityValue or QuantityArray."""
+        return self._apply(other, lambda a, b: a * b, scalars=True)
+
+    def __rmul__(self, other):
+        return self._apply(other, lambda a, b: b * a, scalars=True)
+
+    def __truediv__(self, other):
+        """Divides elementwise by a scalar, array, Quantity, QuantityValue or QuantityArray."""
+        return self._apply(other, lambda a, b: a / b, scalars=True)
+
+    def __rtruediv__(self, other):
+        return self._apply(other, lambda a, b: b / a, scalars=True)
+
+    def __neg__(self):
+        return QuantityArray._from_pint(-self._quantity)
+
+    def __abs__(self):
+        return QuantityArray._from_pint(abs(self._quantity))
+
+    def _compare(self, other, operation):
+        operand = self._operand(other)
+        if operand is None:
+            return NotImplemented
+        return operation(self._quantity, operand)
+
+    def __eq__(self, other):
+        """Returns a boolean array comparing values elementwise."""
+        return self._compare(other, lambda a, b: a == b)
+
+    def __ne__(self, other):
+        return self._compare(other, lambda a, b: a != b)
+
+    def __lt__(self, other):
+        return self._compare(other, lambda a, b: a < b)
+
+    def __le__(self, other):
+        return self._compare(other, lambda a, b: a <= b)
+
+    def __gt__(self, other):
+        return self._compare(other, lambda a, b: a > b)
+
+    def __ge__(self, other):
+        return self._compare(other, lambda a, b: a >= b)
+
+    __hash__ = None
+
+    def _reduce(self, reduction, units=None):
+        result = reduction(self._quantity.magnitude)
+        units = units if units is not None else self._quantity.units
+        return Quantity._from_pint(get_registry().Quantity(float(result), units))
+
+    def sum(self):
+        """
+        Returns the sum of the values as a Quantity.
+        Offset units such as degrees Celsius cannot be summed; Pint raises OffsetUnitCalculusError.
+        """
+        if not _is_multiplicative(self._quantity.units):
+            return Quantity._from_pint(self._quantity.sum())
+        return self._reduce(np.sum)
+
+    def mean(self):
+        """Returns the mean of the values as a Quantity."""
+        return self._reduce(np.mean)
+
+    def std(self):
+        """
+        Returns the standard deviation of the values as a Quantity.
+        A spread is a difference, so offset units report it in their delta unit (e.g. ``delta_degC``).
+        """
+        return self._reduce(np.std, _delta_units(self._quantity.units))
+
+    def min(self):
+        """Returns the smallest value as a Quantity."""
+        return self._reduce(np.min)
+
+    def max(self):
+        """Returns the largest value as a Quantity."""
+        return self._reduce(np.max)
+
+    def __repr__(self):
+        return f"QuantityArray({self._quantity.magnitude.tolist()!r}, '{self._quantity.units}')"
+
+
+def normalize_to_base_units(quantities):
+    """
+    Converts a collection of Quantity or QuantityValue instances in mixed units to base units in one pass.
+
+    Values are grouped by unit and each group is converted with one vectorized multiply-add.
+    All quantities must share a dimensionality.
+
+    Returns:
+      A QuantityArray in base units, in the order of the input.
+    """
+    unit_codes = {}
+    magnitudes, codes = [], []
+    for quantity in quantities:
+        if isinstance(quantity, QuantityValue):
+            magnitude, units = quantity._magnitude, quantity._units
+        else:
+            magnitude, units = quantity._quantity.magnitude, quantity._quantity.units
+        magnitudes.append(magnitude)
+        codes.append(unit_codes.setdefault(units, len(unit_codes)))
+    if not unit_codes:
+        raise ValueError("Cannot normalize an empty collection.")
 
-        # Look up the friendly name.
-        return self.DERIVED_UNIT_NAMES.get(key_frozen, str(normalized))
+    base_units = {_base_units(units) for units in unit_codes}
+    if len(base_units) > 1:
+        raise ValueError(f"Quantities have different base units: {sorted(map(str, base_units))}.")
+    target = base_units.pop()
+    magnitudes = np.asarray(magnitudes, dtype=float)
+    codes = np.asarray(codes)
+    for units, code in unit_codes.items():
+        mask = codes == code
+        magnitudes[mask] = convert_magnitudes(magnitudes[mask], units, target)
+    return QuantityArray._from_pint(get_registry().Quantity(magnitudes, target))
 
 
 # Example usage:
@@ -153,11 +829,11 @@ if __name__ == '__main__':
     # Velocity's dimensionality is {'[length]': 1, '[time]': -1} which we map to "velocity".
     # The get_derived_unit_name method should output "velocity".
     print("Derived unit name for velocity:",
-          DerivedQuantity(velocity.magnitude, str(velocity.unit)).get_derived_unit_name())
+          DerivedQuantity.from_quantity(velocity).get_derived_unit_name())
 
     # Another derived example: Area (meter^2)
     width = DerivedQuantity(3, 'meter')
     area = length * width
     print("Area:", area)  # Expected: Quantity(15, 'meter**2')
     print("Derived unit name for area:",
-          DerivedQuantity(area.magnitude, str(area.unit)).get_derived_unit_name())
+          DerivedQuantity.from_quantity(area).get_derived_unit_name())
@@ -1,18 +1,23 @@
-import numpy as np
-from shapely.geometry import Point as ShapelyPoint, Polygon
-from shapely.affinity import translate as shapely_translate, rotate as shapely_rotate, scale as shapely_scale
-from shapely.validation import explain_validity
+import heapq
+import math
+import os
+import pickle
+from functools import lru_cache
+from itertools import islice
 
-# Optional libraries for spatial indexing and GIS integration
-try:
-    from rtree import index as rtree_index
-except ImportError:
-    rtree_index = None
+from src.pythingd.utils.lazy import is_available, lazy_import
+
+# NumPy and Shapely are imported on first use.
+np = lazy_import("numpy")
+shapely = lazy_import("shapely")
+shapely_geometry = lazy_import("shapely.geometry")
+shapely_affinity = lazy_import("shapely.affinity")
+shapely_validation = lazy_import("shapely.validation")
+scipy_spatial = lazy_import("scipy.spatial")
 
-try:
-    import geopandas as gpd
-except ImportError:
-    gpd = None
+# Optional libraries for spatial indexing and GIS integration
+rtree_index = lazy_import("rtree.index", hint="Install it to use SpatialIndex.")
+gpd = lazy_import("geopandas", hint="Install it to convert regions to GeoDataFrames.")
 
 
 class SpatialEntity:
@@ -41,20 +46,30 @@ class Point(SpatialEntity):
     """
     Represents a point in 2D or 3D space.
 
-    For 2D points, we leverage Shapely for robust geometric operations.
-    For 3D points, we store coordinates in a tuple and use NumPy for distance and transformation computations.
+    For 2D points, we leverage Shapely for robust geometric operations; the Shapely point is
+    created on first use of ``geometry``.
+    For 3D points, we store coordinates in a tuple and compute distances and transformations directly.
     """
 
     def __init__(self, x, y, z=None):
         if z is None:
             super().__init__(dimension=2)
             self.coords = (x, y)
-            self.geometry = ShapelyPoint(x, y)
         else:
             super().__init__(dimension=3)
             self.coords = (x, y, z)
-            # Shapely has limited 3D support (it stores z but ignores it in operations)
-            self.geometry = None  # We rely on our own 3D computations.
+        self._geometry = None
+
+    @property
+    def geometry(self):
+        """
+        The Shapely point for a 2D point, or None for a 3D point.
+        Shapely has limited 3D support (it stores z but ignores it in operations), so 3D points rely
+        on our own computations.
+        """
+        if self._geometry is None and self.dimension == 2:
+            self._geometry = shapely_geometry.Point(*self.coords)
+        return self._geometry
 
     def distance(self, other):
         """
@@ -65,7 +80,7 @@ class Point(SpatialEntity):
         if self.dimension == 2 and other.dimension == 2:
             return self.geometry.distance(other.geometry)
         elif self.dimension == 3 and other.dimension == 3:
-            return np.linalg.norm(np.array(self.coords) - np.array(other.coords))
+            return math.dist(self.coords, other.coords)
         else:
             raise ValueError("Cannot compute distance between points of different dimensions.")
 
@@ -74,8 +89,7 @@ class Point(SpatialEntity):
         Returns a new Point translated by the specified offsets.
         """
         if self.dimension == 2:
-            new_geom = shapely_translate(self.geometry, xoff=dx, yoff=dy)
-            return Point(new_geom.x, new_geom.y)
+            return Point(self.coords[0] + dx, self.coords[1] + dy)
         elif self.dimension == 3:
             new_coords = (self.coords[0] + dx, self.coords[1] + dy, self.coords[2] + dz)
             return Point(*new_coords)
@@ -98,13 +112,184 @@ class Point(SpatialEntity):
             return (x, y, z, x, y, z)
 
 
+class PointCollection(SpatialEntity):
+    """
+    A columnar collection of 2D or 3D points stored as one (N, 2) or (N, 3) float64 array.
+
+    Operations are vectorized over the whole array and return arrays or new collections, so no
+    per-point Python objects are created. Shapely geometries are built only if needed (for predicates
+    against regions) and cached; individual Point objects are created on demand by indexing.
+
+    Attributes:
+      - coords: The (N, dimension) coordinate array. Treat it as read-only.
+      - dimension: 2 or 3.
+    """
+
+    def __init__(self, coords, dimension=None):
+        """
+        Parameters:
+          - coords: An (N, 2) or (N, 3) array-like of coordinates.
+          - dimension: Required only when coords is empty.
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        if coords.size == 0:
+            if dimension not in (2, 3):
+                raise ValueError("An empty PointCollection requires a dimension of 2 or 3.")
+            coords = coords.reshape(0, dimension)
+        if coords.ndim != 2 or coords.shape[1] not in (2, 3):
+            raise ValueError("Coordinates must be an (N, 2) or (N, 3) array.")
+        super().__init__(dimension=coords.shape[1])
+        self.coords = coords
+        self._geometries = None
+
+    @classmethod
+    def from_points(cls, points, dimension=None):
+        """
+        Builds a collection from Point instances, which must all have the same dimension.
+        """
+        points = list(points)
+        if points and any(point.dimension != points[0].dimension for point in points):
+            raise ValueError("All points in a collection must have the same dimension.")
+        dimension = points[0].dimension if points else dimension
+        coords = np.fromiter((c for point in points for c in point.coords), dtype=np.float64,
+                             count=len(points) * (dimension or 0))
+        return cls(coords.reshape(len(points), dimension) if points else coords, dimension=dimension)
+
+    @classmethod
+    def from_geometries(cls, geometries):
+        """
+        Builds a 2D collection from an array of Shapely points, which is kept for later predicates.
+        """
+        geometries = np.asarray(geometries, dtype=object)
+        if not np.all(shapely.get_type_id(geometries) == shapely.GeometryType.POINT):
+            raise ValueError("All geometries must be Shapely points.")
+        collection = cls(shapely.get_coordinates(geometries), dimension=2)
+        collection._geometries = geometries
+        return collection
+
+    @property
+    def geometries(self):
+        """
+        A Shapely point array for the collection (2D only), built once and cached.
+        """
+        if self.dimension != 2:
+            raise ValueError("Shapely geometries are only available for 2D collections.")
+        if self._geometries is None:
+            self._geometries = shapely.points(self.coords)
+        return self._geometries
+
+    def __len__(self):
+        return self.coords.shape[0]
+
+    def __getitem__(self, key):
+        """
+        Returns a Point for an integer index, or a new collection for a slice, index array or boolean mask.
+        """
+        if isinstance(key, (int, np.integer)):
+            point = Point(*self.coords[key].tolist())
+            if self._geometries is not None:
+                point._geometry = self._geometries[key]
+            return point
+        collection = PointCollection(self.coords[key], dimension=self.dimension)
+        if self._geometries is not None:
+            collection._geometries = self._geometries[key]
+        return collection
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _xyz(self, point):
+        coords = point.coords if isinstance(point, Point) else tuple(point)
+        if len(coords) != self.dimension:
+            raise ValueError(f"Expected a {self.dimension}D point.")
+        return np.asarray(coords, dtype=np.float64)
+
+    def translate(self, dx=0, dy=0, dz=0):
+        """
+        Returns a new collection with every point translated by the specified offsets.
+        """
+        offsets = (dx, dy) if self.dimension == 2 else (dx, dy, dz)
+        return PointCollection(self.coords + np.asarray(offsets, dtype=np.float64))
+
+    def transform(self, matrix):
+        """
+        Returns a new collection with an affine transform applied to every point.
+
+        Parameters:
+          - matrix: A homogeneous 3x3 (2D) or 4x4 (3D) matrix, or Shapely's affine coefficients.
+        """
+        return PointCollection(_apply_affine(_affine_matrix(matrix, self.dimension), self.coords))
+
+    def distance(self, point):
+        """
+        Returns the Euclidean distance from every point to the given Point or coordinate tuple.
+        """
+        delta = self.coords - self._xyz(point)
+        return np.sqrt(np.einsum("ij,ij->i", delta, delta))
+
+    def bounding_box(self):
+        """
+        Returns the bounding box of all points:
+        (minx, miny, maxx, maxy) in 2D or (minx, miny, minz, maxx, maxy, maxz) in 3D.
+        """
+        if not len(self):
+            raise ValueError("An empty PointCollection has no bounding box.")
+        return tuple(self.coords.min(axis=0).tolist() + self.coords.max(axis=0).tolist())
+
+    def within_bbox(self, bbox):
+        """
+        Returns a boolean array marking points inside a bounding box (boundary included),
+        given in the same layout as ``bounding_box``.
+        """
+        bbox = np.asarray(bbox, dtype=np.float64)
+        if bbox.shape != (2 * self.dimension,):
+            raise ValueError(f"Expected a bounding box of {2 * self.dimension} values.")
+        lower, upper = bbox[:self.dimension], bbox[self.dimension:]
+        return np.all((self.coords >= lower) & (self.coords <= upper), axis=1)
+
+    def within_distance(self, point, radius):
+        """
+        Returns a boolean array marking points within radius of the given point.
+        """
+        delta = self.coords - self._xyz(point)
+        return np.einsum("ij,ij->i", delta, delta) <= radius * radius
+
+    def within(self, region):
+        """
+        Returns a boolean array marking points strictly inside a SpatialRegion (2D only).
+        """
+        return self._check_region(region).contains_many(self.coords)
+
+    def intersects(self, region):
+        """
+        Returns a boolean array marking points inside or on the boundary of a SpatialRegion (2D only).
+        """
+        return self._check_region(region).contains_many(self.coords, include_boundary=True)
+
+    def _check_region(self, region):
+        if self.dimension != 2:
+            raise ValueError("Region predicates require a 2D collection.")
+        if not isinstance(region, SpatialRegion):
+            raise ValueError("Region predicates require a SpatialRegion instance.")
+        return region
+
+    def __repr__(self):
+        return f"PointCollection(n={len(self)}, dimension={self.dimension})"
+
+
 class SpatialRegion(SpatialEntity):
     """
     Represents a 2D spatial region defined by a polygon.
 
     Provides rich spatial relations (contains, overlaps, adjacent, disjoint, intersects)
-    and transformation methods (translate, rotate, scale).
+    and transformation methods (translate, rotate, scale, transform).
     Also integrates with GeoPandas for GIS data conversion.
+
+    Transforms are lazy: a transformed region shares its source polygon and records an affine matrix,
+    and chained transforms compose into one matrix. The polygon is built when ``geometry`` is first
+    needed, with a single affine transform and without revalidation, since a non-singular affine
+    transform of a valid polygon is valid.
     """
 
     def __init__(self, vertices):
@@ -115,25 +300,108 @@ class SpatialRegion(SpatialEntity):
         super().__init__(dimension=2)
         if len(vertices) < 3:
             raise ValueError("A region must be defined by at least three vertices.")
-        self.vertices = vertices
-        self.geometry = Polygon(vertices)
+        self.geometry = shapely_geometry.Polygon(vertices)
+        self._vertices = vertices
         if not self.geometry.is_valid:
-            raise ValueError(f"Invalid polygon: {explain_validity(self.geometry)}")
+            raise ValueError(f"Invalid polygon: {shapely_validation.explain_validity(self.geometry)}")
+
+    @classmethod
+    def _from_geometry(cls, geometry, matrix=None):
+        """
+        Builds a region from an already valid polygon, optionally with a pending affine matrix.
+        """
+        region = cls.__new__(cls)
+        SpatialEntity.__init__(region, dimension=2)
+        region.geometry = geometry
+        region._matrix = matrix
+        if matrix is not None:
+            region._geometry = None
+        return region
+
+    @property
+    def geometry(self):
+        """
+        The region's Shapely polygon, built from pending transforms on first access.
+        Assigning a new polygon discards pending transforms and the prepared geometry.
+        """
+        if self._geometry is None:
+            self._geometry = shapely_affinity.affine_transform(self._base, _shapely_affine(self._matrix))
+        return self._geometry
+
+    @geometry.setter
+    def geometry(self, geometry):
+        self._base = geometry
+        self._matrix = None
+        self._geometry = geometry
+        self._vertices = None
+        self._prepared = False
+
+    def __getstate__(self):
+        # Shapely does not pickle the prepared state, so an unpickled region must prepare again.
+        state = self.__dict__.copy()
+        state["_prepared"] = False
+        return state
+
+    @property
+    def vertices(self):
+        """
+        The vertices the region was created with or, for transformed regions, its exterior coordinates.
+        """
+        if self._vertices is None:
+            self._vertices = list(self.geometry.exterior.coords)
+        return self._vertices
+
+    @vertices.setter
+    def vertices(self, vertices):
+        self._vertices = vertices
+
+    @property
+    def prepared_geometry(self):
+        """
+        The region's polygon, prepared on first use so that repeated predicate tests reuse its
+        spatial index instead of re-scanning every edge.
+        """
+        geometry = self.geometry
+        if not self._prepared:
+            shapely.prepare(geometry)
+            self._prepared = True
+        return geometry
 
     def contains(self, entity):
         """
         Returns True if this region entirely contains the given spatial entity.
         """
         if hasattr(entity, 'geometry') and entity.geometry is not None:
-            return self.geometry.contains(entity.geometry)
+            return self.prepared_geometry.contains(entity.geometry)
         raise ValueError("Entity does not have valid geometry.")
 
+    def contains_many(self, coords, include_boundary=False):
+        """
+        Tests many 2D points against the region in one vectorized call.
+
+        Parameters:
+          - coords: An (N, 2) coordinate array, a PointCollection or an iterable of 2D Points.
+          - include_boundary: Also count points on the boundary (as ``intersects`` would).
+
+        Returns:
+          A boolean array of length N.
+        """
+        coords = _as_coords(coords, 2)
+        test = shapely.intersects_xy if include_boundary else shapely.contains_xy
+        return test(self.prepared_geometry, coords[:, 0], coords[:, 1])
+
+    def distance_many(self, coords):
+        """
+        Returns the distance from the region to each of many 2D points (0 for points inside) as a float array.
+        """
+        return shapely.distance(self.geometry, shapely.points(_as_coords(coords, 2)))
+
     def overlaps(self, other):
         """
         Returns True if this region overlaps with another SpatialRegion.
         """
         if isinstance(other, SpatialRegion):
-            return self.geometry.overlaps(other.geometry)
+            return self.prepared_geometry.overlaps(other.geometry)
         raise ValueError("overlaps() requires another SpatialRegion instance.")
 
     def adjacent_to(self, other):
@@ -141,7 +409,7 @@ class SpatialRegion(SpatialEntity):
         Returns True if this region is adjacent (touches but does not intersect interiors) to another region.
         """
         if isinstance(other, SpatialRegion):
-            return self.geometry.touches(other.geometry)
+            return self.prepared_geometry.touches(other.geometry)
         raise ValueError("adjacent_to() requires another SpatialRegion instance.")
 
     def disjoint(self, other):
@@ -149,7 +417,7 @@ class SpatialRegion(SpatialEntity):
         Returns True if this region is completely disjoint from another region.
         """
         if isinstance(other, SpatialRegion):
-            return self.geometry.disjoint(other.geometry)
+            return self.prepared_geometry.disjoint(other.geometry)
         raise ValueError("disjoint() requires another SpatialRegion instance.")
 
     def intersects(self, other):
@@ -157,7 +425,7 @@ class SpatialRegion(SpatialEntity):
         Returns True if this region intersects with another region.
         """
         if isinstance(other, SpatialRegion):
-            return self.geometry.intersects(other.geometry)
+            return self.prepared_geometry.intersects(other.geometry)
         raise ValueError("intersects() requires another SpatialRegion instance.")
 
     def distance(self, entity):
@@ -168,27 +436,67 @@ class SpatialRegion(SpatialEntity):
             return self.geometry.distance(entity.geometry)
         raise ValueError("Entity does not have valid geometry.")
 
+    def transform(self, matrix):
+        """
+        Returns a new SpatialRegion with an affine transform applied lazily.
+
+        Parameters:
+          - matrix: A 3x3 homogeneous matrix, or Shapely's coefficients [a, b, d, e, xoff, yoff].
+        """
+        matrix = _affine_matrix(matrix, 2)
+        if self._matrix is not None:
+            matrix = matrix @ self._matrix
+        return SpatialRegion._from_geometry(self._base, matrix)
+
     def translate(self, xoff=0, yoff=0):
         """
         Returns a new SpatialRegion translated by the specified offsets.
         """
-        new_geom = shapely_translate(self.geometry, xoff=xoff, yoff=yoff)
-        return SpatialRegion(list(new_geom.exterior.coords))
+        return self.transform(np.array([[1.0, 0.0, xoff], [0.0, 1.0, yoff], [0.0, 0.0, 1.0]]))
 
     def rotate(self, angle, origin='center'):
         """
         Returns a new SpatialRegion rotated by 'angle' degrees.
-        The origin of rotation can be 'center' or a specific (x, y) tuple.
+        The origin of rotation can be 'center', 'centroid', a Point or a specific (x, y) tuple.
         """
-        new_geom = shapely_rotate(self.geometry, angle, origin=origin)
-        return SpatialRegion(list(new_geom.exterior.coords))
+        x0, y0 = self._origin(origin)
+        radians = math.radians(angle)
+        cos, sin = math.cos(radians), math.sin(radians)
+        # As in shapely.affinity.rotate, so that quarter turns are exact.
+        cos = 0.0 if abs(cos) < 2.5e-16 else cos
+        sin = 0.0 if abs(sin) < 2.5e-16 else sin
+        return self.transform(np.array([[cos, -sin, x0 - x0 * cos + y0 * sin],
+                                        [sin, cos, y0 - x0 * sin - y0 * cos],
+                                        [0.0, 0.0, 1.0]]))
 
     def scale(self, xfact=1, yfact=1, origin='center'):
         """
         Returns a new SpatialRegion scaled by xfact and yfact factors.
         """
-        new_geom = shapely_scale(self.geometry, xfact=xfact, yfact=yfact, origin=origin)
-        return SpatialRegion(list(new_geom.exterior.coords))
+        x0, y0 = self._origin(origin)
+        return self.transform(np.array([[xfact, 0.0, x0 - x0 * xfact],
+                                        [0.0, yfact, y0 - y0 * yfact],
+                                        [0.0, 0.0, 1.0]]))
+
+    def _origin(self, origin):
+        if isinstance(origin, str):
+            if origin == 'center':
+                if self._geometry is not None:
+                    minx, miny, maxx, maxy = self._geometry.bounds
+                    return (minx + maxx) / 2, (miny + maxy) / 2
+                # The bounding box of the transformed exterior, without building the polygon.
+                coords = _apply_affine(self._matrix, shapely.get_coordinates(self._base.exterior))
+                return tuple(((coords.min(axis=0) + coords.max(axis=0)) / 2).tolist())
+            if origin == 'centroid':
+                # Affine maps preserve centroids.
+                centroid = self._base.centroid
+                return tuple(_apply_affine(self._matrix, np.array([[centroid.x, centroid.y]]))[0].tolist())
+            raise ValueError("origin must be 'center', 'centroid', a Point or an (x, y) tuple.")
+        if isinstance(origin, Point):
+            return origin.coords[:2]
+        if isinstance(origin, shapely.Geometry):
+            return origin.x, origin.y
+        return origin[0], origin[1]
 
     def bounding_box(self):
         """
@@ -200,7 +508,7 @@ class SpatialRegion(SpatialEntity):
         """
         Converts this region to a GeoDataFrame (requires geopandas).
         """
-        if gpd is None:
+        if not is_available("geopandas"):
             raise ImportError("geopandas is not installed.")
         return gpd.GeoDataFrame([{'geometry': self.geometry}], crs=crs)
 
@@ -236,6 +544,17 @@ class SpatialVolume(SpatialEntity):
         self.minx, self.miny, self.minz = minx, miny, minz
         self.maxx, self.maxy, self.maxz = maxx, maxy, maxz
 
+    @classmethod
+    def _from_bounds(cls, minx, miny, minz, maxx, maxy, maxz):
+        """
+        Builds a volume from bounds known to be ordered, skipping validation.
+        """
+        volume = cls.__new__(cls)
+        volume.dimension = 3
+        volume.minx, volume.miny, volume.minz = minx, miny, minz
+        volume.maxx, volume.maxy, volume.maxz = maxx, maxy, maxz
+        return volume
+
     def contains(self, point):
         """
         Returns True if the volume contains the given 3D Point.
@@ -264,26 +583,39 @@ class SpatialVolume(SpatialEntity):
         """
         Returns a new SpatialVolume translated by the specified offsets.
         """
-        return SpatialVolume(
+        return SpatialVolume._from_bounds(
             self.minx + dx, self.miny + dy, self.minz + dz,
             self.maxx + dx, self.maxy + dy, self.maxz + dz
         )
 
     def scale(self, factor):
         """
-        Scales the volume about its center by the given factor.
+        Scales the volume about its center by the given (non-negative) factor.
         """
+        if factor < 0:
+            raise ValueError("Scale factor must be non-negative.")
         center_x = (self.minx + self.maxx) / 2
         center_y = (self.miny + self.maxy) / 2
         center_z = (self.minz + self.maxz) / 2
         half_x = (self.maxx - self.minx) * factor / 2
         half_y = (self.maxy - self.miny) * factor / 2
         half_z = (self.maxz - self.minz) * factor / 2
-        return SpatialVolume(
+        return SpatialVolume._from_bounds(
             center_x - half_x, center_y - half_y, center_z - half_z,
             center_x + half_x, center_y + half_y, center_z + half_z
         )
 
+    def transform(self, matrix):
+        """
+        Returns the axis-aligned box enclosing this volume after an affine transform.
+        Exact for translations and axis scalings; for rotations the result is the enclosing box.
+
+        Parameters:
+          - matrix: A 4x4 homogeneous matrix, or Shapely's coefficients
+            [a, b, c, d, e, f, g, h, i, xoff, yoff, zoff].
+        """
+        return transform_volumes([self], matrix)[0]
+
     def bounding_box(self):
         """
         Returns the 3D bounding box as (minx, miny, minz, maxx, maxy, maxz).
@@ -295,39 +627,968 @@ class SpatialVolume(SpatialEntity):
                 f"max=({self.maxx}, {self.maxy}, {self.maxz}))")
 
 
+def _affine_matrix(matrix, dimension):
+    """
+    Returns a homogeneous (dimension + 1) square matrix from such a matrix or from Shapely's coefficient
+    list ([a, b, d, e, xoff, yoff] in 2D, [a, b, c, d, e, f, g, h, i, xoff, yoff, zoff] in 3D).
+    Raises ValueError for singular transforms, which would collapse a region or volume.
+    """
+    coefficients = np.asarray(matrix, dtype=np.float64)
+    size = dimension * dimension
+    if coefficients.shape == (dimension + 1, dimension + 1):
+        matrix = coefficients
+    elif coefficients.shape == (size + dimension,):
+        matrix = np.eye(dimension + 1)
+        matrix[:dimension, :dimension] = coefficients[:size].reshape(dimension, dimension)
+        matrix[:dimension, dimension] = coefficients[size:]
+    else:
+        raise ValueError(f"Expected a {dimension + 1}x{dimension + 1} matrix "
+                         f"or {size + dimension} affine coefficients.")
+    if abs(np.linalg.det(matrix[:dimension, :dimension])) < 1e-12:
+        raise ValueError("Singular affine transform; it would collapse the geometry.")
+    return matrix
+
+
+def _shapely_affine(matrix):
+    # Shapely's 2D coefficient order: [a, b, d, e, xoff, yoff].
+    return [matrix[0, 0], matrix[0, 1], matrix[1, 0], matrix[1, 1], matrix[0, 2], matrix[1, 2]]
+
+
+def _apply_affine(matrix, coords):
+    """
+    Applies a homogeneous affine matrix (or None, for the identity) to an (N, d) coordinate array.
+    """
+    if matrix is None:
+        return coords
+    dimension = coords.shape[1]
+    return coords @ matrix[:dimension, :dimension].T + matrix[:dimension, dimension]
+
+
+def transform_regions(regions, matrix):
+    """
+    Applies one affine transform to many SpatialRegions with a single vectorized ``shapely.transform`` call.
+
+    Each region's pending transforms are folded into the same pass, so every polygon is built once.
+
+    Parameters:
+      - regions: An iterable of SpatialRegion instances.
+      - matrix: A 3x3 homogeneous matrix, or Shapely's coefficients [a, b, d, e, xoff, yoff].
+
+    Returns:
+      A list of new SpatialRegion instances with their geometry already built.
+    """
+    regions = list(regions)
+    if not regions:
+        return []
+    matrix = _affine_matrix(matrix, 2)
+    bases = np.empty(len(regions), dtype=object)
+    bases[:] = [region._base for region in regions]
+    combined = np.stack([matrix if region._matrix is None else matrix @ region._matrix for region in regions])
+    # shapely.transform passes the coordinates of every geometry in one array, in geometry order.
+    per_coordinate = np.repeat(combined, shapely.get_num_coordinates(bases), axis=0)
+
+    def apply(coords):
+        return np.einsum("kij,kj->ki", per_coordinate[:, :2, :2], coords) + per_coordinate[:, :2, 2]
+
+    return [SpatialRegion._from_geometry(geometry) for geometry in shapely.transform(bases, apply)]
+
+
+def transform_volumes(volumes, matrix):
+    """
+    Applies one affine transform to many SpatialVolumes at once, returning the axis-aligned box enclosing
+    each transformed volume (exact for translations and axis scalings).
+
+    Parameters:
+      - volumes: An iterable of SpatialVolume instances.
+      - matrix: A 4x4 homogeneous matrix, or Shapely's coefficients [a, b, c, d, e, f, g, h, i, xoff, yoff, zoff].
+    """
+    volumes = list(volumes)
+    if not volumes:
+        return []
+    return VolumeCollection.from_volumes(volumes).transform(matrix).to_volumes()
+
+
+def _transform_boxes(mins, maxs, matrix):
+    """
+    Returns the (mins, maxs) of the axis-aligned boxes enclosing boxes after an affine transform.
+    """
+    matrix = _affine_matrix(matrix, 3)
+    # The enclosing box of a transformed box: transformed center, half-extents through |A|.
+    centers = _apply_affine(matrix, (mins + maxs) / 2)
+    halves = ((maxs - mins) / 2) @ np.abs(matrix[:3, :3]).T
+    return centers - halves, centers + halves
+
+
+def _box_distances(points, mins, maxs):
+    """
+    Returns distances from points to boxes (0 inside), broadcasting (..., 3) coordinate arrays.
+    """
+    delta = np.maximum(np.maximum(mins - points, 0.0), points - maxs)
+    return np.sqrt(np.einsum("...i,...i->...", delta, delta))
+
+
+def _as_coords(points, dimension=None):
+    """
+    Returns an (N, d) float64 array for a PointCollection, a Point, a coordinate tuple or array,
+    or an iterable of Points.
+    """
+    if isinstance(points, PointCollection):
+        coords = points.coords
+    elif isinstance(points, Point):
+        coords = np.asarray([points.coords], dtype=np.float64)
+    elif isinstance(points, np.ndarray):
+        coords = np.atleast_2d(np.asarray(points, dtype=np.float64))
+    else:
+        points = list(points)
+        if points and isinstance(points[0], Point):
+            coords = PointCollection.from_points(points).coords
+        else:
+            coords = np.atleast_2d(np.asarray(points, dtype=np.float64))
+    if coords.size == 0:
+        # An empty list or 1D array carries no dimension; take the requested one.
+        coords = coords.reshape(0, dimension if dimension is not None else coords.shape[-1])
+    if dimension is not None and coords.shape[-1] != dimension:
+        raise ValueError(f"Expected {dimension}D coordinates.")
+    return coords
+
+
+def pairwise_distances(first, second, max_distance=None):
+    """
+    Returns the Euclidean distances between two sets of points.
+
+    Parameters:
+      - first, second: Point sets of the same dimension (see PointIndex for accepted forms).
+      - max_distance: If given, return a SciPy sparse matrix holding only distances up to this value,
+        computed through KD-trees instead of all N x M pairs.
+
+    Returns:
+      An (N, M) array, or a sparse COO array when max_distance is given.
+    """
+    first, second = _as_coords(first), _as_coords(second)
+    if first.shape[1] != second.shape[1]:
+        raise ValueError("Cannot compute distances between points of different dimensions.")
+    if max_distance is None:
+        return scipy_spatial.distance.cdist(first, second)
+    return scipy_spatial.cKDTree(first).sparse_distance_matrix(
+        scipy_spatial.cKDTree(second), max_distance, output_type="coo_matrix")
+
+
+class PointIndex:
+    """
+    A nearest-neighbour index over 2D or 3D points, backed by SciPy's KD-tree.
+
+    Supports k-nearest and radius queries for one probe or a batch of probes, and pairwise distances.
+    Results are positions into the indexed points; ``ids_at`` maps them to the ids given at build time.
+    Rebuilding from a coordinate array is cheap (an unbalanced build without copying), so an index can
+    be rebuilt rather than updated when its points change.
+    """
+
+    def __init__(self, points, ids=None, leafsize=16, dimension=None):
+        """
+        Parameters:
+          - points: A PointCollection, an (N, 2) or (N, 3) array, or an iterable of Points.
+          - ids: Optional ids, one per point; defaults to positions.
+          - leafsize: Points per KD-tree leaf.
+          - dimension: Required only when points is an empty list or 1D array.
+        """
+        self.leafsize = leafsize
+        self.rebuild(points, ids, dimension)
+
+    def rebuild(self, points, ids=None, dimension=None):
+        """
+        Replaces the indexed points and rebuilds the tree.
+        """
+        coords = np.ascontiguousarray(_as_coords(points, dimension))
+        if coords.shape[1] not in (2, 3):
+            raise ValueError("PointIndex supports 2D and 3D points only; pass a dimension for empty input.")
+        if ids is not None and len(ids) != coords.shape[0]:
+            raise ValueError("ids must have one entry per point.")
+        self.points = PointCollection(coords, dimension=coords.shape[1])
+        self.ids = ids
+        self._tree = scipy_spatial.cKDTree(coords, leafsize=self.leafsize, balanced_tree=False,
+                                           compact_nodes=False, copy_data=False)
+        return self
+
+    @property
+    def dimension(self):
+        return self.points.dimension
+
+    def __len__(self):
+        return len(self.points)
+
+    def ids_at(self, indices):
+        """
+        Maps positions returned by a query to ids, keeping the shape of indices: a list for a 1D
+        array, nested lists for the 2D arrays returned by ``query``.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        if self.ids is None:
+            return indices.tolist()
+        ids = np.empty(len(self.ids), dtype=object)
+        ids[:] = list(self.ids)
+        return ids[indices].tolist()
+
+    def nearest(self, point, k=1, max_distance=None):
+        """
+        Returns the k points nearest to one probe point.
+
+        Returns:
+          A (distances, indices) pair of arrays ordered by distance, holding fewer than k entries if
+          there are not enough points (within max_distance, if given).
+        """
+        distances, indices = self.query(_as_coords(point, self.dimension), k=k, max_distance=max_distance)
+        found = indices[0] < len(self)
+        return distances[0][found], indices[0][found]
+
+    def query(self, probes, k=1, max_distance=None, workers=1):
+        """
+        Returns the k nearest points for each of many probe points.
+
+        Returns:
+          (distances, indices) arrays of shape (M, k), with k capped at the number of points (so an
+          empty index gives (M, 0) arrays). Missing neighbours have distance inf and index ``len(self)``.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1.")
+        probes = _as_coords(probes, self.dimension)
+        if not len(self):
+            return np.empty((len(probes), 0)), np.empty((len(probes), 0), dtype=np.intp)
+        k = min(k, len(self))
+        distances, indices = self._tree.query(probes, k=[i + 1 for i in range(k)],
+                                              distance_upper_bound=np.inf if max_distance is None else max_distance,
+                                              workers=workers)
+        return distances, indices
+
+    def within_radius(self, point, radius):
+        """
+        Returns the sorted positions of points within radius of one probe point.
+        """
+        return np.asarray(self._tree.query_ball_point(_as_coords(point, self.dimension)[0], radius,
+                                                      return_sorted=True), dtype=np.intp)
+
+    def query_radius(self, probes, radius, workers=1):
+        """
+        Returns, for each probe point, the sorted positions of points within radius.
+        """
+        result = self._tree.query_ball_point(_as_coords(probes, self.dimension), radius,
+                                             return_sorted=True, workers=workers)
+        return [np.asarray(indices, dtype=np.intp) for indices in result]
+
+    def count_within_radius(self, probes, radius, workers=1):
+        """
+        Returns the number of points within radius of each probe point.
+        """
+        return self._tree.query_ball_point(_as_coords(probes, self.dimension), radius,
+                                           return_length=True, workers=workers)
+
+    def pairs_within(self, radius):
+        """
+        Returns an (P, 2) array of position pairs (i < j) of indexed points within radius of each other.
+        """
+        return self._tree.query_pairs(radius, output_type="ndarray")
+
+    def distance_matrix(self, other, max_distance=None):
+        """
+        Returns distances from every indexed point to every point of another set (or PointIndex).
+        With max_distance, returns a sparse matrix of the distances up to that value.
+        """
+        if isinstance(other, PointIndex):
+            if max_distance is not None:
+                return self._tree.sparse_distance_matrix(other._tree, max_distance, output_type="coo_matrix")
+            other = other.points
+        return pairwise_distances(self.points, other, max_distance)
+
+    def __repr__(self):
+        return f"PointIndex(n={len(self)}, dimension={self.dimension})"
+
+
+@lru_cache(maxsize=None)
+def aabb_dtype():
+    """
+    Returns the structured dtype of a VolumeCollection: a 3-vector of minimum and of maximum coordinates.
+    """
+    return np.dtype([("min", np.float64, (3,)), ("max", np.float64, (3,))])
+
+
+class VolumeCollection(SpatialEntity):
+    """
+    A columnar collection of axis-aligned 3D boxes, stored as one structured array of ``aabb_dtype()``
+    (48 bytes per box instead of a SpatialVolume object with six Python floats).
+
+    Point containment and point-to-box distance are vectorized over all boxes; ``contains_many`` and
+    ``distance_many`` return a (points x boxes) matrix, so batch large point sets or use a
+    BoundingVolumeHierarchy.
+    Indexing returns a SpatialVolume, or a sub-collection for slices and masks.
+
+    Attributes:
+      - boxes: The structured array; ``mins`` and ``maxs`` are (N, 3) views of it.
+    """
+
+    def __init__(self, bounds):
+        """
+        Parameters:
+          - bounds: An (N, 6) array-like of (minx, miny, minz, maxx, maxy, maxz) rows, or a structured
+            array of ``aabb_dtype()``.
+        """
+        super().__init__(dimension=3)
+        if isinstance(bounds, np.ndarray) and bounds.dtype == aabb_dtype():
+            boxes = bounds
+        else:
+            bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 6)
+            boxes = np.empty(len(bounds), dtype=aabb_dtype())
+            boxes["min"] = bounds[:, :3]
+            boxes["max"] = bounds[:, 3:]
+        if not np.all(boxes["min"] <= boxes["max"]):
+            raise ValueError("Invalid bounding box coordinates.")
+        self.boxes = boxes
+
+    @classmethod
+    def from_volumes(cls, volumes):
+        """
+        Builds a collection from SpatialVolume instances.
+        """
+        volumes = list(volumes)
+        bounds = np.fromiter((c for volume in volumes for c in volume.bounding_box()), dtype=np.float64,
+                             count=6 * len(volumes))
+        return cls(bounds.reshape(-1, 6))
+
+    @classmethod
+    def _from_boxes(cls, mins, maxs):
+        boxes = np.empty(len(mins), dtype=aabb_dtype())
+        boxes["min"], boxes["max"] = mins, maxs
+        return cls(boxes)
+
+    @property
+    def mins(self):
+        return self.boxes["min"]
+
+    @property
+    def maxs(self):
+        return self.boxes["max"]
+
+    @property
+    def centers(self):
+        return (self.mins + self.maxs) / 2
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return SpatialVolume._from_bounds(*self.mins[key].tolist(), *self.maxs[key].tolist())
+        return VolumeCollection(self.boxes[key])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_volumes(self):
+        """
+        Returns the boxes as a list of SpatialVolume instances.
+        """
+        return [SpatialVolume._from_bounds(*low, *high) for low, high in zip(self.mins.tolist(), self.maxs.tolist())]
+
+    def bounding_box(self):
+        """
+        Returns the box enclosing the whole collection as (minx, miny, minz, maxx, maxy, maxz).
+        """
+        if not len(self):
+            raise ValueError("An empty VolumeCollection has no bounding box.")
+        return tuple(self.mins.min(axis=0).tolist() + self.maxs.max(axis=0).tolist())
+
+    @staticmethod
+    def _point(point):
+        coords = _as_coords(point, 3)
+        if coords.shape != (1, 3):
+            raise ValueError("Expected one 3D point; use contains_many or distance_many for several.")
+        return coords[0]
+
+    def contains(self, point):
+        """
+        Tests which boxes contain one 3D point, given as a Point or an (x, y, z) triple (boundary included).
+
+        Returns:
+          A boolean array over boxes.
+        """
+        coords = self._point(point)
+        return np.all((self.mins <= coords) & (coords <= self.maxs), axis=1)
+
+    def contains_many(self, points):
+        """
+        Tests which boxes contain each of many 3D points (an (N, 3) array, a PointCollection or Points).
+
+        Returns:
+          An (N, boxes) boolean matrix.
+        """
+        coords = _as_coords(points, 3)[:, None, :]
+        return np.all((self.mins <= coords) & (coords <= self.maxs), axis=2)
+
+    def distance(self, point):
+        """
+        Returns the distance from one 3D point to every box (0 inside) as a float array over boxes.
+        """
+        return _box_distances(self._point(point), self.mins, self.maxs)
+
+    def distance_many(self, points):
+        """
+        Returns an (N, boxes) matrix of distances from each of many 3D points to every box (0 inside).
+        """
+        return _box_distances(_as_coords(points, 3)[:, None, :], self.mins, self.maxs)
+
+    def overlaps(self, bbox):
+        """
+        Returns a boolean array marking boxes that overlap (or touch) a box given as
+        (minx, miny, minz, maxx, maxy, maxz) or as a SpatialVolume.
+        """
+        bbox = np.asarray(bbox.bounding_box() if hasattr(bbox, "bounding_box") else bbox, dtype=np.float64)
+        return np.all((self.mins <= bbox[3:]) & (self.maxs >= bbox[:3]), axis=1)
+
+    def translate(self, dx=0, dy=0, dz=0):
+        offset = np.array([dx, dy, dz], dtype=np.float64)
+        return VolumeCollection._from_boxes(self.mins + offset, self.maxs + offset)
+
+    def transform(self, matrix):
+        """
+        Returns the boxes enclosing each box after an affine transform (see SpatialVolume.transform).
+        """
+        return VolumeCollection._from_boxes(*_transform_boxes(self.mins, self.maxs, matrix))
+
+    def __repr__(self):
+        return f"VolumeCollection(n={len(self)})"
+
+
+class BoundingVolumeHierarchy:
+    """
+    A bounding volume hierarchy over axis-aligned 3D boxes, for box overlap, point containment and
+    nearest-box queries.
+
+    The tree is built top-down by splitting each node's boxes at the median center along its longest
+    axis, and is stored in flat arrays. Overlap queries for many boxes traverse the tree for all of
+    them at once, level by level, with vectorized bounds tests; nearest-box queries use a best-first
+    search with vectorized distances at the leaves. Results are positions into ``volumes``.
+    """
+
+    def __init__(self, volumes, leaf_size=16):
+        """
+        Parameters:
+          - volumes: A VolumeCollection, bounds accepted by VolumeCollection, or SpatialVolume instances.
+          - leaf_size: Maximum number of boxes per leaf.
+        """
+        if not isinstance(volumes, VolumeCollection):
+            volumes = list(volumes) if not isinstance(volumes, np.ndarray) else volumes
+            if len(volumes) and isinstance(volumes[0], SpatialVolume):
+                volumes = VolumeCollection.from_volumes(volumes)
+            else:
+                volumes = VolumeCollection(volumes)
+        if leaf_size < 1:
+            raise ValueError("leaf_size must be at least 1.")
+        self.volumes = volumes
+        self.leaf_size = leaf_size
+        self._build()
+
+    def _build(self):
+        mins, maxs = np.ascontiguousarray(self.volumes.mins), np.ascontiguousarray(self.volumes.maxs)
+        self._mins, self._maxs = mins, maxs
+        centers = (mins + maxs) / 2
+        order = np.arange(len(mins), dtype=np.intp)
+        node_mins, node_maxs, children, starts, counts = [], [], [], [], []
+
+        def add_node(start, stop):
+            boxes = order[start:stop]
+            node_mins.append(mins[boxes].min(axis=0) if stop > start else np.full(3, np.inf))
+            node_maxs.append(maxs[boxes].max(axis=0) if stop > start else np.full(3, -np.inf))
+            children.append(-1)
+            starts.append(start)
+            counts.append(stop - start)
+            return len(starts) - 1
+
+        stack = [add_node(0, len(order))]
+        while stack:
+            node = stack.pop()
+            start, stop = starts[node], starts[node] + counts[node]
+            if stop - start <= self.leaf_size:
+                continue
+            boxes = order[start:stop]
+            spread = centers[boxes].max(axis=0) - centers[boxes].min(axis=0)
+            axis = int(np.argmax(spread))
+            if spread[axis] == 0:
+                continue
+            middle = (stop - start) // 2
+            order[start:stop] = boxes[np.argpartition(centers[boxes, axis], middle)]
+            # Children are created consecutively: the right child is always left + 1.
+            children[node] = add_node(start, start + middle)
+            add_node(start + middle, stop)
+            stack.extend((children[node], children[node] + 1))
+
+        self._order = order
+        self._node_mins = np.array(node_mins, dtype=np.float64).reshape(-1, 3)
+        self._node_maxs = np.array(node_maxs, dtype=np.float64).reshape(-1, 3)
+        self._children = np.array(children, dtype=np.intp)
+        self._starts = np.array(starts, dtype=np.intp)
+        self._counts = np.array(counts, dtype=np.intp)
+
+    def __len__(self):
+        return len(self._order)
+
+    @property
+    def node_count(self):
+        return len(self._children)
+
+    def query(self, bbox):
+        """
+        Returns the sorted positions of boxes overlapping (or touching) a box given as
+        (minx, miny, minz, maxx, maxy, maxz) or as a SpatialVolume.
+        """
+        return self.query_many([bbox])[1]
+
+    def containing(self, point):
+        """
+        Returns the sorted positions of boxes containing a 3D point (boundary included).
+        """
+        coords = _as_coords(point, 3)[0]
+        return self.query(np.concatenate([coords, coords]))
+
+    def query_many(self, boxes):
+        """
+        Finds overlapping boxes for many query boxes in one vectorized traversal.
+
+        Parameters:
+          - boxes: A VolumeCollection, SpatialVolumes or an (M, 6) bounds array.
+
+        Returns:
+          A (2, n) array of (query position, box position) pairs, sorted by query then box.
+        """
+        if isinstance(boxes, VolumeCollection):
+            query_mins, query_maxs = boxes.mins, boxes.maxs
+        else:
+            bounds = np.asarray([box.bounding_box() if hasattr(box, "bounding_box") else box for box in boxes],
+                                dtype=np.float64).reshape(-1, 6)
+            query_mins, query_maxs = bounds[:, :3], bounds[:, 3:]
+        found_queries, found_boxes = [], []
+        queries = np.arange(len(query_mins), dtype=np.intp)
+        nodes = np.zeros(len(queries), dtype=np.intp)
+        if not len(self):
+            queries = queries[:0]
+        while queries.size:
+            hit = np.all((self._node_mins[nodes] <= query_maxs[queries]) &
+                         (self._node_maxs[nodes] >= query_mins[queries]), axis=1)
+            queries, nodes = queries[hit], nodes[hit]
+            children = self._children[nodes]
+            leaf = children < 0
+            if leaf.any():
+                leaf_queries, leaf_nodes = queries[leaf], nodes[leaf]
+                counts = self._counts[leaf_nodes]
+                pair_queries = np.repeat(leaf_queries, counts)
+                # Position of each box within its leaf's run of ``order``.
+                offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                pair_boxes = self._order[np.repeat(self._starts[leaf_nodes], counts) + offsets]
+                overlap = np.all((self._mins[pair_boxes] <= query_maxs[pair_queries]) &
+                                 (self._maxs[pair_boxes] >= query_mins[pair_queries]), axis=1)
+                found_queries.append(pair_queries[overlap])
+                found_boxes.append(pair_boxes[overlap])
+            inner_queries, inner_children = queries[~leaf], children[~leaf]
+            queries = np.concatenate([inner_queries, inner_queries])
+            nodes = np.concatenate([inner_children, inner_children + 1])
+        if not found_queries:
+            return np.empty((2, 0), dtype=np.intp)
+        pairs = np.vstack([np.concatenate(found_queries), np.concatenate(found_boxes)])
+        return pairs[:, np.lexsort((pairs[1], pairs[0]))]
+
+    def overlapping_pairs(self):
+        """
+        Returns a (2, n) array of position pairs (i < j) of indexed boxes that overlap each other.
+        """
+        pairs = self.query_many(self.volumes)
+        return pairs[:, pairs[0] < pairs[1]]
+
+    def nearest(self, point, k=1):
+        """
+        Returns the k boxes nearest to a 3D point (distance 0 for boxes containing it).
+
+        Returns:
+          A (distances, positions) pair of arrays ordered by distance.
+        """
+        coords = _as_coords(point, 3)[0]
+        if not len(self):
+            return np.empty(0), np.empty(0, dtype=np.intp)
+        frontier = [(float(_box_distances(coords, self._node_mins[0], self._node_maxs[0])), 0)]
+        # Max-heap (by negated distance) of the best k boxes found so far.
+        best = []
+        while frontier:
+            distance, node = heapq.heappop(frontier)
+            if len(best) == k and distance > -best[0][0]:
+                break
+            child = self._children[node]
+            if child < 0:
+                start = self._starts[node]
+                boxes = self._order[start:start + self._counts[node]]
+                for box, box_distance in zip(boxes.tolist(),
+                                             _box_distances(coords, self._mins[boxes], self._maxs[boxes]).tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-box_distance, box))
+                    elif box_distance < -best[0][0]:
+                        heapq.heapreplace(best, (-box_distance, box))
+            else:
+                children = [child, child + 1]
+                distances = _box_distances(coords, self._node_mins[children], self._node_maxs[children])
+                for child_node, child_distance in zip(children, distances.tolist()):
+                    heapq.heappush(frontier, (child_distance, child_node))
+        best.sort(key=lambda item: (-item[0], item[1]))
+        return np.array([-distance for distance, _ in best]), np.array([box for _, box in best], dtype=np.intp)
+
+    def nearest_many(self, points, k=1):
+        """
+        Runs ``nearest`` for each of many points.
+
+        Returns:
+          (distances, positions) arrays of shape (M, k); missing neighbours have distance inf and position -1.
+        """
+        coords = _as_coords(points, 3)
+        distances = np.full((len(coords), k), np.inf)
+        positions = np.full((len(coords), k), -1, dtype=np.intp)
+        for i, point in enumerate(coords):
+            found_distances, found_positions = self.nearest(point, k)
+            distances[i, :len(found_distances)] = found_distances
+            positions[i, :len(found_positions)] = found_positions
+        return distances, positions
+
+    def __repr__(self):
+        return f"BoundingVolumeHierarchy(n={len(self)}, nodes={self.node_count})"
+
+
+def _shapely_geometry(entity):
+    """
+    Returns the Shapely geometry of a 2D Point or SpatialRegion, or a Shapely geometry unchanged.
+    """
+    if isinstance(entity, shapely.Geometry):
+        return entity
+    geometry = getattr(entity, "geometry", None)
+    if geometry is None:
+        raise ValueError("Expected a 2D Point, a SpatialRegion or a Shapely geometry.")
+    return geometry
+
+
+def _shapely_geometries(entities):
+    """
+    Returns a Shapely geometry array for a PointCollection, a Shapely array or an iterable of entities.
+    """
+    if isinstance(entities, PointCollection):
+        return entities.geometries
+    if isinstance(entities, np.ndarray) and entities.dtype == object:
+        return entities
+    geometries = [_shapely_geometry(entity) for entity in entities]
+    array = np.empty(len(geometries), dtype=object)
+    array[:] = geometries
+    return array
+
+
 class SpatialIndex:
     """
     A spatial index built on top of Rtree for efficient querying of spatial entities.
 
-    Entities added must implement a bounding_box() method.
+    Entities added must implement a bounding_box() method and are keyed by integer ids.
+    Large sets should be loaded with ``bulk_load``, which packs the tree with sort-tile-recursive (STR)
+    bulk loading through Rtree's stream loader; this is much faster than repeated ``add`` calls and
+    gives a better-balanced tree.
+
+    Given a path, the index is stored on disk as ``<path>.dat`` and ``<path>.idx``, with the entities
+    pickled to ``<path>.entities``. An index created on an existing path reopens those files instead of
+    rebuilding; call ``flush`` or ``close`` to persist changes.
+
+    Security: reopening an index unpickles ``<path>.entities``, and unpickling can run arbitrary code.
+    Only reopen indexes from paths you trust, i.e. files written by your own process or deployment.
     """
 
-    def __init__(self, dimension=2):
-        if rtree_index is None:
-            raise ImportError("rtree is not installed. Install it to use SpatialIndex.")
+    ENTITIES_EXTENSION = ".entities"
+    EXACT_PREDICATES = ("intersects", "contains", "within", "touches", "dwithin")
+
+    def __init__(self, dimension=2, path=None, overwrite=False):
+        """
+        Parameters:
+          - dimension: 2 or 3; ignored when reopening an existing on-disk index.
+          - path: Base path for an on-disk index, or None to keep the index in memory. Its entities
+            file is unpickled on reopen, so the path must be trusted.
+          - overwrite: Replace an existing on-disk index at path instead of reopening it.
+
+        Raises:
+          - FileExistsError: If path has leftover index files but no ``.idx`` file, unless overwrite is set.
+        """
+        if not is_available("rtree"):
+            raise ImportError("rtree is not installed. Install it (pip install rtree) to use SpatialIndex.")
         self.dimension = dimension
-        p = rtree_index.Property()
-        p.dimension = dimension  # Parameterize by dimension if needed.
-        self.index = rtree_index.Index(properties=p)
+        self.path = None if path is None else os.fspath(path)
         self.entities = {}
+        self._geometry_cache = None
+        reopen = self.path is not None and not overwrite and os.path.exists(self.path + ".idx")
+        if not reopen:
+            if not overwrite and self._existing_files():
+                raise FileExistsError(f"'{self.path}' has index files but no '{self.path}.idx'; "
+                                      "pass overwrite=True to replace them.")
+            self._remove_files()
+        self.index = self._create(overwrite=not reopen)
+        if reopen:
+            self.dimension = self.index.properties.dimension
+            entities_path = self.path + self.ENTITIES_EXTENSION
+            if os.path.exists(entities_path):
+                # Trusted input only: pickle.load can execute code embedded in the file.
+                with open(entities_path, "rb") as fp:
+                    self.entities = pickle.load(fp)
+
+    def _existing_files(self):
+        if self.path is None:
+            return []
+        return [self.path + extension for extension in (".dat", ".idx", self.ENTITIES_EXTENSION)
+                if os.path.exists(self.path + extension)]
+
+    def _remove_files(self):
+        # Rtree does not reliably replace an existing on-disk tree, so its files are deleted first.
+        for path in self._existing_files():
+            os.remove(path)
+
+    def _create(self, stream=None, overwrite=False):
+        properties = rtree_index.Property()
+        properties.dimension = self.dimension
+        args = []
+        if self.path is not None:
+            properties.overwrite = overwrite
+            args.append(self.path)
+        if stream is not None:
+            args.append(stream)
+        return rtree_index.Index(*args, properties=properties)
+
+    @classmethod
+    def bulk_load(cls, entities, dimension=2, path=None):
+        """
+        Builds an index from a mapping of id to entity, or an iterable of (id, entity) pairs, using STR
+        bulk loading. Any existing on-disk index at path is replaced.
+        """
+        index = cls(dimension=dimension, path=path, overwrite=True)
+        index.load(entities)
+        return index
+
+    def load(self, entities):
+        """
+        Replaces the contents of the index with the given entities, bulk loaded with STR.
+        """
+        entities = dict(entities)
+        self.index.close()
+        self._remove_files()
+        stream = ((entity_id, entity.bounding_box(), None) for entity_id, entity in entities.items())
+        self.index = self._create(stream if entities else None, overwrite=True)
+        self.entities = entities
+        self._geometry_cache = None
 
     def add(self, entity, entity_id):
         """
-        Adds an entity to the spatial index.
+        Adds an entity to the spatial index, replacing any entity with the same id.
         """
+        if entity_id in self.entities:
+            self.remove(entity_id)
         bbox = entity.bounding_box()
         self.index.insert(entity_id, bbox)
         self.entities[entity_id] = entity
+        self._geometry_cache = None
 
-    def query(self, bbox):
+    def remove(self, entity_id):
+        """
+        Removes an entity from the index.
+
+        Returns:
+          The removed entity, or None if the id was not indexed.
+        """
+        entity = self.entities.pop(entity_id, None)
+        if entity is not None:
+            self.index.delete(entity_id, entity.bounding_box())
+            self._geometry_cache = None
+        return entity
+
+    def update(self, entity_id, entity):
+        """
+        Replaces the entity stored under an id, re-indexing it under its new bounding box.
+
+        Returns:
+          The previous entity, or None if the id was not indexed.
+        """
+        previous = self.remove(entity_id)
+        self.add(entity, entity_id)
+        return previous
+
+    def query(self, bbox, ids=False):
         """
         Queries the index for entities intersecting the given bounding box.
 
         For 2D, bbox is (minx, miny, maxx, maxy).
-        Returns a list of entities.
+        Returns a list of entities, or of their ids if ids is True.
+        """
+        if ids:
+            return list(self.index.intersection(bbox))
+        return [self.entities[i] for i in self.index.intersection(bbox)]
+
+    def iter_query(self, bbox, ids=False):
+        """
+        Like ``query``, but yields results one at a time. Rtree returns matching ids as one compact
+        integer buffer, so this avoids building a list of entities for very large result sets.
+        """
+        if ids:
+            yield from self.index.intersection(bbox)
+        else:
+            entities = self.entities
+            for i in self.index.intersection(bbox):
+                yield entities[i]
+
+    def count(self, bbox):
+        """
+        Returns the number of entities intersecting the given bounding box without retrieving them.
+        """
+        return self.index.count(bbox)
+
+    def nearest(self, target, k=1, ids=False):
+        """
+        Returns the k entities whose bounding boxes are nearest to a Point, entity, coordinate tuple or
+        bounding box, ordered by distance.
+        """
+        if hasattr(target, "bounding_box"):
+            target = target.bounding_box()
+        nearest = islice(self.index.nearest(tuple(target), num_results=k), k)
+        if ids:
+            return list(nearest)
+        return [self.entities[i] for i in nearest]
+
+    def query_exact(self, geometry, predicate="intersects", distance=None, output="entities"):
+        """
+        Returns the entities that satisfy an exact spatial predicate against a geometry (2D only).
+
+        Candidates are first filtered by bounding box through the R-tree, then refined in bulk with a
+        Shapely ``STRtree`` predicate query over the candidates.
+
+        Parameters:
+          - geometry: A 2D Point, a SpatialRegion or a Shapely geometry.
+          - predicate: One of EXACT_PREDICATES, read as "geometry <predicate> entity" like Shapely's
+            ``STRtree.query``: "contains" returns entities inside the geometry, "within" returns
+            entities containing it.
+          - distance: The distance for "dwithin".
+          - output: "entities" for a list of entities, or "ids" for an array of ids.
+        """
+        self._check_exact(predicate, distance, output, ("entities", "ids"))
+        geometry = _shapely_geometry(geometry)
+        bbox = shapely.bounds(geometry)
+        if predicate == "dwithin":
+            bbox = bbox + np.array([-distance, -distance, distance, distance])
+        ids = np.fromiter(self.index.intersection(tuple(bbox.tolist())), dtype=np.int64)
+        if ids.size:
+            ids = np.unique(ids)
+            _, matches = self._refine(self._candidate_geometries(ids), geometry, predicate, distance)
+            ids = ids[np.sort(matches)]
+        if output == "ids":
+            return ids
+        return [self.entities[i] for i in ids.tolist()]
+
+    def query_exact_many(self, geometries, predicate="intersects", distance=None, output="indices"):
+        """
+        Runs ``query_exact`` for many geometries at once: one batched R-tree pass over all their
+        bounding boxes, then one Shapely ``STRtree`` predicate query over the candidates it found.
+
+        Parameters:
+          - geometries: An iterable of 2D Points, SpatialRegions or Shapely geometries, or a Shapely array.
+          - output: "indices" for a (2, n) array of (geometry position, entity id) pairs, in the layout
+            of Shapely's ``STRtree.query``; "ids" for one id array per geometry; "entities" for one
+            entity list per geometry.
+        """
+        self._check_exact(predicate, distance, output, ("indices", "ids", "entities"))
+        geometries = _shapely_geometries(geometries)
+        bounds = shapely.bounds(geometries).reshape(-1, 4)
+        if predicate == "dwithin":
+            bounds = bounds + np.array([-distance, -distance, distance, distance])
+        ids, positions = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.intp)
+        if len(geometries) and len(self):
+            candidates, _ = self.index.intersection_v(np.ascontiguousarray(bounds[:, :2]),
+                                                      np.ascontiguousarray(bounds[:, 2:]))
+            candidates = np.unique(np.asarray(candidates, dtype=np.int64))
+            if candidates.size:
+                positions, matches = self._refine(self._candidate_geometries(candidates), geometries,
+                                                  predicate, distance)
+                ids = candidates[matches]
+                order = np.lexsort((ids, positions))
+                ids, positions = ids[order], positions[order]
+        if output == "indices":
+            return np.vstack([positions, ids])
+        # Pairs are sorted by geometry position, so each geometry's matches form one contiguous run.
+        groups = np.split(ids, np.cumsum(np.bincount(positions, minlength=len(geometries)))[:-1])
+        if output == "ids":
+            return groups
+        return [[self.entities[i] for i in group.tolist()] for group in groups]
+
+    def _check_exact(self, predicate, distance, output, outputs):
+        if self.dimension != 2:
+            raise ValueError("Exact queries require a 2D index.")
+        if predicate not in self.EXACT_PREDICATES:
+            raise ValueError(f"Unknown predicate '{predicate}'; expected one of {self.EXACT_PREDICATES}.")
+        if (predicate == "dwithin") != (distance is not None):
+            raise ValueError("A distance is required for 'dwithin' and only for 'dwithin'.")
+        if output not in outputs:
+            raise ValueError(f"Unknown output '{output}'; expected one of {outputs}.")
+
+    def _candidate_geometries(self, ids):
+        # Entity geometries are kept in an array sorted by id, rebuilt after the index changes,
+        # so candidates are gathered with one searchsorted instead of a dictionary lookup each.
+        if self._geometry_cache is None:
+            entity_ids = np.fromiter(self.entities, dtype=np.int64, count=len(self.entities))
+            geometries = np.empty(len(entity_ids), dtype=object)
+            geometries[:] = [getattr(entity, "geometry", None) for entity in self.entities.values()]
+            order = np.argsort(entity_ids)
+            self._geometry_cache = (entity_ids[order], geometries[order])
+        entity_ids, geometries = self._geometry_cache
+        candidates = geometries[np.searchsorted(entity_ids, ids)]
+        if shapely.is_missing(candidates).any():
+            raise ValueError("Exact queries require every candidate entity to have a 2D geometry.")
+        return candidates
+
+    @staticmethod
+    def _refine(candidates, geometries, predicate, distance):
+        # Returns (geometry positions, candidate positions); a single geometry gives positions of 0.
+        tree = shapely.STRtree(candidates)
+        if predicate == "dwithin":
+            matches = tree.query(geometries, predicate="dwithin", distance=distance)
+        else:
+            matches = tree.query(geometries, predicate=predicate)
+        if matches.ndim == 1:
+            return np.zeros(len(matches), dtype=np.intp), matches
+        return matches[0], matches[1]
+
+    def bounds(self):
         """
-        ids = list(self.index.intersection(bbox))
-        return [self.entities[i] for i in ids]
+        Returns the bounding box of everything in the index.
+        """
+        return tuple(self.index.bounds)
+
+    def flush(self):
+        """
+        Writes an on-disk index and its entities to disk. Does nothing for an in-memory index.
+        """
+        if self.path is None:
+            return
+        self.index.flush()
+        with open(self.path + self.ENTITIES_EXTENSION, "wb") as fp:
+            pickle.dump(self.entities, fp, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def close(self):
+        """
+        Flushes and closes the index.
+        """
+        self.flush()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __contains__(self, entity_id):
+        return entity_id in self.entities
 
     def __repr__(self):
         return f"SpatialIndex(num_entities={len(self.entities)})"
@@ -359,7 +1620,7 @@ if __name__ == "__main__":
     print("Scaled Region:", scaled_region)
 
     # Convert the region to a GeoDataFrame if geopandas is available.
-    if gpd is not None:
+    if is_available("geopandas"):
         gdf = region.to_geodataframe()
         print("GeoDataFrame from SpatialRegion:")
         print(gdf)
@@ -382,7 +1643,7 @@ if __name__ == "__main__":
     print("Scaled Volume:", scaled_volume)
 
     # ---- Spatial Index Example (2D) ----
-    if rtree_index is not None:
+    if is_available("rtree"):
         index = SpatialIndex(dimension=2)
         index.add(region, entity_id=1)
         index.add(translated_region, entity_id=2)
@@ -0,0 +1,231 @@
+"""
+Module: spatial_join.py
+
+Partitioned spatial joins between collections of SpatialRegions and Points.
+
+The plane is cut into rectangular tiles, either a uniform grid or sort-tile-recursive (STR) tiles
+that adapt to where the data is. Each geometry is assigned to every tile its bounding box touches,
+and each tile is joined on its own with a Shapely STRtree predicate query, so tiles can run in a
+process pool. A pair found in several tiles is reported only by the tile that contains the corner
+of the overlap of the two bounding boxes, so every pair appears exactly once.
+
+Results stream out as (left positions, right positions) array pairs, one per tile.
+"""
+
+import math
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, List, Optional, Tuple
+
+from src.pythingd.commons.foundational.space import _shapely_geometries
+from src.pythingd.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+shapely = lazy_import("shapely")
+
+JOIN_PREDICATES = ("intersects", "contains", "within", "dwithin")
+JOIN_TYPES = ("inner", "left")
+PARTITIONINGS = ("grid", "str")
+
+# Default number of geometries per tile when no partition count is given.
+GEOMETRIES_PER_PARTITION = 50_000
+# Centers sampled to place STR tile boundaries.
+STR_SAMPLE_SIZE = 100_000
+
+
+def _finite(bounds):
+    """
+    Returns a mask of the rows with finite bounds; empty and missing geometries have NaN bounds.
+    """
+    return np.isfinite(bounds).all(axis=1)
+
+
+def _partition_edges(bounds, partitioning: str, partitions: int):
+    """
+    Returns the inner x boundaries of the vertical slices and, per slice, the inner y boundaries of its tiles.
+    Slice s spans [x_edges[s - 1], x_edges[s]), with the outermost slices and tiles unbounded.
+    Rows with non-finite bounds are ignored, so they cannot turn the edges into NaN.
+    """
+    bounds = bounds[_finite(bounds)]
+    slices = max(1, math.ceil(math.sqrt(partitions)))
+    if partitioning == "grid":
+        minx, miny = bounds[:, 0].min(), bounds[:, 1].min()
+        maxx, maxy = bounds[:, 2].max(), bounds[:, 3].max()
+        x_edges = np.linspace(minx, maxx, slices + 1)[1:-1]
+        return x_edges, [np.linspace(miny, maxy, slices + 1)[1:-1]] * slices
+    centers = (bounds[:, :2] + bounds[:, 2:]) / 2
+    if len(centers) > STR_SAMPLE_SIZE:
+        centers = centers[np.random.default_rng(0).choice(len(centers), STR_SAMPLE_SIZE, replace=False)]
+    quantiles = np.linspace(0, 1, slices + 1)[1:-1]
+    x_edges = np.quantile(centers[:, 0], quantiles)
+    slice_of = np.searchsorted(x_edges, centers[:, 0], side="right")
+    y_edges = []
+    for s in range(slices):
+        in_slice = centers[slice_of == s, 1]
+        y_edges.append(np.quantile(in_slice, quantiles) if in_slice.size else np.empty(0))
+    return x_edges, y_edges
+
+
+def _tile_bounds(x_edges, y_edges) -> List[Tuple[float, float, float, float]]:
+    tiles = []
+    x_bounds = np.concatenate([[-np.inf], x_edges, [np.inf]])
+    for s, edges in enumerate(y_edges):
+        y_bounds = np.concatenate([[-np.inf], edges, [np.inf]])
+        for t in range(len(y_bounds) - 1):
+            tiles.append((x_bounds[s], y_bounds[t], x_bounds[s + 1], y_bounds[t + 1]))
+    return tiles
+
+
+def _assign(bounds, x_edges, y_edges, tile_count: int) -> List:
+    """
+    Returns, for each tile, the positions of the geometries whose bounding boxes touch it.
+    """
+    offsets = np.concatenate([[0], np.cumsum([len(edges) + 1 for edges in y_edges])])
+    positions = np.nonzero(_finite(bounds))[0]
+    first_slice = np.searchsorted(x_edges, bounds[positions, 0], side="right")
+    last_slice = np.searchsorted(x_edges, bounds[positions, 2], side="right")
+    tiles, members = [], []
+    for s, edges in enumerate(y_edges):
+        in_slice = positions[(first_slice <= s) & (last_slice >= s)]
+        low = np.searchsorted(edges, bounds[in_slice, 1], side="right")
+        high = np.searchsorted(edges, bounds[in_slice, 3], side="right")
+        counts = high - low + 1
+        # Expand each geometry's run of tiles [low, high] within the slice.
+        steps = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        members.append(np.repeat(in_slice, counts))
+        tiles.append(offsets[s] + np.repeat(low, counts) + steps)
+    tiles, members = np.concatenate(tiles), np.concatenate(members)
+    order = np.argsort(tiles, kind="stable")
+    return np.split(members[order], np.cumsum(np.bincount(tiles, minlength=tile_count))[:-1])
+
+
+def _join_partition(task) -> Tuple:
+    """
+    Joins one tile. Runs in worker processes, so it takes and returns plain arrays.
+    """
+    (left_positions, left_geometries, left_bounds, right_positions, right_geometries, right_bounds,
+     predicate, distance, tile) = task
+    tree = shapely.STRtree(right_geometries)
+    if predicate == "dwithin":
+        left, right = tree.query(left_geometries, predicate="dwithin", distance=distance)
+    else:
+        left, right = tree.query(left_geometries, predicate=predicate)
+    # Keep the pair only in the tile holding the lower corner of the two boxes' overlap.
+    x = np.maximum(left_bounds[left, 0], right_bounds[right, 0])
+    y = np.maximum(left_bounds[left, 1], right_bounds[right, 1])
+    keep = (tile[0] <= x) & (x < tile[2]) & (tile[1] <= y) & (y < tile[3])
+    return left_positions[left[keep]], right_positions[right[keep]]
+
+
+def _partition_tasks(left_geometries, left_bounds, right_geometries, right_bounds,
+                     predicate, distance, partitioning, partitions) -> Iterator[Tuple]:
+    x_edges, y_edges = _partition_edges(np.vstack([left_bounds, right_bounds]), partitioning, partitions)
+    tiles = _tile_bounds(x_edges, y_edges)
+    left_tiles = _assign(left_bounds, x_edges, y_edges, len(tiles))
+    right_tiles = _assign(right_bounds, x_edges, y_edges, len(tiles))
+    for tile, left_positions, right_positions in zip(tiles, left_tiles, right_tiles):
+        if left_positions.size and right_positions.size:
+            yield (left_positions, left_geometries[left_positions], left_bounds[left_positions],
+                   right_positions, right_geometries[right_positions], right_bounds[right_positions],
+                   predicate, distance, tile)
+
+
+def _run_tasks(tasks, processes: Optional[int]) -> Iterator[Tuple]:
+    if processes is None or processes <= 1:
+        for task in tasks:
+            yield _join_partition(task)
+        return
+    # Keep a bounded number of tiles in flight, so results stream out as they finish.
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = set()
+        for task in tasks:
+            pending.add(executor.submit(_join_partition, task))
+            if len(pending) >= 2 * processes:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+def iter_spatial_join(left, right,
+                      predicate: str = "intersects",
+                      distance: Optional[float] = None,
+                      how: str = "inner",
+                      partitioning: str = "grid",
+                      partitions: Optional[int] = None,
+                      processes: Optional[int] = None) -> Iterator[Tuple]:
+    """
+    Joins two collections of SpatialRegions and/or 2D Points, yielding matches tile by tile.
+
+    :param left: SpatialRegions, Points, a PointCollection or a Shapely geometry array.
+    :param right: As for left.
+    :param predicate: "intersects", "contains" (left contains right), "within" (left within right)
+        or "dwithin" (within distance of each other).
+    :param distance: The distance for "dwithin".
+    :param how: "inner", or "left" to also yield left positions without a match, paired with -1,
+        once every tile has been joined.
+    :param partitioning: "grid" for uniform tiles or "str" for tiles placed at quantiles of the data.
+    :param partitions: Approximate number of tiles; defaults to one per 50,000 geometries.
+    :param processes: Number of worker processes; None or 1 joins the tiles in this process.
+    :return: An iterator of (left positions, right positions) integer array pairs; each pair of
+        positions appears exactly once across the whole iteration.
+    """
+    if predicate not in JOIN_PREDICATES:
+        raise ValueError(f"Unknown predicate '{predicate}'; expected one of {JOIN_PREDICATES}.")
+    if (predicate == "dwithin") != (distance is not None):
+        raise ValueError("A distance is required for 'dwithin' and only for 'dwithin'.")
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Unknown join type '{how}'; expected one of {JOIN_TYPES}.")
+    if partitioning not in PARTITIONINGS:
+        raise ValueError(f"Unknown partitioning '{partitioning}'; expected one of {PARTITIONINGS}.")
+
+    left_geometries, right_geometries = _shapely_geometries(left), _shapely_geometries(right)
+    left_bounds = shapely.bounds(left_geometries).reshape(-1, 4)
+    right_bounds = shapely.bounds(right_geometries).reshape(-1, 4)
+    if predicate == "dwithin":
+        # Grow the left boxes so that every candidate pair's boxes overlap.
+        left_bounds = left_bounds + np.array([-distance, -distance, distance, distance])
+    if partitions is None:
+        total = len(left_geometries) + len(right_geometries)
+        # With a pool, give each worker a few tiles so uneven tiles balance out.
+        partitions = max(total // GEOMETRIES_PER_PARTITION, 4 * processes if processes else 1, 1)
+
+    matched = np.zeros(len(left_geometries), dtype=bool) if how == "left" else None
+    # Geometries without finite bounds are never partitioned, so a left join reports them as unmatched.
+    valid = _finite(left_bounds).any() and _finite(right_bounds).any()
+    if valid:
+        tasks = _partition_tasks(left_geometries, left_bounds, right_geometries, right_bounds,
+                                 predicate, distance, partitioning, partitions)
+        for left_positions, right_positions in _run_tasks(tasks, processes):
+            if left_positions.size:
+                if matched is not None:
+                    matched[left_positions] = True
+                yield left_positions, right_positions
+    if matched is not None:
+        unmatched = np.nonzero(~matched)[0]
+        if unmatched.size:
+            yield unmatched, np.full(unmatched.size, -1, dtype=unmatched.dtype)
+
+
+def spatial_join(left, right,
+                 predicate: str = "intersects",
+                 distance: Optional[float] = None,
+                 how: str = "inner",
+                 partitioning: str = "grid",
+                 partitions: Optional[int] = None,
+                 processes: Optional[int] = None) -> Tuple:
+    """
+    Joins two collections like ``iter_spatial_join`` and returns all matches at once.
+
+    :return: (left positions, right positions) integer arrays, sorted by left then right position.
+    """
+    chunks = list(iter_spatial_join(left, right, predicate, distance, how, partitioning, partitions, processes))
+    if not chunks:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    left_positions = np.concatenate([chunk[0] for chunk in chunks])
+    right_positions = np.concatenate([chunk[1] for chunk in chunks])
+    order = np.lexsort((right_positions, left_positions))
+    return left_positions[order], right_positions[order]
+
+
+__all__ = ["iter_spatial_join", "spatial_join", "JOIN_PREDICATES", "JOIN_TYPES", "PARTITIONINGS"]
@@ -25,6 +25,8 @@ class TimePoint(BaseAbstractEntity):
     Uses an internal datetime object that can be timezone-aware.
     """
 
+    __slots__ = ("_datetime",)
+
     def __init__(self, dt, name: str = 'time point', description: str = '', uid: str | UUID = None) -> None:
         """
         :param dt: A datetime.datetime instance (aware or naive).
@@ -139,6 +141,8 @@ class FuzzyTimePoint(TimePoint):
     Represents a time point with uncertainty (e.g. 'around 3 PM' with a tolerance).
     """
 
+    __slots__ = ("tolerance",)
+
     def __init__(self, dt, tolerance: timedelta, name: str = 'fuzzy time point', description: str = '',
                  uid: str | UUID = None):
         super().__init__(dt, name, description, uid or uuid4())
@@ -156,6 +160,8 @@ class TimeInterval(BaseAbstractEntity):
     Optionally, a 'confidence' level (from 0 to 1) can indicate uncertainty.
     """
 
+    __slots__ = ("start", "end", "confidence")
+
     def __init__(self, start, end, name: str = 'time interval', description: str = '', uid: str | UUID = None,
                  confidence: float = 1.0):
         uid = uid or uuid4()
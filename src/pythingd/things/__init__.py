@@ -0,0 +1,71 @@
+"""
+Quick Imports & Interfaces
+
+The commonly used classes of the library in one place. Names are resolved on first access, so
+``from src.pythingd.things import TimePoint`` only imports the time module, and heavy
+dependencies (pint, shapely, numpy, networkx) load only if the classes that need them are used.
+"""
+
+from typing import TYPE_CHECKING
+
+from src.pythingd.utils.lazy import lazy_exports
+
+_BASE = "src.pythingd.__base__"
+_TIME = "src.pythingd.commons.foundational.time"
+_QUANTITY = "src.pythingd.commons.foundational.quantity"
+_SPACE = "src.pythingd.commons.foundational.space"
+_SPATIAL_JOIN = "src.pythingd.commons.foundational.spatial_join"
+_RELATIONS = "src.pythingd.commons.entity.relations"
+_STATISTICAL = "src.pythingd.utils.statistical"
+
+_EXPORTS = {
+    # Base entities
+    "Entity": _BASE,
+    "BaseEntity": _BASE,
+    "BaseAttribute": _BASE,
+    "BaseRelationship": _BASE,
+    "EntityRegistry": _BASE,
+    # Time
+    "TimePoint": _TIME,
+    "FuzzyTimePoint": _TIME,
+    "TimeInterval": _TIME,
+    # Quantities
+    "Quantity": _QUANTITY,
+    "DerivedQuantity": _QUANTITY,
+    "QuantityValue": _QUANTITY,
+    "QuantityArray": _QUANTITY,
+    # Space
+    "Point": _SPACE,
+    "PointCollection": _SPACE,
+    "PointIndex": _SPACE,
+    "SpatialRegion": _SPACE,
+    "SpatialVolume": _SPACE,
+    "VolumeCollection": _SPACE,
+    "BoundingVolumeHierarchy": _SPACE,
+    "SpatialIndex": _SPACE,
+    "spatial_join": _SPATIAL_JOIN,
+    "iter_spatial_join": _SPATIAL_JOIN,
+    # Relationships
+    "RelationType": _RELATIONS,
+    "StandardRelationship": _RELATIONS,
+    "RelationshipManager": _RELATIONS,
+    "RelationshipBulkManager": _RELATIONS,
+    # Statistics
+    "StreamingStatistics": _STATISTICAL,
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from src.pythingd.__base__ import BaseAttribute, BaseEntity, BaseRelationship, Entity, EntityRegistry
+    from src.pythingd.commons.entity.relations import (RelationshipBulkManager, RelationshipManager, RelationType,
+                                                       StandardRelationship)
+    from src.pythingd.commons.foundational.quantity import DerivedQuantity, Quantity, QuantityArray, QuantityValue
+    from src.pythingd.commons.foundational.space import (BoundingVolumeHierarchy, Point, PointCollection, PointIndex,
+                                                         SpatialIndex, SpatialRegion, SpatialVolume,
+                                                         VolumeCollection)
+    from src.pythingd.commons.foundational.spatial_join import iter_spatial_join, spatial_join
+    from src.pythingd.commons.foundational.time import FuzzyTimePoint, TimeInterval, TimePoint
+    from src.pythingd.utils.statistical import StreamingStatistics
+
+__all__ = list(_EXPORTS)
@@ -0,0 +1,98 @@
+"""
+Module: lazy.py
+
+Deferred imports for heavy and optional dependencies.
+
+``lazy_import`` returns a module stand-in that performs the real import the first time one of its
+attributes is used, so modules can keep writing ``np.asarray(...)`` while numpy, shapely, pint or
+networkx only load for code paths that need them. ``is_available`` checks whether an optional
+dependency is installed without importing it, and ``lazy_exports`` gives a package PEP 562
+attribute hooks that import a submodule only when one of its names is first looked up.
+"""
+
+import importlib
+import importlib.util
+from functools import lru_cache
+from types import ModuleType
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class LazyModule(ModuleType):
+    """
+    Stands in for a module until one of its attributes is first accessed.
+
+    On first access the module is imported and its namespace copied onto this object, so later
+    lookups are ordinary attribute reads with no per-access overhead.
+    """
+
+    def __init__(self, name: str, hint: Optional[str] = None) -> None:
+        """
+        :param name: The fully qualified module name.
+        :param hint: Appended to the ImportError message if the module is not installed.
+        """
+        super().__init__(name)
+        self.__dict__["_lazy_hint"] = hint
+        self.__dict__["_lazy_loaded"] = False
+
+    def _lazy_load(self) -> ModuleType:
+        try:
+            module = importlib.import_module(self.__name__)
+        except ImportError as error:
+            hint = self.__dict__["_lazy_hint"]
+            message = f"{self.__name__} is not installed." + (f" {hint}" if hint else "")
+            raise ImportError(message) from error
+        self.__dict__.update(module.__dict__)
+        self.__dict__["_lazy_loaded"] = True
+        return module
+
+    def __getattr__(self, attribute: str):
+        # Only called for names not yet in the instance namespace, i.e. before the first load.
+        if self.__dict__["_lazy_loaded"] or attribute.startswith("__"):
+            raise AttributeError(f"module '{self.__name__}' has no attribute '{attribute}'")
+        return getattr(self._lazy_load(), attribute)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_loaded"] else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str, hint: Optional[str] = None) -> LazyModule:
+    """
+    Returns a stand-in for a module that is imported on first attribute access.
+    """
+    return LazyModule(name, hint)
+
+
+@lru_cache(maxsize=None)
+def is_available(name: str) -> bool:
+    """
+    Returns True if the top-level package of ``name`` is installed, without importing it.
+    """
+    return importlib.util.find_spec(name.partition(".")[0]) is not None
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Builds PEP 562 ``__getattr__`` and ``__dir__`` hooks that resolve names from submodules on demand.
+
+    :param package: The ``__name__`` of the module installing the hooks.
+    :param exports: A mapping of exported name to the module that defines it.
+    :return: The ``(__getattr__, __dir__)`` pair to assign at module level.
+    """
+    def __getattr__(name: str):
+        try:
+            module_name = exports[name]
+        except KeyError:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'") from None
+        value = getattr(importlib.import_module(module_name), name)
+        # Cache on the package so the hook runs once per name.
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(importlib.import_module(package).__dict__) | set(exports))
+
+    return __getattr__, __dir__
+
+
+__all__ = ["LazyModule", "lazy_import", "is_available", "lazy_exports"]
@@ -0,0 +1,472 @@
+"""
+Module: statistical.py
+
+Single-pass, constant-memory statistics over streams of measurements.
+
+Each accumulator consumes values in batches or one at a time and can be merged with another
+accumulator of the same kind, so partial results computed by separate workers combine into one:
+
+- RunningMoments: count, mean and variance (Welford's update, Chan et al.'s merge).
+- RunningExtrema: minimum and maximum.
+- StreamingHistogram: counts over fixed bin edges.
+- KLLSketch: approximate quantiles with bounded memory (Karnin, Lang & Liberty).
+
+StreamingStatistics combines them and respects units: Quantity, QuantityValue and QuantityArray
+inputs are converted to one unit, and results are returned as QuantityValue instances.
+"""
+
+import copy
+import math
+import random
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.pythingd.commons.foundational.quantity import (Quantity, QuantityArray, QuantityValue, _as_units,
+                                                         _delta_units, conversion_factor, convert_magnitudes)
+from src.pythingd.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Number of items taken at a time from iterables passed to StreamingStatistics.update.
+STREAM_CHUNK_SIZE = 65536
+
+
+class RunningMoments:
+    """
+    Count, mean and variance of a stream, updated in one pass.
+    """
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.mean: float = 0.0
+        self._m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        """Adds a single value using Welford's update."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def update(self, values: "np.ndarray") -> None:
+        """Adds a batch of values."""
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size:
+            batch_mean = float(values.mean())
+            self._combine(values.size, batch_mean, float(np.square(values - batch_mean).sum()))
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Merges another accumulator into this one and returns self."""
+        if other.count:
+            self._combine(other.count, other.mean, other._m2)
+        return self
+
+    def _combine(self, count: int, mean: float, m2: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def rescale(self, scale: float, offset: float = 0.0) -> None:
+        """Applies the affine change of unit ``x * scale + offset`` to every value seen so far."""
+        if self.count:
+            self.mean = self.mean * scale + offset
+            self._m2 *= scale * scale
+
+    def variance(self, ddof: int = 0) -> float:
+        """Returns the variance, or NaN if there are not more than ddof values."""
+        return self._m2 / (self.count - ddof) if self.count > ddof else math.nan
+
+    def std(self, ddof: int = 0) -> float:
+        return math.sqrt(self.variance(ddof))
+
+    def __repr__(self) -> str:
+        return f"RunningMoments(count={self.count}, mean={self.mean}, variance={self.variance()})"
+
+
+class RunningExtrema:
+    """
+    Minimum and maximum of a stream.
+    """
+
+    __slots__ = ("min", "max")
+
+    def __init__(self) -> None:
+        self.min: float = math.inf
+        self.max: float = -math.inf
+
+    def add(self, value: float) -> None:
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def update(self, values: "np.ndarray") -> None:
+        values = np.asarray(values, dtype=float)
+        if values.size:
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+
+    def rescale(self, scale: float, offset: float = 0.0) -> None:
+        if self.min <= self.max:
+            low, high = self.min * scale + offset, self.max * scale + offset
+            self.min, self.max = min(low, high), max(low, high)
+
+    def merge(self, other: "RunningExtrema") -> "RunningExtrema":
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def __repr__(self) -> str:
+        return f"RunningExtrema(min={self.min}, max={self.max})"
+
+
+class StreamingHistogram:
+    """
+    Counts of a stream over fixed bin edges, with separate counts below and above the range.
+    Histograms merge only if their edges are equal.
+    """
+
+    __slots__ = ("edges", "counts", "underflow", "overflow")
+
+    def __init__(self, edges: Iterable[float]) -> None:
+        self.edges = np.asarray(edges, dtype=float)
+        if self.edges.ndim != 1 or self.edges.size < 2 or np.any(np.diff(self.edges) <= 0):
+            raise ValueError("Histogram edges must be a strictly increasing sequence of at least two values.")
+        self.counts = np.zeros(self.edges.size - 1, dtype=np.int64)
+        self.underflow: int = 0
+        self.overflow: int = 0
+
+    @classmethod
+    def linear(cls, start: float, stop: float, bins: int) -> "StreamingHistogram":
+        """Returns a histogram with equally spaced bins."""
+        return cls(np.linspace(start, stop, bins + 1))
+
+    def add(self, value: float) -> None:
+        self.update(np.array([value]))
+
+    def update(self, values: "np.ndarray") -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        # Bins are half-open [a, b) except the last, which includes its right edge, as in np.histogram.
+        positions = np.searchsorted(self.edges, values, side="right") - 1
+        positions[values == self.edges[-1]] = self.counts.size - 1
+        self.underflow += int(np.count_nonzero(positions < 0))
+        self.overflow += int(np.count_nonzero(positions >= self.counts.size))
+        inside = positions[(positions >= 0) & (positions < self.counts.size)]
+        self.counts += np.bincount(inside, minlength=self.counts.size)
+
+    def merge(self, other: "StreamingHistogram") -> "StreamingHistogram":
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different edges.")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def __repr__(self) -> str:
+        return f"StreamingHistogram(bins={self.counts.size}, total={int(self.counts.sum())})"
+
+
+class KLLSketch:
+    """
+    A KLL quantile sketch: approximate ranks and quantiles of a stream in O(k) memory.
+
+    Items are kept in a hierarchy of compactors; when a level fills up it is sorted and every
+    other item (from a random offset) is promoted to the next level with double the weight.
+    Larger k gives more accurate quantiles.
+    """
+
+    __slots__ = ("k", "count", "_compactors", "_max_size", "_random")
+
+    _DECAY = 2.0 / 3.0
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None) -> None:
+        if k < 8:
+            raise ValueError("k must be at least 8.")
+        self.k = k
+        self.count: int = 0
+        self._compactors: List[List[float]] = []
+        self._max_size: int = 0
+        self._random = random.Random(seed)
+        self._grow()
+
+    def _grow(self) -> None:
+        self._compactors.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self._compactors)))
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._compactors) - level - 1
+        return int(math.ceil(self._DECAY ** depth * self.k)) + 1
+
+    def _size(self) -> int:
+        return sum(len(compactor) for compactor in self._compactors)
+
+    def add(self, value: float) -> None:
+        self._compactors[0].append(value)
+        self.count += 1
+        if self._size() >= self._max_size:
+            self._compress()
+
+    def update(self, values: "np.ndarray") -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        # Feed in chunks no larger than the bottom compactor so that each compaction stays local.
+        step = self._capacity(0)
+        for start in range(0, values.size, step):
+            chunk = values[start:start + step]
+            self._compactors[0].extend(chunk.tolist())
+            self.count += chunk.size
+            while self._size() >= self._max_size:
+                self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self._compactors) < len(other._compactors):
+            self._grow()
+        for level, compactor in enumerate(other._compactors):
+            self._compactors[level].extend(compactor)
+        self.count += other.count
+        while self._size() >= self._max_size:
+            self._compress()
+        return self
+
+    def rescale(self, scale: float, offset: float = 0.0) -> None:
+        self._compactors = [[value * scale + offset for value in compactor] for compactor in self._compactors]
+
+    def _compress(self) -> None:
+        for level, compactor in enumerate(self._compactors):
+            if len(compactor) >= self._capacity(level):
+                if level + 1 == len(self._compactors):
+                    self._grow()
+                items = sorted(compactor)
+                # Keep one item back if the count is odd, so that total weight is preserved.
+                kept = [items.pop()] if len(items) % 2 else []
+                self._compactors[level + 1].extend(items[self._random.randint(0, 1)::2])
+                self._compactors[level] = kept
+                return
+
+    def _weighted(self):
+        values = np.concatenate([np.asarray(compactor, dtype=float) for compactor in self._compactors])
+        weights = np.concatenate([np.full(len(compactor), 2 ** level, dtype=np.float64)
+                                  for level, compactor in enumerate(self._compactors)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: Iterable[float]) -> "np.ndarray":
+        """Returns approximate values at the given quantiles (each between 0 and 1)."""
+        qs = np.asarray(list(qs), dtype=float)
+        if not self.count:
+            return np.full(qs.shape, math.nan)
+        values, cumulative = self._weighted()
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side="left")
+        return values[np.minimum(positions, values.size - 1)]
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def rank(self, value: float) -> float:
+        """Returns the approximate fraction of values less than or equal to value."""
+        if not self.count:
+            return math.nan
+        values, cumulative = self._weighted()
+        position = np.searchsorted(values, value, side="right")
+        return float(cumulative[position - 1] / cumulative[-1]) if position else 0.0
+
+    def __repr__(self) -> str:
+        return f"KLLSketch(k={self.k}, count={self.count}, retained={self._size()})"
+
+
+class StreamingStatistics:
+    """
+    Unit-aware summary statistics of a stream: count, mean, variance, min/max, an optional
+    histogram and approximate quantiles, all in constant memory and mergeable.
+
+    Values are held in one unit: the one given, or otherwise the unit of the first quantity seen.
+    Plain numbers and arrays are taken to be in that unit already.
+    """
+
+    def __init__(self,
+                 unit: Any = None,
+                 histogram_edges: Optional[Iterable[float]] = None,
+                 sketch_k: int = 200,
+                 seed: Optional[int] = None) -> None:
+        """
+        :param unit: The unit statistics are kept in (string or Pint unit); None to adopt the first quantity's.
+        :param histogram_edges: Bin edges, in that unit, for an optional histogram.
+        :param sketch_k: Accuracy parameter of the quantile sketch.
+        :param seed: Seed for the quantile sketch's random compaction offsets.
+        """
+        self.unit = _as_units(unit) if unit is not None else None
+        self.moments = RunningMoments()
+        self.extrema = RunningExtrema()
+        self.histogram = StreamingHistogram(histogram_edges) if histogram_edges is not None else None
+        self.sketch = KLLSketch(sketch_k, seed)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pint units are tied to their registry; send them between processes as strings.
+        state = self.__dict__.copy()
+        state["unit"] = None if self.unit is None else str(self.unit)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self.unit is not None:
+            self.unit = _as_units(self.unit)
+
+    def _magnitudes(self, values: Any) -> "np.ndarray":
+        """
+        Converts a Quantity, QuantityValue, QuantityArray, number, array or list of these to a flat
+        array of magnitudes in this accumulator's unit.
+        """
+        if isinstance(values, (Quantity, QuantityValue, QuantityArray)):
+            if self.unit is None:
+                self.unit = values.unit
+            return np.atleast_1d(convert_magnitudes(values.magnitude, values.unit, self.unit))
+        if isinstance(values, (int, float, np.ndarray)):
+            return np.atleast_1d(np.asarray(values, dtype=float)).ravel()
+        if values and isinstance(values[0], (Quantity, QuantityValue)):
+            if self.unit is None:
+                self.unit = values[0].unit
+            # Group by unit so each distinct unit is converted with one multiply-add.
+            magnitudes = np.empty(len(values), dtype=float)
+            by_unit: Dict[Any, List[int]] = {}
+            for i, value in enumerate(values):
+                by_unit.setdefault(value.unit, []).append(i)
+                magnitudes[i] = value.magnitude
+            for unit, indices in by_unit.items():
+                magnitudes[indices] = convert_magnitudes(magnitudes[indices], unit, self.unit)
+            return magnitudes
+        return np.asarray(values, dtype=float).ravel()
+
+    def update(self, values: Any) -> "StreamingStatistics":
+        """
+        Adds a Quantity, QuantityValue, QuantityArray, number, NumPy array or iterable of any of these.
+        Iterables are consumed in chunks of STREAM_CHUNK_SIZE, so unbounded generators use constant memory.
+        """
+        if isinstance(values, (Quantity, QuantityValue, QuantityArray, int, float, np.ndarray)):
+            self._update_magnitudes(self._magnitudes(values))
+            return self
+        iterator = iter(values)
+        chunk = list(islice(iterator, STREAM_CHUNK_SIZE))
+        while chunk:
+            self._update_magnitudes(self._magnitudes(chunk))
+            chunk = list(islice(iterator, STREAM_CHUNK_SIZE))
+        return self
+
+    def _update_magnitudes(self, magnitudes: "np.ndarray") -> None:
+        self.moments.update(magnitudes)
+        self.extrema.update(magnitudes)
+        if self.histogram is not None:
+            self.histogram.update(magnitudes)
+        self.sketch.update(magnitudes)
+
+    def to(self, unit: Any) -> "StreamingStatistics":
+        """
+        Returns a copy with every statistic converted to another unit.
+        The histogram, whose edges are fixed, is dropped unless the unit is unchanged.
+        """
+        unit = _as_units(unit)
+        converted = copy.deepcopy(self)
+        if self.unit is None or unit == self.unit:
+            converted.unit = unit
+            return converted
+        factor = conversion_factor(self.unit, unit)
+        if factor is None:
+            raise ValueError(f"Cannot convert statistics from '{self.unit}' to '{unit}' with an affine map.")
+        scale, offset = factor
+        converted.unit = unit
+        converted.moments.rescale(scale, offset)
+        converted.extrema.rescale(scale, offset)
+        converted.sketch.rescale(scale, offset)
+        converted.histogram = None
+        return converted
+
+    def merge(self, other: "StreamingStatistics") -> "StreamingStatistics":
+        """
+        Merges statistics gathered elsewhere (e.g. by another worker) into this accumulator,
+        converting them to this accumulator's unit first if needed.
+
+        Histograms cannot be converted, so merging raises ValueError if only one side keeps a
+        histogram (unless this accumulator is still empty, in which case it adopts the other's),
+        or if the histograms differ in unit or edges.
+        """
+        converting = self.unit is not None and other.unit is not None and other.unit != self.unit
+        if other.histogram is not None:
+            if self.histogram is None and self.count:
+                raise ValueError("Cannot merge statistics with a histogram into statistics without one.")
+            if converting:
+                raise ValueError(f"Cannot merge histograms kept in '{other.unit}' into '{self.unit}'.")
+            if self.histogram is not None and not np.array_equal(self.histogram.edges, other.histogram.edges):
+                raise ValueError("Cannot merge histograms with different edges.")
+        elif self.histogram is not None and other.count:
+            raise ValueError("Cannot merge statistics without a histogram into statistics with one.")
+        if self.unit is None:
+            self.unit = other.unit
+        elif converting:
+            other = other.to(self.unit)
+        self.moments.merge(other.moments)
+        self.extrema.merge(other.extrema)
+        if other.histogram is not None:
+            if self.histogram is None:
+                self.histogram = copy.deepcopy(other.histogram)
+            else:
+                self.histogram.merge(other.histogram)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def _with_unit(self, magnitude: float, unit: Any = None):
+        unit = unit if unit is not None else self.unit
+        return magnitude if unit is None else QuantityValue(magnitude, unit)
+
+    @property
+    def count(self) -> int:
+        return self.moments.count
+
+    @property
+    def mean(self):
+        return self._with_unit(self.moments.mean if self.count else math.nan)
+
+    def _delta_unit(self):
+        # Spreads are differences, so offset units such as degC report them in delta_degC.
+        return None if self.unit is None else _delta_units(self.unit)
+
+    def variance(self, ddof: int = 0):
+        delta = self._delta_unit()
+        return self._with_unit(self.moments.variance(ddof), delta ** 2 if delta is not None else None)
+
+    def std(self, ddof: int = 0):
+        return self._with_unit(self.moments.std(ddof), self._delta_unit())
+
+    @property
+    def min(self):
+        return self._with_unit(self.extrema.min if self.count else math.nan)
+
+    @property
+    def max(self):
+        return self._with_unit(self.extrema.max if self.count else math.nan)
+
+    def quantile(self, q: float):
+        """Returns the approximate value at quantile q (between 0 and 1)."""
+        return self._with_unit(self.sketch.quantile(q))
+
+    def quantiles(self, qs: Iterable[float]) -> "QuantityArray | np.ndarray":
+        values = self.sketch.quantiles(qs)
+        return values if self.unit is None else QuantityArray(values, self.unit)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "unit": None if self.unit is None else str(self.unit),
+            "count": self.count,
+            "mean": self.moments.mean if self.count else math.nan,
+            "std": self.moments.std(),
+            "min": self.extrema.min if self.count else math.nan,
+            "max": self.extrema.max if self.count else math.nan,
+            "median": self.sketch.quantile(0.5),
+        }
+
+    def __repr__(self) -> str:
+        return f"StreamingStatistics(unit={self.unit}, count={self.count})"
+
+
+__all__ = ["RunningMoments", "RunningExtrema", "StreamingHistogram", "KLLSketch", "StreamingStatistics"]
@@ -0,0 +1,32 @@
+import pytest
+
+from src.pythingd.__base__ import BaseAbstractEntity
+
+
+class Node(BaseAbstractEntity):
+    """
+    A minimal concrete entity for building test graphs.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, identifier, label=None, description="", sumo_class="AbstractEntity"):
+        super().__init__(identifier, label, description, sumo_class)
+
+
+@pytest.fixture
+def node():
+    """
+    The concrete entity class: ``node("a")`` builds an entity with identifier "a".
+    """
+    return Node
+
+
+@pytest.fixture
+def node_factory():
+    """
+    Builds an entity from an entity record, as passed to the serialization and snapshot readers.
+    """
+    def build(record):
+        return Node(**record)
+    return build
@@ -0,0 +1,169 @@
+import gc
+import logging
+
+import pytest
+
+from src.pythingd import __base__
+from src.pythingd.__base__ import BaseAttribute, EntityRegistry, configure_operation_logging, flush_operation_log
+from src.pythingd.commons.entity.relations import StandardRelationship
+
+
+class Tag(BaseAttribute):
+    __slots__ = ()
+
+    def __init__(self, identifier, domain, name, value):
+        super().__init__(identifier, domain, name, value)
+
+
+def assert_buckets_consistent(entity):
+    outgoing = [rel for bucket in entity._relationships_by_type.values() for rel in bucket.values()]
+    incoming = [rel for bucket in entity._incoming_relationships_by_type.values() for rel in bucket.values()]
+    assert sorted(rel.identifier for rel in outgoing) == sorted(entity._relationships)
+    assert sorted(rel.identifier for rel in incoming) == sorted(entity._incoming_relationships)
+    for relation_type, bucket in entity._relationships_by_type.items():
+        assert bucket and all(rel.relation_type == relation_type for rel in bucket.values())
+    for relation_type, bucket in entity._incoming_relationships_by_type.items():
+        assert bucket and all(rel.relation_type == relation_type for rel in bucket.values())
+
+
+def test_entities_use_slots(node):
+    entity = node("a")
+    assert not hasattr(entity, "__dict__")
+    with pytest.raises(AttributeError):
+        entity.unexpected = 1
+
+
+def test_relationships_are_bucketed_by_type(node):
+    a, b, c = node("a"), node("b"), node("c")
+    r1 = StandardRelationship("r1", a, "is_a", b)
+    r2 = StandardRelationship("r2", a, "part_of", c)
+    r3 = StandardRelationship("r3", c, "is_a", a)
+    assert a.get_relationships() == [r1, r2]
+    assert a.get_relationships("is_a") == [r1]
+    assert a.get_relationships("unknown") == []
+    assert a.get_incoming_relationships("is_a") == [r3]
+    assert b.get_incoming_relationships() == [r1]
+    for entity in (a, b, c):
+        assert_buckets_consistent(entity)
+
+
+def test_adding_twice_keeps_one_entry(node):
+    a, b = node("a"), node("b")
+    relationship = StandardRelationship("r1", a, "is_a", b)
+    a.add_relationship(relationship)
+    b.add_incoming_relationship(relationship)
+    assert a.get_relationships() == [relationship]
+    assert b.get_incoming_relationships() == [relationship]
+
+
+def test_remove_drops_empty_buckets(node):
+    a, b = node("a"), node("b")
+    r1 = StandardRelationship("r1", a, "is_a", b)
+    r2 = StandardRelationship("r2", a, "part_of", b)
+    r1.detach()
+    assert a.get_relationships() == [r2]
+    assert "is_a" not in a._relationships_by_type
+    assert b.get_incoming_relationships("is_a") == []
+    a.remove_relationship(r1)
+    for entity in (a, b):
+        assert_buckets_consistent(entity)
+
+
+def test_retype_moves_relationship_between_buckets(node):
+    a, b = node("a"), node("b")
+    relationship = StandardRelationship("r1", a, "is_a", b)
+    relationship.relation_type = "part_of"
+    assert a.get_relationships("is_a") == []
+    assert a.get_relationships("part_of") == [relationship]
+    assert b.get_incoming_relationships("part_of") == [relationship]
+    for entity in (a, b):
+        assert_buckets_consistent(entity)
+
+
+def test_attributes_are_unique_and_removable(node):
+    a = node("a")
+    tag = Tag("t1", a, "colour", "red")
+    a.add_attribute(tag)
+    assert a.get_attributes() == [tag]
+    a.remove_attribute(tag)
+    assert a.get_attributes() == []
+
+
+def test_registry_returns_canonical_entity(node):
+    registry = EntityRegistry()
+    first = registry.register(node("a"))
+    assert registry.register(node("a")) is first
+    assert registry.get("a") is first and registry["a"] is first
+    assert registry.get("missing") is None
+    assert registry.get_or_create("b", lambda: node("b")) is registry.get_or_create("b", lambda: node("other"))
+    assert registry.resolve(["a", "missing", "b"]) == {"a": first, "b": registry["b"]}
+    assert registry.unregister("a") is first and "a" not in registry
+    assert len(registry) == 1 and list(registry) == ["b"]
+
+
+def test_registry_interns_string_identifiers(node):
+    registry = EntityRegistry()
+    identifier = "".join(["node", "-", "1"])
+    entity = registry.register(node(identifier))
+    assert entity.identifier is EntityRegistry.intern("node-1")
+
+
+def test_weak_registry_forgets_unreferenced_entities(node):
+    registry = EntityRegistry(weak=True)
+    kept = registry.register(node("kept"))
+    registry.register(node("dropped"))
+    gc.collect()
+    assert "dropped" not in registry
+    assert registry.get("kept") is kept
+
+
+@pytest.fixture
+def operation_messages(caplog, node):
+    def run(count):
+        hub = node("hub")
+        with caplog.at_level(logging.DEBUG, logger=__base__.__name__):
+            for i in range(count):
+                StandardRelationship(f"r{i}", hub, "is_a", node(f"n{i}"))
+            flush_operation_log()
+        return [record.getMessage() for record in caplog.records if record.name == __base__.__name__]
+
+    yield run
+    configure_operation_logging("each")
+
+
+def test_each_mode_logs_every_operation(operation_messages):
+    configure_operation_logging("each")
+    messages = operation_messages(3)
+    # One outgoing and one incoming line per relationship.
+    assert len(messages) == 6
+    assert messages[0] == "Added relationship r0 to entity hub"
+
+
+def test_sampled_mode_logs_one_in_interval(operation_messages):
+    configure_operation_logging("sampled", interval=4)
+    messages = operation_messages(4)
+    assert len(messages) == 2
+    assert all(message.endswith("(1 in 4 sampled)") for message in messages)
+
+
+def test_aggregate_mode_logs_counts(operation_messages):
+    configure_operation_logging("aggregate", interval=100)
+    assert operation_messages(5) == ["Entity operations: add_relationship=5, add_incoming_relationship=5"]
+
+
+def test_logging_is_skipped_when_debug_is_off(caplog, node):
+    configure_operation_logging("aggregate", interval=1)
+    try:
+        with caplog.at_level(logging.INFO, logger=__base__.__name__):
+            StandardRelationship("r1", node("a"), "is_a", node("b"))
+        assert not caplog.records
+        assert not __base__._operation_log.counts
+    finally:
+        configure_operation_logging("each")
+
+
+def test_invalid_logging_configuration():
+    with pytest.raises(ValueError):
+        configure_operation_logging("verbose")
+    with pytest.raises(ValueError):
+        configure_operation_logging("sampled", interval=0)
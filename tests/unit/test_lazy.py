@@ -0,0 +1,92 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+from src.pythingd.utils.lazy import is_available, lazy_exports, lazy_import
+
+ROOT = Path(__file__).resolve().parents[2]
+HEAVY_MODULES = ("numpy", "scipy", "pint", "shapely", "networkx", "rtree")
+
+
+def run_isolated(statements):
+    """
+    Runs statements in a fresh interpreter and returns the heavy modules loaded after each one.
+    """
+    script = "import json, sys\nloaded = []\n" + "".join(
+        f"{statement}\nloaded.append([m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+        for statement in statements) + "print(json.dumps(loaded))\n"
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def test_packages_load_heavy_modules_only_on_first_use():
+    loaded = run_isolated([
+        "import src.pythingd.things as things",
+        "things.TimePoint",
+        "from src.pythingd.commons.foundational import quantity",
+        "quantity.Quantity",
+        "quantity.Quantity(1, 'meter')",
+    ])
+    assert loaded[:4] == [[], [], [], []]
+    assert "pint" in loaded[4] and "shapely" not in loaded[4]
+
+
+def test_relations_defer_networkx_until_a_graph_is_needed():
+    loaded = run_isolated([
+        "from src.pythingd.commons.entity.relations import RelationshipManager",
+        "manager = RelationshipManager(); len(manager)",
+        "manager.graph",
+    ])
+    assert loaded[:2] == [[], []]
+    assert "networkx" in loaded[2]
+
+
+def test_lazy_exports_resolve_and_cache_names():
+    loaded = run_isolated([
+        "import src.pythingd.commons.foundational as foundational",
+        "names = dir(foundational); assert 'SpatialIndex' in names and 'Quantity' in names",
+        "assert foundational.Point is foundational.Point and 'Point' in vars(foundational)",
+        "foundational.Point(0, 0).geometry",
+    ])
+    assert loaded[:3] == [[], [], []]
+    assert "shapely" in loaded[3] and "pint" not in loaded[3]
+
+
+def test_unknown_exports_raise_attribute_error():
+    import src.pythingd.things as things
+    with pytest.raises(AttributeError, match="has no attribute 'Missing'"):
+        things.Missing
+    assert not hasattr(things, "Missing")
+    assert set(things.__all__) <= set(dir(things))
+
+
+def test_lazy_module_imports_on_first_attribute():
+    module = lazy_import("json")
+    assert "not loaded" in repr(module)
+    assert module.dumps([1]) == "[1]"
+    assert "loaded" in repr(module) and "not loaded" not in repr(module)
+    with pytest.raises(AttributeError):
+        module.no_such_attribute
+
+
+def test_missing_module_raises_import_error_with_hint():
+    module = lazy_import("no_such_package_for_tests", hint="Install it with pip.")
+    with pytest.raises(ImportError, match="no_such_package_for_tests is not installed. Install it with pip."):
+        module.anything
+    assert not is_available("no_such_package_for_tests")
+    assert is_available("json")
+
+
+def test_lazy_exports_hooks(monkeypatch):
+    package = ModuleType("lazy_exports_package")
+    monkeypatch.setitem(sys.modules, package.__name__, package)
+    getattr_hook, dir_hook = lazy_exports(package.__name__, {"dumps": "json"})
+    assert "dumps" in dir_hook() and "dumps" not in vars(package)
+    assert getattr_hook("dumps") is json.dumps
+    assert vars(package)["dumps"] is json.dumps
+    with pytest.raises(AttributeError):
+        getattr_hook("loads")
@@ -0,0 +1,77 @@
+import pytest
+
+from src.pythingd.__base__ import EntityRegistry
+from src.pythingd.commons.entity.mapped import FORMAT_VERSION, MAGIC, MappedSnapshot, save_mapped_snapshot
+from src.pythingd.commons.entity.relations import RelationshipManager, StandardRelationship
+
+
+@pytest.fixture
+def manager(node):
+    a, b, c = node("a", "Alpha"), node("b"), node("c", description="third")
+    manager = RelationshipManager()
+    manager.add_relationship(StandardRelationship("r1", a, "is_a", b))
+    manager.add_relationship(StandardRelationship("r2", b, "part_of", c, label="b in c"))
+    manager.add_relationship(StandardRelationship("r3", a, "part_of", c))
+    return manager
+
+
+def test_round_trip(tmp_path, manager, node_factory):
+    path = tmp_path / "graph.snap"
+    save_mapped_snapshot(str(path), manager)
+    with MappedSnapshot(str(path), node_factory) as snapshot:
+        assert (snapshot.node_count, snapshot.edge_count) == (3, 3)
+        assert "a" in snapshot and "z" not in snapshot
+        assert snapshot.entity("a").label == "Alpha"
+        assert snapshot.entity("c").description == "third"
+        assert sorted(rel.identifier for rel in snapshot.relationships_from("a")) == ["r1", "r3"]
+        assert [rel.identifier for rel in snapshot.relationships_to("c")] in (["r2", "r3"], ["r3", "r2"])
+        assert snapshot.relationship("r2").label == "b in c"
+        assert snapshot.relationship("r2").relation_type == "part_of"
+        assert sorted(snapshot.successors("a")) == ["b", "c"]
+        restored = snapshot.to_manager()
+    assert sorted(rel.identifier for rel in restored.relationships) == ["r1", "r2", "r3"]
+
+
+def test_entities_are_materialized_once_and_shared_through_registry(tmp_path, manager, node, node_factory):
+    path = tmp_path / "graph.snap"
+    save_mapped_snapshot(str(path), manager)
+    registry = EntityRegistry()
+    existing = registry.register(node("b"))
+    with MappedSnapshot(str(path), node_factory, registry=registry) as snapshot:
+        assert snapshot.entity("a") is snapshot.entity("a")
+        assert snapshot.entity("b") is existing
+        assert snapshot.relationship("r1").target is existing
+
+
+def test_bad_magic_raises_value_error(tmp_path, node_factory):
+    path = tmp_path / "bad.snap"
+    path.write_bytes(b"NOTASNAP" + bytes(64))
+    with pytest.raises(ValueError, match="not a PyThings snapshot"):
+        MappedSnapshot(str(path), node_factory)
+
+
+def test_unsupported_version_raises_value_error(tmp_path, manager, node_factory):
+    path = tmp_path / "graph.snap"
+    save_mapped_snapshot(str(path), manager)
+    data = bytearray(path.read_bytes())
+    data[len(MAGIC):len(MAGIC) + 4] = (FORMAT_VERSION + 1).to_bytes(4, "little")
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="Unsupported snapshot version"):
+        MappedSnapshot(str(path), node_factory)
+
+
+def test_truncated_file_raises_value_error(tmp_path, node_factory):
+    path = tmp_path / "empty.snap"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError, match="not a PyThings snapshot"):
+        MappedSnapshot(str(path), node_factory)
+
+
+def test_close_releases_map_after_use_and_is_idempotent(tmp_path, manager, node_factory):
+    path = tmp_path / "graph.snap"
+    save_mapped_snapshot(str(path), manager)
+    snapshot = MappedSnapshot(str(path), node_factory)
+    snapshot.relationships_from("a")
+    snapshot.to_snapshot()
+    snapshot.close()
+    snapshot.close()
@@ -0,0 +1,222 @@
+import pickle
+
+import numpy as np
+import pint
+import pytest
+
+from src.pythingd.commons.foundational.quantity import (DerivedQuantity, Quantity, QuantityArray, QuantityValue,
+                                                        conversion_factor, convert_magnitudes, get_registry,
+                                                        normalize_to_base_units, parse_unit)
+
+CONVERSIONS = [("meter", "foot"), ("km/hour", "m/s"), ("degC", "degF"), ("degF", "degC"), ("degF", "kelvin"),
+               ("delta_degC", "delta_degF"), ("psi", "pascal"), ("liter", "gallon")]
+
+
+def pint_quantity(magnitude, unit):
+    return get_registry().Quantity(magnitude, unit)
+
+
+def test_array_arithmetic_matches_pint():
+    a, b = QuantityArray([1.0, 2.0, 3.0], "meter"), QuantityArray([10.0, 20.0, 30.0], "centimeter")
+    pa, pb = pint_quantity(a.magnitude, "meter"), pint_quantity(b.magnitude, "centimeter")
+    seconds, pint_seconds = Quantity(2.0, "second"), pint_quantity(2.0, "second")
+    for result, expected in [(a + b, pa + pb), (a - b, pa - pb), (a * b, pa * pb), (a / b, pa / pb),
+                             (a * 2.0, pa * 2.0), (3.0 / a, 3.0 / pa), (-a, -pa), (a / seconds, pa / pint_seconds)]:
+        np.testing.assert_allclose(result.to(expected.units).magnitude, expected.magnitude)
+    assert (a > b).tolist() == [True, True, True]
+    assert isinstance(a[1], Quantity) and a[1].magnitude == 2.0
+    assert a[1:].magnitude.tolist() == [2.0, 3.0]
+    assert [value.magnitude for value in a.to_values()] == [1.0, 2.0, 3.0]
+    assert [value.magnitude for value in a] == [1.0, 2.0, 3.0]
+
+
+def test_array_reductions_match_pint():
+    values = np.array([1.0, 4.0, 2.5])
+    array, expected = QuantityArray(values, "meter"), pint_quantity(values, "meter")
+    for reduction in ("sum", "mean", "std", "min", "max"):
+        result, reference = getattr(array, reduction)(), getattr(expected, reduction)()
+        assert result.unit == reference.units
+        assert result.magnitude == pytest.approx(reference.magnitude)
+
+
+def test_offset_unit_reductions_follow_pint():
+    values = np.array([10.0, 20.0, 30.0])
+    array, expected = QuantityArray(values, "degC"), pint_quantity(values, "degC")
+    with pytest.raises(pint.OffsetUnitCalculusError):
+        array.sum()
+    for reduction in ("mean", "std", "min", "max"):
+        result, reference = getattr(array, reduction)(), getattr(expected, reduction)()
+        assert result.unit == reference.units
+        assert result.magnitude == pytest.approx(reference.magnitude)
+    assert array.std().unit == get_registry().delta_degC
+
+
+def test_from_quantities_converts_to_a_common_unit():
+    array = QuantityArray.from_quantities([Quantity(1.0, "meter"), Quantity(50.0, "centimeter")])
+    assert array.unit == get_registry().meter
+    assert array.magnitude.tolist() == [1.0, 0.5]
+    with pytest.raises(ValueError):
+        QuantityArray.from_quantities([])
+
+
+def test_parse_unit_caches_results():
+    parse_unit.cache_clear()
+    first = parse_unit("kilometer / hour")
+    assert parse_unit("kilometer / hour") is first
+    assert parse_unit.cache_info().hits == 1 and parse_unit.cache_info().misses == 1
+    assert first.units == get_registry().kilometer / get_registry().hour and first.magnitude == 1
+
+
+def test_invalid_units_raise():
+    with pytest.raises(pint.UndefinedUnitError):
+        parse_unit("furlongs_per_blorp")
+    with pytest.raises(pint.UndefinedUnitError):
+        Quantity(1.0, "furlongs_per_blorp")
+
+
+def test_unit_expressions_with_a_factor_scale_the_value():
+    quantity = Quantity(3.0, "10 meter")
+    assert quantity.magnitude == 30.0 and quantity.unit == get_registry().meter
+
+
+def test_quantities_round_trip_through_pint():
+    original = pint_quantity(2.5, "newton * meter")
+    quantity = Quantity._from_pint(original, identifier="torque")
+    assert quantity.identifier == "torque"
+    assert quantity.label == f"{original.units} quantity"
+    assert quantity._quantity is original
+    assert (quantity.magnitude, quantity.unit) == (original.magnitude, original.units)
+    converted = quantity.to("foot * pound_force")
+    assert converted.magnitude == pytest.approx(original.m_as("foot * pound_force"))
+    assert converted.to("newton * meter").magnitude == pytest.approx(2.5)
+    assert Quantity(1.0, "meter").identifier != Quantity(1.0, "meter").identifier
+
+
+@pytest.mark.parametrize("first, second", [((3.0, "meter"), (2.0, "meter")), ((3.0, "meter"), (50.0, "centimeter")),
+                                           ((2.0, "newton"), (4.0, "second")), ((1.5, "kilometer"), (2.0, "hour"))])
+def test_value_arithmetic_matches_pint(first, second):
+    a, b = QuantityValue(*first), QuantityValue(*second)
+    pa, pb = pint_quantity(*first), pint_quantity(*second)
+    for result, expected in [(a * b, pa * pb), (a / b, pa / pb), (a * 3, pa * 3), (2 * a, 2 * pa), (a / 4, pa / 4)]:
+        assert result.to(expected.units).magnitude == pytest.approx(expected.magnitude)
+    if pa.dimensionality == pb.dimensionality:
+        for result, expected in [(a + b, pa + pb), (a - b, pa - pb)]:
+            assert result.unit == expected.units
+            assert result.magnitude == pytest.approx(expected.magnitude)
+
+
+def test_offset_value_arithmetic_follows_pint():
+    a, b = QuantityValue(20.0, "degC"), QuantityValue(5.0, "degC")
+    with pytest.raises(pint.OffsetUnitCalculusError):
+        a + b
+    difference = a - b
+    assert difference.unit == (pint_quantity(20.0, "degC") - pint_quantity(5.0, "degC")).units
+    assert difference.magnitude == 15.0
+    assert difference.to("delta_degF").magnitude == pytest.approx(27.0)
+    for operation in (lambda: a * 2, lambda: a * QuantityValue(2.0, "meter"), lambda: a / 2):
+        with pytest.raises(pint.OffsetUnitCalculusError):
+            operation()
+
+
+def test_value_equality_hashing_and_ordering():
+    assert QuantityValue(1.0, "meter") == QuantityValue(1.0, "m")
+    assert QuantityValue(1.0, "meter") != QuantityValue(100.0, "centimeter")
+    assert len({QuantityValue(1.0, "meter"), QuantityValue(1.0, "meter")}) == 1
+    assert QuantityValue(1.0, "meter") < QuantityValue(101.0, "centimeter")
+    assert QuantityValue(1.0, "meter") >= QuantityValue(100.0, "centimeter")
+    value = QuantityValue(2.0, "second")
+    with pytest.raises(AttributeError):
+        value.unexpected = 1
+    promoted = value.to_quantity()
+    assert promoted.identifier == value.identifier and promoted.magnitude == 2.0
+
+
+def test_values_pickle_with_unit_and_identifier():
+    value = QuantityValue(2.0, "meter / second ** 2")
+    assert pickle.loads(pickle.dumps(value))._identifier is None
+    identifier = value.identifier
+    restored = pickle.loads(pickle.dumps(value))
+    assert restored == value and restored.unit is value.unit
+    assert restored.identifier == identifier
+
+
+def test_arrays_combine_with_values():
+    array, value = QuantityArray([1.0, 2.0], "meter"), QuantityValue(50.0, "centimeter")
+    pa, pv = pint_quantity(array.magnitude, "meter"), pint_quantity(50.0, "centimeter")
+    for result, expected in [(array + value, pa + pv), (array - value, pa - pv), (array * value, pa * pv),
+                             (value * array, pv * pa), (array / value, pa / pv), (value / array, pv / pa)]:
+        assert isinstance(result, QuantityArray)
+        np.testing.assert_allclose(result.to(expected.units).magnitude, expected.magnitude)
+    assert (array > value).tolist() == [True, True]
+
+
+@pytest.mark.parametrize("source, target", CONVERSIONS)
+def test_conversion_matches_pint(source, target):
+    values = np.array([-40.0, 0.0, 1.5, 37.0, 1e6])
+    expected = pint_quantity(values, source).m_as(target)
+    np.testing.assert_allclose(convert_magnitudes(values, source, target), expected, rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(Quantity(37.0, source).to(target).magnitude, expected[3], rtol=1e-12)
+    np.testing.assert_allclose(QuantityValue(37.0, source).to(target).magnitude, expected[3], rtol=1e-12)
+    np.testing.assert_allclose(QuantityArray(values, source).to(target).magnitude, expected, rtol=1e-12, atol=1e-9)
+
+
+def test_offset_scale_is_exact():
+    assert conversion_factor("degF", "degC") == pytest.approx((5 / 9, -160 / 9), rel=1e-15)
+    assert conversion_factor("meter", "centimeter") == (100.0, 0.0)
+
+
+def test_non_affine_units_fall_back_to_pint():
+    assert conversion_factor("decibel", "dimensionless") is None
+    expected = pint_quantity(np.array([10.0, 20.0]), "decibel").m_as("dimensionless")
+    np.testing.assert_allclose(convert_magnitudes([10.0, 20.0], "decibel", "dimensionless"), expected)
+
+
+def test_incompatible_units_raise():
+    with pytest.raises(pint.DimensionalityError):
+        convert_magnitudes([1.0], "meter", "second")
+
+
+def test_normalize_to_base_units_matches_pint():
+    quantities = [Quantity(1.0, "kilometer"), QuantityValue(3.0, "foot"), Quantity(2.0, "meter"),
+                  QuantityValue(12.0, "inch")]
+    normalized = normalize_to_base_units(quantities)
+    expected = [pint_quantity(q.magnitude, q.unit).to_base_units() for q in quantities]
+    assert normalized.unit == expected[0].units
+    np.testing.assert_allclose(normalized.magnitude, [q.magnitude for q in expected])
+    with pytest.raises(ValueError):
+        normalize_to_base_units([Quantity(1.0, "meter"), Quantity(1.0, "second")])
+    with pytest.raises(ValueError):
+        normalize_to_base_units([])
+
+
+@pytest.fixture
+def derived_names(monkeypatch):
+    # Registrations are class-wide, so each test works on its own copy of the table.
+    names = dict(DerivedQuantity.DERIVED_UNIT_NAMES)
+    monkeypatch.setattr(DerivedQuantity, "DERIVED_UNIT_NAMES", names)
+    return names
+
+
+def test_derived_unit_names(derived_names):
+    assert DerivedQuantity.derived_unit_name("km/hour") == "velocity"
+    assert DerivedQuantity(9.8, "m/s**2").get_derived_unit_name() == "acceleration"
+    assert DerivedQuantity.from_quantity(Quantity(2.0, "acre")).get_derived_unit_name() == "area"
+    # An unknown dimensionality is described by its dimensions.
+    assert DerivedQuantity.derived_unit_name("kelvin") == "{'temperature': 1}"
+
+
+def test_registering_and_re_registering_a_unit(derived_names):
+    DerivedQuantity.register_derived_unit("force", "newton")
+    assert DerivedQuantity.derived_unit_name("pound_force") == "force"
+    DerivedQuantity.register_derived_unit("push", {"[mass]": 1, "[length]": 1, "[time]": -2})
+    assert DerivedQuantity.derived_unit_name("newton") == "push"
+    assert len(derived_names) == 6
+
+
+def test_classify_groups_by_derived_kind(derived_names):
+    DerivedQuantity.register_derived_unit("force", "newton")
+    quantities = [Quantity(1.0, "meter"), QuantityValue(2.0, "m/s"), QuantityArray([1.0], "newton"),
+                  Quantity(3.0, "foot"), QuantityValue(1.0, "kelvin")]
+    groups = DerivedQuantity.classify(quantities)
+    assert groups == {"length": [quantities[0], quantities[3]], "velocity": [quantities[1]],
+                      "force": [quantities[2]], "{'temperature': 1}": [quantities[4]]}
@@ -0,0 +1,222 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.pythingd.__base__ import EntityRegistry
+from src.pythingd.commons.entity.relations import (BulkOperationSummary, RelationshipBulkManager,
+                                                   RelationshipManager, RelationType, StandardRelationship,
+                                                   build_relationship_graph, find_paths, get_centrality,
+                                                   k_shortest_paths, shortest_path)
+
+RELATION_TYPES = ("partOf", "relatedTo", "dependsOn")
+
+
+def random_manager(node, seed=0, nodes=30, edges=120):
+    rng = random.Random(seed)
+    entities = [node(f"n{i}") for i in range(nodes)]
+    manager = RelationshipManager()
+    for i in range(edges):
+        source, target = rng.sample(entities, 2)
+        manager.add_relationship(StandardRelationship(f"r{i}", source, rng.choice(RELATION_TYPES), target))
+    return manager, entities
+
+
+def identifiers(relationships):
+    return sorted(rel.identifier for rel in relationships)
+
+
+def assert_indexes_consistent(manager, entities):
+    relationships = manager.relationships
+    assert len(manager) == len(relationships)
+    for rel in relationships:
+        assert manager.get_relationship(rel.identifier) is rel
+        assert rel in manager
+    for entity in entities:
+        expected_from = [rel for rel in relationships if rel.source.identifier == entity.identifier]
+        expected_to = [rel for rel in relationships if rel.target.identifier == entity.identifier]
+        assert manager.get_relationships_from(entity) == expected_from
+        assert manager.get_relationships_to(entity) == expected_to
+        # A retyped relationship moves to the end of its new type's bucket, so typed lookups are unordered.
+        for relation_type in RELATION_TYPES:
+            assert identifiers(manager.get_relationships_from(entity, relation_type)) == identifiers(
+                rel for rel in expected_from if rel.relation_type == relation_type)
+            assert identifiers(manager.get_relationships_to(entity, relation_type)) == identifiers(
+                rel for rel in expected_to if rel.relation_type == relation_type)
+    for relation_type in RELATION_TYPES:
+        assert identifiers(manager.get_relationships_by_type(relation_type)) == identifiers(
+            rel for rel in relationships if rel.relation_type == relation_type)
+
+
+def assert_graph_matches(manager):
+    expected = build_relationship_graph(manager.get_all_relationships())
+    assert set(manager.graph.edges) == set(expected.edges)
+    assert set(manager.graph.nodes) == set(expected.nodes)
+    assert dict(manager.degree_centrality()) == pytest.approx(nx.degree_centrality(expected))
+
+
+def test_indexes_follow_add_remove_and_retype(node):
+    manager, entities = random_manager(node)
+    assert_indexes_consistent(manager, entities)
+    for identifier in ("r3", "r10", "r11", "missing"):
+        manager.remove_relationship(identifier)
+    manager.retype_relationship("r5", RelationType.PART_OF)
+    manager.retype_relationship("r6", "brand_new_type")
+    assert manager.get_relationships_by_type("brand_new_type") == [manager.get_relationship("r6")]
+    assert manager.retype_relationship("missing", "is_a") is None
+    assert_indexes_consistent(manager, entities)
+
+
+def test_adding_a_managed_relationship_is_ignored(node):
+    manager, _ = random_manager(node, edges=5)
+    version = manager.version
+    manager.add_relationship(manager.get_relationship("r0"))
+    assert len(manager) == 5 and manager.version == version
+
+
+def test_relationships_are_read_only_and_assignable(node):
+    manager, entities = random_manager(node, edges=10)
+    with pytest.raises(AttributeError):
+        manager.relationships.append(None)
+    graph, centrality = manager.graph, manager.degree_centrality()
+    kept = list(manager.relationships[:4])
+    manager.relationships = kept
+    assert list(manager.relationships) == kept
+    assert_indexes_consistent(manager, entities)
+    assert_graph_matches(manager)
+    # Views handed out before the reassignment stay live.
+    assert len(graph.edges) == len(manager.graph.edges)
+    assert dict(centrality) == dict(manager.degree_centrality())
+
+
+def test_directly_assigned_type_is_unindexed_under_the_recorded_type(node):
+    a, b = node("a"), node("b")
+    manager = RelationshipManager()
+    relationship = StandardRelationship("r1", a, "partOf", b)
+    manager.add_relationship(relationship)
+    relationship.relation_type = "dependsOn"
+    # The manager keeps filing the relationship under its indexed type until it is retyped.
+    assert manager.get_relationships_by_type("partOf") == [relationship]
+    assert manager.get_relationships_to(b, "partOf") == [relationship]
+    manager.retype_relationship(relationship, "dependsOn")
+    assert manager.get_relationships_by_type("partOf") == []
+    assert manager.get_relationships_from(a, "dependsOn") == [relationship]
+
+    relationship.relation_type = "relatedTo"
+    manager.remove_relationship("r1")
+    assert manager._by_type == {} and manager._by_source_type == {} and manager._types == {}
+
+
+def test_bulk_delete_and_update_summaries(node):
+    manager, entities = random_manager(node, edges=10)
+    bulk = RelationshipBulkManager(manager, EntityRegistry())
+    deleted = manager.get_relationship("r0")
+    summary = bulk.delete_bulk(["r0", "r1", "r0", "missing"])
+    assert summary == BulkOperationSummary(applied=2, missing=1)
+    assert summary.total == 3
+    assert deleted not in deleted.source.get_relationships()
+    assert deleted not in deleted.target.get_incoming_relationships()
+
+    summary = bulk.update_bulk([
+        {"identifier": "r2", "label": "renamed", "relation_type": "partOf"},
+        {"identifier": "r3", "relation_type": RelationType.DEPENDS_ON},
+        {"identifier": "r0", "label": "deleted"},
+        {"label": "no identifier"},
+        {"identifier": "r4", "relation_type": 42},
+    ])
+    assert summary.to_dict() == {"applied": 2, "missing": 1, "rejected": 2}
+    assert manager.get_relationship("r2").label == "renamed"
+    assert manager.get_relationship("r2") in manager.get_relationships_by_type(RelationType.PART_OF)
+    assert manager.get_relationship("r3").relation_type == "dependsOn"
+    assert_indexes_consistent(manager, entities)
+
+
+def test_graph_and_centrality_follow_changes(node):
+    manager, _ = random_manager(node, seed=1)
+    assert_graph_matches(manager)
+    for identifier in ("r0", "r1", "r2", "r50"):
+        manager.remove_relationship(identifier)
+    manager.retype_relationship("r7", "partOf")
+    manager.add_relationship(StandardRelationship("new", node("new-a"), "is_a", node("new-b")))
+    assert_graph_matches(manager)
+    assert get_centrality(manager) == manager.degree_centrality()
+    expected = sorted(nx.degree_centrality(build_relationship_graph(manager.get_all_relationships())).values())
+    assert [value for _, value in manager.degree_centrality().most_central(3)] == pytest.approx(expected[::-1][:3])
+
+
+def test_paths_match_networkx(node):
+    manager, _ = random_manager(node, seed=3, nodes=12, edges=30)
+    graph = build_relationship_graph(manager.get_all_relationships())
+    for source, target in [("n0", "n5"), ("n3", "n9"), ("n11", "n1")]:
+        expected = sorted(nx.all_simple_paths(graph, source, target, cutoff=4))
+        assert sorted(find_paths(graph, source, target, max_depth=4)) == expected
+        assert sorted(manager.find_paths(source, target, max_depth=4)) == expected
+        assert len(manager.find_paths(source, target, max_depth=4, max_paths=2)) == min(2, len(expected))
+        if nx.has_path(graph, source, target):
+            length = nx.shortest_path_length(graph, source, target)
+            assert len(shortest_path(graph, source, target)) - 1 == length
+            assert len(manager.shortest_path(source, target)) - 1 == length
+            lengths = [len(path) for path in nx.shortest_simple_paths(graph, source, target)][:3]
+            assert [len(path) for path in k_shortest_paths(graph, source, target, 3)] == lengths
+            assert [len(path) for path in manager.k_shortest_paths(source, target, 3)] == lengths
+        else:
+            assert manager.shortest_path(source, target) is None
+
+
+def test_paths_filtered_by_relation_type(node):
+    a, b, c = node("a"), node("b"), node("c")
+    manager = RelationshipManager()
+    manager.add_relationship(StandardRelationship("r1", a, "is_a", b))
+    manager.add_relationship(StandardRelationship("r2", b, "part_of", c))
+    manager.add_relationship(StandardRelationship("r3", a, "part_of", c))
+    assert sorted(manager.find_paths("a", "c")) == [["a", "b", "c"], ["a", "c"]]
+    assert manager.find_paths("a", "c", relation_types=["part_of"]) == [["a", "c"]]
+    assert manager.shortest_path("a", "b", relation_types=["part_of"]) is None
+
+
+def test_path_cache_is_invalidated_by_changes(node):
+    a, b, c = node("a"), node("b"), node("c")
+    manager = RelationshipManager()
+    manager.add_relationship(StandardRelationship("r1", a, "is_a", b))
+    assert manager.shortest_path("a", "c") is None
+    manager.add_relationship(StandardRelationship("r2", b, "is_a", c))
+    assert manager.shortest_path("a", "c") == ["a", "b", "c"]
+    assert manager.find_paths("a", "c", max_depth=3) == [["a", "b", "c"]]
+    manager.remove_relationship("r2")
+    assert manager.shortest_path("a", "c") is None
+    assert manager.find_paths("a", "c", max_depth=3) == []
+
+
+def test_unbounded_path_enumerations_are_not_cached(node):
+    manager, _ = random_manager(node, seed=3, nodes=12, edges=30)
+    manager.find_paths("n0", "n5")
+    assert not manager._path_cache
+    manager.find_paths("n0", "n5", max_paths=5)
+    assert len(manager._path_cache) == 1
+
+
+def test_bulk_create_resolves_identifiers(node):
+    registry = EntityRegistry()
+    a, b = registry.register(node("a")), registry.register(node("b"))
+    bulk = RelationshipBulkManager(RelationshipManager(), registry)
+    created = bulk.create_bulk([
+        {"identifier": "r1", "source": "a", "relation_type": "is_a", "target": "b"},
+        {"identifier": "r2", "source": b, "relation_type": RelationType.PART_OF, "target": node("c")},
+    ])
+    assert [rel.identifier for rel in created] == ["r1", "r2"]
+    assert created[0].source is a and created[0].target is b
+    assert registry.get("c") is created[1].target
+    with pytest.raises(ValueError):
+        bulk.create_bulk([{"identifier": "r3", "source": "a", "relation_type": "is_a", "target": "unknown"}])
+
+
+def test_bulk_managers_do_not_share_entities_by_default(node):
+    first, second = RelationshipManager(), RelationshipManager()
+    a1, a2 = node("a"), node("a")
+    RelationshipBulkManager(first).create_bulk([
+        {"identifier": "r1", "source": a1, "relation_type": "is_a", "target": node("b")}])
+    RelationshipBulkManager(second).create_bulk([
+        {"identifier": "r2", "source": a2, "relation_type": "is_a", "target": node("c")}])
+    assert [rel.identifier for rel in a1.get_relationships()] == ["r1"]
+    assert [rel.identifier for rel in a2.get_relationships()] == ["r2"]
+    assert second.get_relationship("r2").source is a2
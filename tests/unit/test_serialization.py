@@ -0,0 +1,94 @@
+import io
+
+import pytest
+
+from src.pythingd.__base__ import EntityRegistry
+from src.pythingd.commons.entity.relations import RelationshipManager, StandardRelationship
+from src.pythingd.commons.entity.serialization import read_ndjson, read_xml, write_ndjson, write_xml
+
+FORMATS = [(write_ndjson, read_ndjson), (write_xml, read_xml)]
+
+
+@pytest.fixture
+def graph(node):
+    nodes = [node("a", "Alpha"), node("b", description="second"), node("c")]
+    manager = RelationshipManager()
+    manager.add_relationship(StandardRelationship("r1", nodes[0], "is_a", nodes[1]))
+    manager.add_relationship(StandardRelationship("r2", nodes[1], "part_of", nodes[2], label="b in c",
+                                                  description="containment"))
+    manager.add_relationship(StandardRelationship("r3", nodes[0], "part_of", nodes[2]))
+    return manager, nodes
+
+
+def relationship_records(manager):
+    return [(rel.identifier, rel.source.identifier, rel.relation_type, rel.target.identifier, str(rel.label),
+             rel.description) for rel in manager.iter_relationships()]
+
+
+def export(writer, manager, nodes=None):
+    buffer = io.StringIO()
+    count = writer(manager, buffer, nodes)
+    buffer.seek(0)
+    return count, buffer
+
+
+@pytest.mark.parametrize("writer, reader", FORMATS)
+def test_round_trip_with_entity_records(graph, node_factory, writer, reader):
+    manager, nodes = graph
+    count, buffer = export(writer, manager, nodes)
+    assert count == 6
+    registry = EntityRegistry()
+    restored = reader(buffer, entity_factory=node_factory, registry=registry, batch_size=2)
+    assert relationship_records(restored) == relationship_records(manager)
+    for original in nodes:
+        entity = registry[original.identifier]
+        assert (entity.label, entity.description, entity.sumo_class) == (
+            original.label, original.description, original.sumo_class)
+    assert restored.get_relationship("r1").source is registry["a"]
+    assert restored.get_relationship("r3").source is registry["a"]
+
+
+@pytest.mark.parametrize("writer, reader", FORMATS)
+def test_endpoints_come_from_entities_then_resolver(graph, node, writer, reader):
+    manager, _ = graph
+    _, buffer = export(writer, manager)
+    requests = []
+
+    def resolver(identifiers):
+        requests.append(sorted(identifiers))
+        return {identifier: node(identifier) for identifier in identifiers}
+
+    known = node("a")
+    restored = reader(buffer, entities={"a": known}, resolver=resolver, batch_size=10)
+    assert relationship_records(restored)[0][:4] == ("r1", "a", "is_a", "b")
+    assert restored.get_relationship("r1").source is known
+    # Unknown endpoints are fetched in one batch, shared by every relationship that needs them.
+    assert requests == [["b", "c"]]
+    assert restored.get_relationship("r1").target is restored.get_relationship("r2").source
+
+
+@pytest.mark.parametrize("writer, reader", FORMATS)
+def test_unresolved_endpoint_raises(graph, node, writer, reader):
+    manager, _ = graph
+    _, buffer = export(writer, manager)
+    with pytest.raises(ValueError, match="Cannot resolve entity"):
+        reader(buffer, entities={"a": node("a")})
+
+
+@pytest.mark.parametrize("reader", [read_ndjson, read_xml])
+def test_invalid_batch_size(reader):
+    with pytest.raises(ValueError):
+        reader(io.StringIO(""), batch_size=0)
+
+
+def test_ndjson_rejects_unknown_record_kind():
+    with pytest.raises(ValueError, match="Unknown record kind"):
+        read_ndjson(io.StringIO('{"kind": "edge", "identifier": "x"}\n'))
+
+
+def test_reading_into_an_existing_manager(graph, node_factory):
+    manager, nodes = graph
+    _, buffer = export(write_ndjson, manager, nodes)
+    target = RelationshipManager()
+    assert read_ndjson(buffer, manager=target, entity_factory=node_factory) is target
+    assert len(target) == len(manager)
@@ -0,0 +1,45 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.pythingd.commons.entity.relations import (RelationshipManager, StandardRelationship,
+                                                   build_relationship_graph, get_centrality)
+from src.pythingd.commons.entity.snapshot import RelationshipSnapshot
+
+
+@pytest.fixture
+def manager(node):
+    rng = random.Random(2)
+    entities = [node(f"n{i}") for i in range(25)]
+    manager = RelationshipManager()
+    for i in range(100):
+        source, target = rng.sample(entities, 2)
+        manager.add_relationship(StandardRelationship(f"r{i}", source, rng.choice(("partOf", "dependsOn")), target))
+    return manager
+
+
+def test_degree_centrality_matches_networkx(manager):
+    snapshot = manager.to_snapshot()
+    expected = nx.degree_centrality(build_relationship_graph(manager.get_all_relationships()))
+    assert snapshot.degree_centrality() == pytest.approx(expected)
+    assert get_centrality(snapshot) == pytest.approx(expected)
+
+
+def test_neighbours_match_networkx(manager):
+    snapshot = RelationshipSnapshot.from_relationships(manager.iter_relationships())
+    graph = build_relationship_graph(manager.get_all_relationships())
+    assert (snapshot.node_count, snapshot.edge_count) == (graph.number_of_nodes(), len(manager))
+    for entity in graph.nodes:
+        assert sorted(snapshot.successors(entity)) == sorted(graph.successors(entity))
+        assert sorted(snapshot.predecessors(entity)) == sorted(graph.predecessors(entity))
+    assert snapshot.identifiers([snapshot.index_of("n3")]) == ["n3"]
+
+
+def test_adjacency_counts_and_type_filter(manager):
+    snapshot = manager.to_snapshot()
+    assert snapshot.adjacency().sum() == len(manager)
+    part_of = snapshot.adjacency(["partOf"])
+    assert part_of.sum() == len(manager.get_relationships_by_type("partOf"))
+    assert (snapshot.adjacency(["partOf"], incoming=True) != part_of.T).nnz == 0
+    assert snapshot.adjacency(["unknown"]).nnz == 0
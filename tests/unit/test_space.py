@@ -0,0 +1,390 @@
+import itertools
+import pickle
+
+import numpy as np
+import pytest
+import shapely
+from shapely import affinity
+
+from src.pythingd.commons.foundational.space import (BoundingVolumeHierarchy, Point, PointCollection, PointIndex,
+                                                     SpatialIndex, SpatialRegion, SpatialVolume, VolumeCollection,
+                                                     pairwise_distances, transform_regions, transform_volumes)
+
+
+def random_regions(rng, count):
+    corners = rng.uniform(0, 100, (count, 2))
+    sizes = rng.uniform(0.5, 8, (count, 2))
+    return [SpatialRegion([(x, y), (x + w, y), (x + w, y + h), (x, y + h)])
+            for (x, y), (w, h) in zip(corners.tolist(), sizes.tolist())]
+
+
+def random_bounds(rng, count):
+    mins = rng.uniform(0, 100, (count, 3))
+    return np.hstack([mins, mins + rng.uniform(0.5, 10, (count, 3))])
+
+
+@pytest.fixture
+def square():
+    return SpatialRegion([(0, 0), (4, 0), (4, 4), (0, 4)])
+
+
+@pytest.fixture
+def regions():
+    return random_regions(np.random.default_rng(0), 200)
+
+
+def test_point_collection_construction():
+    collection = PointCollection([[0, 0], [1, 2], [3, 4]])
+    assert len(collection) == 3 and collection.dimension == 2
+    assert collection.coords.dtype == np.float64
+    assert PointCollection.from_points([Point(1, 2, 3), Point(4, 5, 6)]).coords.tolist() == [[1, 2, 3], [4, 5, 6]]
+    geometries = shapely.points([[0, 1], [2, 3]])
+    from_geometries = PointCollection.from_geometries(geometries)
+    assert from_geometries.coords.tolist() == [[0, 1], [2, 3]]
+    assert from_geometries.geometries is geometries
+    with pytest.raises(ValueError):
+        PointCollection.from_points([Point(0, 0), Point(0, 0, 0)])
+    with pytest.raises(ValueError):
+        PointCollection.from_geometries([shapely.box(0, 0, 1, 1)])
+    with pytest.raises(ValueError):
+        PointCollection([[0, 0, 0, 0]])
+    with pytest.raises(ValueError):
+        PointCollection([1.0, 2.0])
+
+
+def test_empty_collections_need_a_dimension():
+    for coords in ([], np.empty(0), np.empty((0, 3))):
+        assert PointCollection(coords, dimension=3).coords.shape == (0, 3)
+    assert PointCollection.from_points([], dimension=2).coords.shape == (0, 2)
+    with pytest.raises(ValueError):
+        PointCollection([])
+    with pytest.raises(ValueError):
+        PointCollection([]).bounding_box()
+    with pytest.raises(ValueError):
+        PointCollection([], dimension=2).bounding_box()
+
+
+def test_indexing_and_iteration():
+    collection = PointCollection.from_geometries(shapely.points([[0, 1], [2, 3], [4, 5]]))
+    point = collection[1]
+    assert isinstance(point, Point) and point.coords == (2.0, 3.0)
+    assert point.geometry is collection.geometries[1]
+    subset = collection[collection.coords[:, 0] > 1]
+    assert subset.coords.tolist() == [[2, 3], [4, 5]]
+    assert subset.geometries.tolist() == collection.geometries[1:].tolist()
+    assert [p.coords for p in collection] == [(0.0, 1.0), (2.0, 3.0), (4.0, 5.0)]
+    with pytest.raises(ValueError):
+        PointCollection([[0, 0, 0]]).geometries
+
+
+def test_vectorized_accessors_match_per_point_results(square):
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(-2, 6, (200, 2))
+    collection = PointCollection(coords)
+    points = [Point(x, y) for x, y in coords.tolist()]
+    probe = Point(1, 1)
+    assert np.allclose(collection.distance(probe), [point.distance(probe) for point in points])
+    assert collection.within_distance((1, 1), 2).tolist() == [point.distance(probe) <= 2 for point in points]
+    assert collection.within_bbox((0, 0, 3, 2)).tolist() == [
+        0 <= x <= 3 and 0 <= y <= 2 for x, y in coords.tolist()]
+    assert collection.within(square).tolist() == [square.geometry.contains(p.geometry) for p in points]
+    assert collection.intersects(square).tolist() == [square.geometry.intersects(p.geometry) for p in points]
+    assert collection.bounding_box() == tuple(coords.min(axis=0).tolist() + coords.max(axis=0).tolist())
+    assert np.allclose(collection.translate(1, -1).coords, coords + [1, -1])
+    assert np.allclose(pairwise_distances(collection, points[:5]),
+                       [[a.distance(b) for b in points[:5]] for a in points])
+    with pytest.raises(ValueError):
+        collection.distance((0, 0, 0))
+    with pytest.raises(ValueError):
+        collection.within_bbox((0, 0, 1))
+    with pytest.raises(ValueError):
+        PointCollection([[0, 0, 0]]).within(square)
+
+
+def test_3d_collections():
+    coords = np.array([[0, 0, 0], [1, 2, 2], [3, 4, 12]], dtype=float)
+    collection = PointCollection(coords)
+    assert collection.distance((0, 0, 0)).tolist() == [0.0, 3.0, 13.0]
+    assert collection.translate(dz=1).coords[:, 2].tolist() == [1.0, 3.0, 13.0]
+    assert collection.bounding_box() == (0.0, 0.0, 0.0, 3.0, 4.0, 12.0)
+
+
+@pytest.mark.parametrize("dimension", [2, 3])
+def test_point_index_matches_brute_force(dimension):
+    rng = np.random.default_rng(dimension)
+    points, probes = rng.uniform(0, 10, (300, dimension)), rng.uniform(0, 10, (20, dimension))
+    index = PointIndex(points)
+    distances = np.linalg.norm(probes[:, None] - points[None, :], axis=2)
+    found_distances, found = index.query(probes, k=5)
+    assert np.allclose(found_distances, np.sort(distances, axis=1)[:, :5])
+    assert np.array_equal(found, np.argsort(distances, axis=1)[:, :5])
+    for probe, row, matches in zip(probes, distances, index.query_radius(probes, 1.5)):
+        assert matches.tolist() == np.nonzero(row <= 1.5)[0].tolist()
+        assert index.within_radius(probe, 1.5).tolist() == matches.tolist()
+    assert index.count_within_radius(probes, 1.5).tolist() == (distances <= 1.5).sum(axis=1).tolist()
+    self_distances = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+    expected_pairs = {(i, j) for i, j in zip(*np.nonzero(self_distances <= 0.5)) if i < j}
+    assert {tuple(pair) for pair in index.pairs_within(0.5).tolist()} == expected_pairs
+    assert np.allclose(index.distance_matrix(probes), distances.T)
+    sparse = index.distance_matrix(PointIndex(probes), max_distance=2).toarray()
+    assert np.allclose(sparse, np.where(distances.T <= 2, distances.T, 0))
+
+
+def test_point_index_caps_k_and_honours_max_distance():
+    index = PointIndex([Point(0, 0), Point(3, 0)])
+    distances, positions = index.nearest(Point(0, 1), k=5, max_distance=2)
+    assert distances.tolist() == [1.0] and positions.tolist() == [0]
+    assert index.query([[0, 0]], k=5)[1].shape == (1, 2)
+    for k in (0, -1):
+        with pytest.raises(ValueError):
+            index.query([[0, 0]], k=k)
+
+
+def test_ids_keep_the_shape_of_positions():
+    positional, named = PointIndex([[0, 0], [1, 0], [5, 5]]), PointIndex([[0, 0], [1, 0], [5, 5]], ids="abc")
+    _, found = positional.query([[0, 0], [5, 4]], k=2)
+    assert positional.ids_at(found) == [[0, 1], [2, 1]]
+    assert named.ids_at(found) == [["a", "b"], ["c", "b"]]
+    assert named.ids_at(found[0]) == ["a", "b"] and positional.ids_at(found[0]) == [0, 1]
+    with pytest.raises(ValueError):
+        PointIndex([[0, 0]], ids=["a", "b"])
+
+
+def test_empty_point_index():
+    index = PointIndex([], dimension=3)
+    assert len(index) == 0 and index.dimension == 3
+    distances, positions = index.query(np.zeros((4, 3)), k=3)
+    assert distances.shape == positions.shape == (4, 0)
+    assert index.nearest((0, 0, 0))[1].size == 0
+    assert index.within_radius((0, 0, 0), 1).size == 0
+    assert index.count_within_radius(np.zeros((2, 3)), 1).tolist() == [0, 0]
+    assert index.ids_at(positions) == [[], [], [], []]
+    with pytest.raises(ValueError):
+        index.query(np.zeros((1, 3)), k=0)
+    with pytest.raises(ValueError):
+        PointIndex([])
+    index.rebuild([[1.0, 2.0, 3.0]])
+    assert index.nearest((1, 2, 3))[1].tolist() == [0]
+
+
+def test_spatial_index_query_matches_brute_force(regions):
+    index = SpatialIndex.bulk_load(enumerate(regions))
+    boxes = np.array([region.bounding_box() for region in regions])
+    bbox = (20, 20, 60, 50)
+    expected = np.nonzero((boxes[:, 0] <= 60) & (boxes[:, 2] >= 20) & (boxes[:, 1] <= 50) & (boxes[:, 3] >= 20))[0]
+    assert sorted(index.query(bbox, ids=True)) == expected.tolist()
+    assert sorted(index.iter_query(bbox, ids=True)) == expected.tolist()
+    assert index.count(bbox) == len(expected)
+    assert index.remove(int(expected[0])) is regions[expected[0]]
+    assert index.remove(int(expected[0])) is None
+    assert sorted(index.query(bbox, ids=True)) == expected[1:].tolist()
+
+
+def test_on_disk_index_reopens(tmp_path, regions):
+    path = tmp_path / "regions"
+    index = SpatialIndex.bulk_load(enumerate(regions[:20]), path=path)
+    expected = sorted(index.query((0, 0, 50, 50), ids=True))
+    index.close()
+    reopened = SpatialIndex(path=path)
+    assert sorted(reopened.query((0, 0, 50, 50), ids=True)) == expected
+    assert len(reopened.entities) == 20
+    reopened.close()
+    assert len(SpatialIndex(path=path, overwrite=True).entities) == 0
+
+
+def test_on_disk_index_keeps_files_without_idx(tmp_path, regions):
+    path = tmp_path / "regions"
+    SpatialIndex.bulk_load(enumerate(regions[:5]), path=path).close()
+    (tmp_path / "regions.idx").unlink()
+    with pytest.raises(FileExistsError):
+        SpatialIndex(path=path)
+    assert (tmp_path / "regions.dat").exists() and (tmp_path / "regions.entities").exists()
+    assert len(SpatialIndex(path=path, overwrite=True).entities) == 0
+
+
+def test_unpickled_region_prepares_again(square):
+    assert square.prepared_geometry is square.geometry
+    assert shapely.is_prepared(square.geometry)
+    restored = pickle.loads(pickle.dumps(square))
+    assert not restored._prepared
+    assert shapely.is_prepared(restored.prepared_geometry)
+
+
+@pytest.mark.parametrize("predicate, distance", [("intersects", None), ("contains", None), ("within", None),
+                                                 ("touches", None), ("dwithin", 3.0)])
+def test_query_exact_matches_brute_force(regions, predicate, distance):
+    index = SpatialIndex()
+    for i, region in enumerate(regions):
+        index.add(region, i * 10)
+    entity_geometries = np.array([region.geometry for region in regions], dtype=object)
+    queries = [shapely.box(10, 10, 40, 40), regions[5].geometry, shapely.Point(50, 50),
+               shapely.box(-10, -10, -5, -5)]
+    kwargs = {} if distance is None else {"distance": distance}
+    expected = []
+    for position, query in enumerate(queries):
+        matches = np.nonzero(getattr(shapely, predicate)(query, entity_geometries, **kwargs))[0] * 10
+        expected.append(matches)
+        assert index.query_exact(query, predicate, distance, output="ids").tolist() == matches.tolist()
+        assert index.query_exact(query, predicate, distance) == [index.entities[i] for i in matches.tolist()]
+    pairs = index.query_exact_many(queries, predicate, distance)
+    assert pairs.tolist() == [[p for p, ids in enumerate(expected) for _ in ids],
+                              [i for ids in expected for i in ids.tolist()]]
+    groups = index.query_exact_many(queries, predicate, distance, output="ids")
+    assert [group.tolist() for group in groups] == [ids.tolist() for ids in expected]
+
+
+def test_query_exact_rejects_invalid_arguments(regions):
+    index = SpatialIndex.bulk_load(enumerate(regions[:5]))
+    with pytest.raises(ValueError):
+        index.query_exact(shapely.Point(0, 0), "crosses")
+    with pytest.raises(ValueError):
+        index.query_exact(shapely.Point(0, 0), "dwithin")
+    with pytest.raises(ValueError):
+        index.query_exact_many([shapely.Point(0, 0)], output="table")
+
+
+def test_contains_and_distance_many_match_per_point_results():
+    region = SpatialRegion([(0, 0), (6, 0), (6, 2), (2, 2), (2, 6), (0, 6)])
+    rng = np.random.default_rng(3)
+    coords = np.vstack([rng.uniform(-2, 8, (200, 2)), [[0, 0], [3, 2], [1, 3], [6, 1]]])
+    points = [Point(x, y) for x, y in coords.tolist()]
+    assert region.contains_many(coords).tolist() == [region.contains(point) for point in points]
+    assert region.contains_many(coords, include_boundary=True).tolist() == [
+        region.geometry.intersects(point.geometry) for point in points]
+    assert np.allclose(region.distance_many(coords), [region.distance(point) for point in points])
+    assert region.contains_many(points).tolist() == region.contains_many(PointCollection(coords)).tolist()
+    assert region.distance_many(np.empty((0, 2))).shape == (0,)
+
+
+def test_prepared_geometry_is_cached_and_reset(square):
+    assert not shapely.is_prepared(square.geometry)
+    prepared = square.prepared_geometry
+    assert shapely.is_prepared(prepared) and square.prepared_geometry is prepared
+    assert square.contains(Point(1, 1)) and not square.contains(Point(5, 5))
+    moved = square.translate(10, 0)
+    assert not shapely.is_prepared(moved.geometry)
+    assert moved.contains(Point(11, 1)) and shapely.is_prepared(moved.geometry)
+    square.geometry = shapely.box(0, 0, 1, 1)
+    assert not square._prepared and not square.contains(Point(2, 2))
+    assert shapely.is_prepared(square.geometry)
+
+
+def assert_same_polygon(actual, expected):
+    assert np.allclose(shapely.get_coordinates(actual), shapely.get_coordinates(expected))
+
+
+def test_chained_lazy_transforms_match_shapely():
+    region = SpatialRegion([(0, 0), (5, 0), (5, 2), (1, 3)])
+    moved = region.translate(3, -1).rotate(30).scale(2, 0.5, origin="centroid").rotate(45, origin=(1, 2))
+    assert moved._geometry is None
+    expected = affinity.translate(region.geometry, 3, -1)
+    expected = affinity.rotate(expected, 30, origin="center")
+    expected = affinity.scale(expected, 2, 0.5, origin="centroid")
+    expected = affinity.rotate(expected, 45, origin=(1, 2))
+    assert_same_polygon(moved.geometry, expected)
+    assert_same_polygon(region.rotate(90, origin=Point(1, 1)).geometry, affinity.rotate(region.geometry, 90, (1, 1)))
+    assert region.rotate(90).translate(1, 0).scale(-1, 1).bounding_box() == pytest.approx(
+        affinity.scale(affinity.translate(affinity.rotate(region.geometry, 90), 1, 0), -1, 1).bounds)
+
+
+def test_transform_regions_matches_per_region_transforms():
+    regions = random_regions(np.random.default_rng(4), 20)
+    regions[3] = regions[3].rotate(20).translate(5, 5)
+    matrix = [2.0, 0.5, -0.25, 1.5, 10.0, -3.0]
+    transformed = transform_regions(regions, matrix)
+    assert len(transformed) == len(regions) and transform_regions([], matrix) == []
+    for region, result in zip(regions, transformed):
+        assert result._geometry is not None
+        assert_same_polygon(result.geometry, affinity.affine_transform(region.geometry, matrix))
+        assert_same_polygon(result.geometry, region.transform(matrix).geometry)
+
+
+def test_transform_volumes_returns_enclosing_boxes():
+    volumes = [SpatialVolume(0, 0, 0, 1, 2, 3), SpatialVolume(-4, 1, 2, -1, 5, 2.5)]
+    matrix = np.array([[0.0, -1.0, 0.0, 2.0], [1.0, 0.0, 0.0, 0.0], [0.0, 0.5, 2.0, -1.0], [0.0, 0.0, 0.0, 1.0]])
+    for volume, result in zip(volumes, transform_volumes(volumes, matrix)):
+        bounds = volume.bounding_box()
+        corners = np.array(list(itertools.product(*zip(bounds[:3], bounds[3:]))))
+        moved = corners @ matrix[:3, :3].T + matrix[:3, 3]
+        assert result.bounding_box() == pytest.approx((*moved.min(axis=0), *moved.max(axis=0)))
+        assert volume.transform(matrix).bounding_box() == pytest.approx(result.bounding_box())
+    assert transform_volumes([], matrix) == []
+    translated = transform_volumes(volumes, [1, 0, 0, 0, 1, 0, 0, 0, 1, 1, 2, 3])[0]
+    assert translated.bounding_box() == pytest.approx(volumes[0].translate(1, 2, 3).bounding_box())
+
+
+@pytest.mark.parametrize("transform", [
+    lambda region: region.transform([[1, 0, 0], [2, 0, 0], [0, 0, 1]]),
+    lambda region: region.scale(0, 1),
+    lambda region: transform_regions([region], [1, 1, 1, 1, 0, 0]),
+    lambda region: transform_volumes([SpatialVolume(0, 0, 0, 1, 1, 1)], np.diag([1.0, 1.0, 0.0, 1.0])),
+    lambda region: region.transform([1, 0, 0, 1]),
+])
+def test_singular_or_malformed_transforms_raise(square, transform):
+    with pytest.raises(ValueError):
+        transform(square)
+
+
+def test_volume_collection_matches_volumes():
+    rng = np.random.default_rng(5)
+    collection = VolumeCollection(random_bounds(rng, 50))
+    volumes = collection.to_volumes()
+    points = [Point(*coords) for coords in rng.uniform(0, 110, (12, 3)).tolist()]
+    points.append(Point(*collection.mins[0].tolist()))
+    contains = [[volume.contains(point) for volume in volumes] for point in points]
+    distances = [[volume.distance(point) for volume in volumes] for point in points]
+    for point, expected, expected_distances in zip(points, contains, distances):
+        assert collection.contains(point).tolist() == expected
+        assert collection.contains(point.coords).tolist() == expected
+        assert np.allclose(collection.distance(point), expected_distances)
+    assert collection.contains_many(points).tolist() == contains
+    assert np.allclose(collection.distance_many(PointCollection.from_points(points)), distances)
+    assert collection.contains_many([points[0].coords]).shape == (1, 50)
+    assert collection.distance_many(np.empty((0, 3))).shape == (0, 50)
+    with pytest.raises(ValueError):
+        collection.contains([(0, 0, 0), (1, 1, 1)])
+    with pytest.raises(ValueError):
+        collection.distance(Point(0, 0))
+
+
+def test_volume_collection_round_trips_volumes():
+    volumes = [SpatialVolume(0, 0, 0, 1, 2, 3), SpatialVolume(-1, -1, -1, 0, 0, 0)]
+    collection = VolumeCollection.from_volumes(volumes)
+    assert [volume.bounding_box() for volume in collection] == [volume.bounding_box() for volume in volumes]
+    assert collection.bounding_box() == (-1, -1, -1, 1, 2, 3)
+    assert len(collection[collection.overlaps((0.5, 0.5, 0.5, 2, 2, 2))]) == 1
+    assert collection.translate(1, 0, 0)[1].bounding_box() == (0, -1, -1, 1, 0, 0)
+    with pytest.raises(ValueError):
+        VolumeCollection([[1, 0, 0, 0, 1, 1]])
+
+
+def test_bvh_matches_brute_force():
+    rng = np.random.default_rng(1)
+    bounds, queries = random_bounds(rng, 400), random_bounds(rng, 30)
+    bvh = BoundingVolumeHierarchy(bounds, leaf_size=8)
+    overlap = np.all((bounds[None, :, :3] <= queries[:, None, 3:]) & (bounds[None, :, 3:] >= queries[:, None, :3]),
+                     axis=2)
+    assert bvh.query_many(queries).tolist() == [list(axis) for axis in np.nonzero(overlap)]
+    assert bvh.query(queries[0]).tolist() == np.nonzero(overlap[0])[0].tolist()
+    self_overlap = np.all((bounds[:, None, :3] <= bounds[None, :, 3:]) &
+                          (bounds[:, None, 3:] >= bounds[None, :, :3]), axis=2)
+    assert bvh.overlapping_pairs().tolist() == [list(axis) for axis in np.nonzero(np.triu(self_overlap, 1))]
+
+    points = rng.uniform(0, 100, (15, 3))
+    distances = np.linalg.norm(np.maximum(np.maximum(bounds[None, :, :3] - points[:, None],
+                                                     points[:, None] - bounds[None, :, 3:]), 0), axis=2)
+    found_distances, found = bvh.nearest_many(points, k=3)
+    assert np.allclose(found_distances, np.sort(distances, axis=1)[:, :3])
+    assert np.allclose(np.take_along_axis(distances, found, axis=1), found_distances)
+    for point, row in zip(points, distances):
+        assert bvh.containing(point).tolist() == np.nonzero(row == 0)[0].tolist()
+
+
+def test_bvh_accepts_volumes_and_handles_empty():
+    volumes = [SpatialVolume(0, 0, 0, 1, 1, 1), SpatialVolume(2, 2, 2, 3, 3, 3)]
+    bvh = BoundingVolumeHierarchy(volumes)
+    assert bvh.containing((2.5, 2.5, 2.5)).tolist() == [1]
+    assert BoundingVolumeHierarchy(VolumeCollection.from_volumes(volumes)).nearest((5, 5, 5))[1].tolist() == [1]
+    empty = BoundingVolumeHierarchy(np.empty((0, 6)))
+    assert empty.query((0, 0, 0, 1, 1, 1)).size == 0
+    assert empty.nearest_many([(0, 0, 0)], k=2)[1].tolist() == [[-1, -1]]
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+import shapely
+
+from src.pythingd.commons.foundational.spatial_join import _partition_edges, iter_spatial_join, spatial_join
+
+
+def random_boxes(rng, count, size=5.0):
+    corners = rng.uniform(0, 100, (count, 2))
+    return shapely.box(corners[:, 0], corners[:, 1], corners[:, 0] + rng.uniform(0.1, size, count),
+                       corners[:, 1] + rng.uniform(0.1, size, count))
+
+
+def brute_force(left, right, predicate, distance=None):
+    if predicate == "dwithin":
+        matrix = shapely.dwithin(left[:, None], right[None, :], distance)
+    else:
+        matrix = getattr(shapely, predicate)(left[:, None], right[None, :])
+    return sorted(zip(*np.nonzero(matrix)))
+
+
+@pytest.fixture
+def collections():
+    rng = np.random.default_rng(0)
+    left = random_boxes(rng, 150, size=10.0)
+    right = np.concatenate([random_boxes(rng, 100, size=3.0), shapely.points(rng.uniform(0, 100, (50, 2)))])
+    return left, right
+
+
+@pytest.mark.parametrize("partitioning", ["grid", "str"])
+@pytest.mark.parametrize("predicate, distance", [("intersects", None), ("contains", None),
+                                                 ("within", None), ("dwithin", 2.0)])
+def test_join_matches_brute_force(collections, predicate, distance, partitioning):
+    left, right = collections
+    result = spatial_join(left, right, predicate, distance, partitioning=partitioning, partitions=9)
+    assert sorted(zip(*result)) == brute_force(left, right, predicate, distance)
+
+
+def test_tiles_report_each_pair_once(collections):
+    left, right = collections
+    pairs = [pair for chunk in iter_spatial_join(left, right, partitions=16) for pair in zip(*chunk)]
+    assert len(pairs) == len(set(pairs))
+    assert sorted(pairs) == brute_force(left, right, "intersects")
+
+
+def test_left_join_pairs_unmatched_with_minus_one(collections):
+    left, right = collections
+    left = np.concatenate([left, [shapely.box(500, 500, 501, 501)]])
+    left_positions, right_positions = spatial_join(left, right, how="left", partitions=4)
+    assert right_positions[left_positions == len(left) - 1].tolist() == [-1]
+    assert set(left_positions.tolist()) == set(range(len(left)))
+    matched = right_positions != -1
+    assert sorted(zip(left_positions[matched], right_positions[matched])) == brute_force(left, right, "intersects")
+
+
+@pytest.mark.parametrize("partitioning", ["grid", "str"])
+def test_empty_and_missing_geometries_are_unmatched(collections, partitioning):
+    left, right = collections
+    left = np.concatenate([[shapely.Polygon(), None], left, [shapely.Point()]])
+    right = np.concatenate([right, [None, shapely.LineString()]])
+    x_edges, y_edges = _partition_edges(shapely.bounds(np.concatenate([left, right])), partitioning, 9)
+    assert np.isfinite(x_edges).all() and all(np.isfinite(edges).all() for edges in y_edges)
+    left_positions, right_positions = spatial_join(left, right, how="left", partitioning=partitioning,
+                                                   partitions=9)
+    for position in (0, 1, len(left) - 1):
+        assert right_positions[left_positions == position].tolist() == [-1]
+    matched = right_positions != -1
+    assert sorted(zip(left_positions[matched], right_positions[matched])) == brute_force(left, right, "intersects")
+
+
+def test_process_pool_matches_serial(collections):
+    left, right = collections
+    serial = spatial_join(left, right, partitions=8)
+    pooled = spatial_join(left, right, partitions=8, processes=2)
+    assert all(np.array_equal(a, b) for a, b in zip(serial, pooled))
+
+
+def test_empty_and_invalid_arguments():
+    left = shapely.points([[0, 0]])
+    empty = np.array([], dtype=object)
+    assert [part.size for part in spatial_join(left, empty)] == [0, 0]
+    with pytest.raises(ValueError):
+        spatial_join(left, left, predicate="touches")
+    with pytest.raises(ValueError):
+        spatial_join(left, left, predicate="dwithin")
+    with pytest.raises(ValueError):
+        spatial_join(left, left, how="outer")
+    with pytest.raises(ValueError):
+        spatial_join(left, left, partitioning="hilbert")
@@ -0,0 +1,127 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src.pythingd.commons.foundational.quantity import QuantityArray, QuantityValue, get_registry
+from src.pythingd.utils import statistical
+from src.pythingd.utils.statistical import KLLSketch, RunningMoments, StreamingHistogram, StreamingStatistics
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).normal(20.0, 5.0, 20_000)
+
+
+def test_moments_and_extrema_match_numpy(values):
+    stats = StreamingStatistics().update(values[:5000]).update(values[5000:].tolist())
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.variance(ddof=1) == pytest.approx(values.var(ddof=1))
+    assert stats.std() == pytest.approx(values.std())
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_sketch_quantiles_are_close_to_numpy(values):
+    sketch = KLLSketch(k=200, seed=1)
+    sketch.update(values)
+    qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+    ranks = [np.mean(values <= value) for value in sketch.quantiles(qs)]
+    assert np.allclose(ranks, qs, atol=0.02)
+    assert sketch.rank(np.median(values)) == pytest.approx(0.5, abs=0.02)
+
+
+def test_histogram_matches_numpy(values):
+    histogram = StreamingHistogram.linear(0, 40, 16)
+    histogram.update(values)
+    expected, _ = np.histogram(values, histogram.edges)
+    assert histogram.counts.tolist() == expected.tolist()
+    assert histogram.underflow == np.count_nonzero(values < 0)
+    assert histogram.overflow == np.count_nonzero(values > 40)
+
+
+def test_merge_matches_a_single_pass(values):
+    edges = np.linspace(0, 40, 9)
+    whole = StreamingStatistics("meter", histogram_edges=edges).update(values)
+    parts = [StreamingStatistics("meter", histogram_edges=edges).update(part) for part in np.array_split(values, 4)]
+    merged = StreamingStatistics(histogram_edges=edges)
+    for part in parts:
+        merged.merge(pickle.loads(pickle.dumps(part)))
+    assert merged.unit == whole.unit
+    assert merged.count == whole.count
+    assert merged.mean.magnitude == pytest.approx(whole.mean.magnitude)
+    assert merged.variance().magnitude == pytest.approx(whole.variance().magnitude)
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+    assert merged.histogram.counts.tolist() == whole.histogram.counts.tolist()
+
+
+def test_merge_converts_units(values):
+    meters = StreamingStatistics("meter").update(values[:100])
+    centimeters = StreamingStatistics("centimeter").update(values[100:200] * 100)
+    meters.merge(centimeters)
+    moments = RunningMoments()
+    moments.update(values[:200])
+    assert meters.mean.magnitude == pytest.approx(moments.mean)
+    assert meters.variance().magnitude == pytest.approx(moments.variance())
+    assert meters.max.magnitude == pytest.approx(values[:200].max())
+
+
+def test_empty_accumulator_adopts_histogram_and_unit(values):
+    other = StreamingStatistics("second", histogram_edges=[0, 10, 20, 30]).update(values[:50])
+    merged = StreamingStatistics().merge(other)
+    assert merged.unit == other.unit
+    assert merged.histogram is not other.histogram
+    assert merged.histogram.counts.tolist() == other.histogram.counts.tolist()
+
+
+def test_lossy_histogram_merges_raise(values):
+    with_histogram = StreamingStatistics("meter", histogram_edges=[0, 10, 20]).update(values[:10])
+    without_histogram = StreamingStatistics("meter").update(values[10:20])
+    before = with_histogram.to_dict()
+    with pytest.raises(ValueError):
+        with_histogram.merge(without_histogram)
+    with pytest.raises(ValueError):
+        without_histogram.merge(with_histogram)
+    with pytest.raises(ValueError):
+        with_histogram.merge(StreamingStatistics("meter", histogram_edges=[0, 5, 20]).update(values[:10]))
+    with pytest.raises(ValueError):
+        with_histogram.merge(StreamingStatistics("centimeter", histogram_edges=[0, 10, 20]).update(values[:10]))
+    # A rejected merge leaves the accumulator untouched.
+    assert with_histogram.to_dict() == before
+    # An empty side carries no data, so dropping or missing its histogram loses nothing.
+    assert with_histogram.merge(StreamingStatistics("meter")).count == 10
+
+
+def test_offset_units_report_spread_in_delta_units():
+    registry = get_registry()
+    celsius = StreamingStatistics("degC").update([QuantityValue(10.0, "degC"), QuantityValue(50.0, "degF")])
+    assert celsius.mean.unit == registry.degC
+    assert celsius.mean.magnitude == pytest.approx(10.0)
+    assert celsius.std().unit == registry.delta_degC
+    assert celsius.variance().unit == registry.delta_degC ** 2
+    converted = celsius.update(QuantityValue(20.0, "degC")).to("degF")
+    assert converted.std().to("delta_degC").magnitude == pytest.approx(celsius.std().magnitude)
+    assert converted.mean.to("degC").magnitude == pytest.approx(celsius.mean.magnitude)
+
+
+def test_quantity_inputs_adopt_first_unit():
+    stats = StreamingStatistics().update(QuantityArray([1.0, 2.0], "kilometer"))
+    stats.update([QuantityValue(500.0, "meter"), QuantityValue(1.5, "kilometer")])
+    assert stats.unit == get_registry().kilometer
+    assert stats.mean.magnitude == pytest.approx(1.25)
+    assert stats.quantiles([0.0, 1.0]).magnitude.tolist() == [0.5, 2.0]
+
+
+def test_generators_are_consumed_in_chunks(monkeypatch):
+    monkeypatch.setattr(statistical, "STREAM_CHUNK_SIZE", 7)
+    sizes = []
+    original = StreamingStatistics._update_magnitudes
+
+    def record(self, magnitudes):
+        sizes.append(len(magnitudes))
+        original(self, magnitudes)
+
+    monkeypatch.setattr(StreamingStatistics, "_update_magnitudes", record)
+    stats = StreamingStatistics().update(float(i) for i in range(20))
+    assert sizes == [7, 7, 6]
+    assert stats.count == 20 and stats.mean == pytest.approx(9.5)